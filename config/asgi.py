@@ -0,0 +1,31 @@
+"""
+ASGI config for FLB project.
+
+This module contains the ASGI application used by ASGI servers, like the
+uvicorn workers of gunicorn in production, see compose/production/django/start.
+It exposes a module-level variable named ``application``.
+
+The views of flb.utils.asyncviews are awaited, the others run in a thread
+as under WSGI, and so do the bodies of streaming responses.
+
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import django
+
+from flb.utils.asyncviews import ASGIHandler
+
+# This allows easy placement of apps within the interior
+# flb directory.
+ROOT_DIR = Path(__file__).resolve(strict=True).parent.parent
+sys.path.append(str(ROOT_DIR / "flb"))
+# We defer to a DJANGO_SETTINGS_MODULE already in the environment.
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+# This application object is used by any ASGI server configured to use this
+# file. As get_asgi_application(), with the handler of flb.utils.asyncviews.
+django.setup(set_prefix=False)
+application = ASGIHandler()
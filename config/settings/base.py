@@ -61,6 +61,7 @@ DJANGO_APPS = [
     "django.contrib.staticfiles",
     # "django.contrib.humanize", # Handy template tags
     "django.contrib.admin",
+    "django.contrib.postgres",
     "django.forms",
 ]
 THIRD_PARTY_APPS = [
@@ -82,6 +83,7 @@ LOCAL_APPS = [
     "flb.literature.apps.LiteratureConfig",
     "flb.profiles.apps.ProfilesConfig",
     "flb.posts.apps.PostsConfig",
+    "flb.jobs.apps.JobsConfig",
 ]
 # https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -129,6 +131,7 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "flb.utils.querycount.QueryCountMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -277,7 +280,71 @@ SOCIALACCOUNT_ADAPTER = "flb.users.adapters.SocialAccountAdapter"
 # Your stuff...
 # ------------------------------------------------------------------------------
 TAGGIT_CASE_INSENSITIVE = True
+# The text search configuration used for the literature search_vector columns
+LITERATURE_SEARCH_CONFIG = env("LITERATURE_SEARCH_CONFIG", default="simple")
+# Paginate search results and list views by cursor instead of page number
+LITERATURE_KEYSET_PAGINATION = env.bool("LITERATURE_KEYSET_PAGINATION", False)
+# Seconds the rendered article and issue cards stay cached, see flb.literature.cards
+LITERATURE_CARD_CACHE_TIMEOUT = env.int("LITERATURE_CARD_CACHE_TIMEOUT", 60 * 60 * 24)
+# Widths of the resized cover images listed in srcset, see flb.literature.covers
+LITERATURE_COVER_WIDTHS = [160, 320, 640]
+# "WEBP" or "JPEG"
+LITERATURE_COVER_FORMAT = "WEBP"
+LITERATURE_COVER_QUALITY = 80
+# Characters of the text of a PDF kept and searched, see flb.literature.filetext
+LITERATURE_FILE_TEXT_LIMIT = 200_000
+# Seconds anonymous pages stay in the full page cache, 0 turns it off
+PAGE_CACHE_TIMEOUT = env.int("PAGE_CACHE_TIMEOUT", 60 * 60)
 SELECT2_CACHE_BACKEND = "default"
+# "x-accel-redirect" or "x-sendfile" to leave sending downloaded files to
+# the front proxy, see flb.utils.downloads
+DOWNLOAD_SENDFILE = env("DJANGO_DOWNLOAD_SENDFILE", default="")
+# The internal nginx location serving the media files by name
+DOWNLOAD_ACCEL_PREFIX = env("DJANGO_DOWNLOAD_ACCEL_PREFIX", default="/protected/")
+# Threads per process running independent query groups of a request, each
+# with its own database connection, 0 runs them in turn, see flb.utils.parallel
+PARALLEL_THREADS = env.int("DJANGO_PARALLEL_THREADS", 0)
+# Seconds the query groups of a search may take before it answers 503
+LITERATURE_SEARCH_TIMEOUT = 10
+# Threads per ASGI process running the async views, each with its own
+# database connection, see flb.utils.asyncviews
+ASYNC_VIEW_THREADS = env.int("DJANGO_ASYNC_VIEW_THREADS", 10)
+# File fields the browser uploads straight to the storage, see flb.utils.uploads
+DIRECT_UPLOAD_FIELDS = [
+    "literature.Article.file",
+    "literature.Issue.file",
+    "literature.Issue.f_cover",
+    "literature.Issue.b_cover",
+]
+DIRECT_UPLOAD_MAX_SIZE = 500 * 1024 * 1024
+# Seconds a presigned upload stays valid
+DIRECT_UPLOAD_EXPIRES = 60 * 60
+# Run background jobs when they are queued instead of in run_jobs, see flb.jobs
+JOBS_EAGER = env.bool("JOBS_EAGER", False)
+# Seconds before the first retry of a failed job, doubled on every attempt
+JOBS_RETRY_DELAY = 10
+# Count the queries of every request, see flb.utils.querycount
+QUERY_COUNT_ENABLED = env.bool("QUERY_COUNT_ENABLED", False)
+# Raise instead of logging a warning when a request goes over budget
+QUERY_COUNT_RAISE = False
+# Most times one query may repeat in a request before it is reported as N+1
+QUERY_COUNT_DUPLICATES = 10
+# Most queries per request, by view name. Logged in requests use three of
+# them for the session, user and profile.
+QUERY_COUNT_BUDGETS = {
+    "mainsite:home": 8,
+    "literature:search": 12,
+    "literature:book-list": 9,
+    "literature:journal-detail": 6,
+    "literature:issue-detail": 7,
+    "literature:article-detail": 7,
+    "literature:author-detail": 7,
+    "literature:article-file": 4,
+    "literature:issue-file": 4,
+    "literature:book-file": 4,
+}
+# Path the test run writes the per view query report to, as JSON
+QUERY_COUNT_REPORT = env("QUERY_COUNT_REPORT", default=None)
 
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
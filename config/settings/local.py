@@ -56,3 +56,5 @@ INSTALLED_APPS += ["django_extensions"]  # noqa F405
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+# No worker runs locally, see flb.jobs
+JOBS_EAGER = env.bool("JOBS_EAGER", True)
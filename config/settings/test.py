@@ -39,3 +39,8 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
 # Your stuff...
 # ------------------------------------------------------------------------------
+QUERY_COUNT_ENABLED = True
+QUERY_COUNT_RAISE = True
+JOBS_EAGER = True
+# The threads would not see the rows of the test transactions
+PARALLEL_THREADS = 0
@@ -4,6 +4,8 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views import defaults as default_views
 
+from flb.utils.uploads import LocalUploadView, PresignUploadView
+
 urlpatterns = [
     # Django Admin, use {% url 'admin:index' %}
     path(settings.ADMIN_URL, admin.site.urls),
@@ -16,6 +18,8 @@ urlpatterns = [
     path("posts/", include("posts.urls")),
     path("profiles/", include("profiles.urls")),
     path("select2/", include("django_select2.urls")),
+    path("uploads/presign/", PresignUploadView.as_view(), name="presign-upload"),
+    path("uploads/local/", LocalUploadView.as_view(), name="local-upload"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 
@@ -1,7 +1,16 @@
 import pytest
+from django.conf import settings
+from django.core.cache import cache
 
 from flb.users.models import User
 from flb.users.tests.factories import UserFactory
+from flb.utils.querycount import stats
+
+
+def pytest_sessionfinish(session):
+    # The per view query counts of the whole run, see QUERY_COUNT_REPORT
+    if settings.QUERY_COUNT_REPORT:
+        stats.write_report(settings.QUERY_COUNT_REPORT)
 
 
 @pytest.fixture(autouse=True)
@@ -9,6 +18,11 @@ def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 @pytest.fixture
 def user() -> User:
     return UserFactory()
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from flb.jobs.models import Job
+
+
+def _ms(value):
+    if value is None:
+        return "-"
+    if isinstance(value, timedelta):
+        value = value.total_seconds()
+    return f"{value * 1000:.0f}"
+
+
+class Command(BaseCommand):
+    help = "Show the counts and timings of the background jobs per task."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="Only count the jobs created in the last hours.",
+        )
+        parser.add_argument(
+            "--prune",
+            type=int,
+            metavar="DAYS",
+            help="First delete the jobs done more than DAYS days ago.",
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options["prune"] is not None:
+            deleted, _ = Job.objects.filter(
+                status=Job.DONE, finished_at__lt=now - timedelta(days=options["prune"])
+            ).delete()
+            self.stdout.write(f"Deleted {deleted} jobs")
+
+        jobs = Job.objects.filter(
+            created_at__gte=now - timedelta(hours=options["hours"])
+        )
+        columns = "{:<60} {:>7} {:>7} {:>7} {:>7} {:>8} {:>8} {:>8}"
+        self.stdout.write(
+            columns.format(
+                "task",
+                "queued",
+                "done",
+                "failed",
+                "retried",
+                "avg ms",
+                "max ms",
+                "wait ms",
+            )
+        )
+        for row in jobs.stats():
+            self.stdout.write(
+                columns.format(
+                    row["name"][-60:],
+                    row["queued"],
+                    row["done"],
+                    row["failed"],
+                    row["retries"],
+                    _ms(row["avg_duration"]),
+                    _ms(row["max_duration"]),
+                    _ms(row["avg_wait"]),
+                )
+            )
@@ -0,0 +1,70 @@
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+
+from flb.jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run the queued background jobs, see flb.jobs.tasks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            help="A queue to take jobs from, can be repeated. Default: default.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Number of jobs run at the same time, each in its own thread.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when no job is ready.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Stop when no job is ready instead of waiting for more.",
+        )
+
+    def handle(self, *args, **options):
+        queues = options["queues"] or ["default"]
+        stop = threading.Event()
+
+        # Finish the running jobs on SIGTERM or Ctrl-C
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping after the running jobs")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(f"Running jobs of {', '.join(queues)}")
+        threads = [
+            threading.Thread(
+                target=Worker(
+                    queues,
+                    options["poll_interval"],
+                    # Told apart by the fencing of Worker.run()
+                    name=f"{socket.gethostname()}:{os.getpid()}:{n}",
+                ).work,
+                kwargs={"stop": stop, "burst": options["burst"]},
+                name=f"worker-{n}",
+            )
+            for n in range(options["concurrency"])
+        ]
+        for thread in threads:
+            thread.start()
+        # Joined with a timeout, so the signals reach the main thread
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(0.5)
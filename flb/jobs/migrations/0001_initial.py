@@ -0,0 +1,44 @@
+# Generated by Django 3.1.13 on 2026-10-18 17:53
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Task')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Arguments')),
+                ('queue', models.CharField(default='default', max_length=50, verbose_name='Queue')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10, verbose_name='Status')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Run at')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='Max attempts')),
+                ('timeout', models.PositiveIntegerField(default=300, verbose_name='Timeout in seconds')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Locked until')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created on')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started on')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished on')),
+                ('duration', models.FloatField(blank=True, null=True, verbose_name='Duration')),
+                ('error', models.TextField(blank=True, verbose_name='Last error')),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(status__in=['queued', 'running']), fields=['queue', 'run_at'], name='jobs_job_ready'),
+        ),
+    ]
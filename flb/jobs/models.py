@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import Avg, Count, ExpressionWrapper, F, Max, Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class JobQuerySet(models.QuerySet):
+    def ready(self, queues, now=None):
+        """
+        The jobs due to run, queued ones and running ones whose worker
+        has not finished them within their timeout.
+        """
+        now = now or timezone.now()
+        return self.filter(
+            Q(status=Job.QUEUED, run_at__lte=now)
+            | Q(status=Job.RUNNING, locked_until__lte=now),
+            queue__in=queues,
+        ).order_by("run_at")
+
+    def stats(self):
+        """Counts and timings per job name, the slowest first."""
+        wait = ExpressionWrapper(
+            F("started_at") - F("run_at"), output_field=models.DurationField()
+        )
+        return (
+            self.order_by()
+            .values("name")
+            .annotate(
+                queued=Count("pk", filter=Q(status=Job.QUEUED)),
+                done=Count("pk", filter=Q(status=Job.DONE)),
+                failed=Count("pk", filter=Q(status=Job.FAILED)),
+                retries=Count("pk", filter=Q(attempts__gt=1)),
+                avg_duration=Avg("duration"),
+                max_duration=Max("duration"),
+                avg_wait=Avg(wait),
+            )
+            .order_by(F("avg_duration").desc(nulls_last=True))
+        )
+
+
+class Job(models.Model):
+    """
+    A call of a task, see flb.jobs.tasks, waiting for or run by a worker
+    of the run_jobs command.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, _("Queued")),
+        (RUNNING, _("Running")),
+        (DONE, _("Done")),
+        (FAILED, _("Failed")),
+    ]
+
+    name = models.CharField(_("Task"), max_length=200)
+    kwargs = models.JSONField(_("Arguments"), default=dict, blank=True)
+    queue = models.CharField(_("Queue"), max_length=50, default="default")
+    status = models.CharField(
+        _("Status"), max_length=10, choices=STATUS_CHOICES, default=QUEUED
+    )
+    run_at = models.DateTimeField(_("Run at"), default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(_("Attempts"), default=0)
+    max_attempts = models.PositiveSmallIntegerField(_("Max attempts"), default=3)
+    timeout = models.PositiveIntegerField(_("Timeout in seconds"), default=300)
+    locked_until = models.DateTimeField(_("Locked until"), blank=True, null=True)
+    worker = models.CharField(_("Worker"), max_length=100, blank=True)
+    created_at = models.DateTimeField(_("Created on"), auto_now_add=True)
+    started_at = models.DateTimeField(_("Started on"), blank=True, null=True)
+    finished_at = models.DateTimeField(_("Finished on"), blank=True, null=True)
+    # Seconds of the last attempt
+    duration = models.FloatField(_("Duration"), blank=True, null=True)
+    error = models.TextField(_("Last error"), blank=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("Job")
+        verbose_name_plural = _("Jobs")
+        indexes = [
+            models.Index(
+                fields=["queue", "run_at"],
+                name="jobs_job_ready",
+                condition=Q(status__in=["queued", "running"]),
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    def retry_at(self, delay):
+        # Exponential backoff: delay, then twice as long on every attempt
+        return timezone.now() + timedelta(seconds=delay * 2 ** (self.attempts - 1))
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+
+
+class Task:
+    """A function that can run in a worker, made with @task."""
+
+    def __init__(self, func, queue, max_attempts, timeout):
+        self.func = func
+        # Workers import the task from its dotted path
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def enqueue(self, run_at=None, **kwargs):
+        """
+        Queue a call with JSON serializable keyword arguments, to run as
+        soon as a worker is free or at run_at. The job is part of the
+        current transaction, so it is only run if that commits.
+
+        With JOBS_EAGER, the call runs right away instead.
+        """
+        if settings.JOBS_EAGER:
+            self.func(**kwargs)
+            return None
+        return Job.objects.create(
+            name=self.name,
+            kwargs=kwargs,
+            queue=self.queue,
+            run_at=run_at or timezone.now(),
+            max_attempts=self.max_attempts,
+            timeout=self.timeout,
+        )
+
+
+def task(queue="default", max_attempts=3, timeout=300):
+    """
+    Make a module level function a Task, called with keyword arguments:
+
+        @task(max_attempts=5)
+        def send_report(user_id):
+            ...
+
+        send_report.enqueue(user_id=user.pk)
+
+    A job is retried with a growing delay until max_attempts, and picked up
+    by another worker when it runs longer than timeout seconds.
+    """
+
+    def decorator(func):
+        return Task(func, queue, max_attempts, timeout)
+
+    return decorator
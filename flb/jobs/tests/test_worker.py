@@ -0,0 +1,204 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from flb.jobs.models import Job
+from flb.jobs.tasks import task
+from flb.jobs.worker import Worker
+
+pytestmark = pytest.mark.django_db
+
+calls = []
+
+
+@task()
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def fail():
+    raise ValueError("broken")
+
+
+@pytest.fixture(autouse=True)
+def queued(settings):
+    settings.JOBS_EAGER = False
+    settings.JOBS_RETRY_DELAY = 10
+    calls.clear()
+
+
+def test_eager_tasks_run_right_away(settings):
+    settings.JOBS_EAGER = True
+
+    assert record.enqueue(value=1) is None
+
+    assert calls == [1]
+    assert not Job.objects.exists()
+
+
+def test_worker_runs_the_queued_jobs_in_order():
+    first = record.enqueue(value=1)
+    record.enqueue(value=2)
+    assert first.name == "flb.jobs.tests.test_worker.record"
+
+    Worker().work(burst=True)
+
+    assert calls == [1, 2]
+    first.refresh_from_db()
+    assert first.status == Job.DONE
+    assert first.attempts == 1
+    assert first.duration >= 0
+    assert first.finished_at >= first.started_at
+
+
+def test_worker_only_takes_its_queues():
+    job = record.enqueue(value=1)
+    Job.objects.update(queue="reports")
+
+    Worker(["default"]).work(burst=True)
+    assert calls == []
+
+    Worker(["default", "reports"]).work(burst=True)
+    assert calls == [1]
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+
+
+def test_scheduled_jobs_wait_for_their_time():
+    job = record.enqueue(value=1, run_at=timezone.now() + timedelta(hours=1))
+
+    Worker().work(burst=True)
+
+    assert calls == []
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+
+
+def test_failed_jobs_are_retried_later():
+    job = fail.enqueue()
+
+    Worker().work(burst=True)
+
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert job.attempts == 1
+    assert "ValueError: broken" in job.error
+    assert job.run_at > timezone.now() + timedelta(seconds=5)
+
+    # Due again, and the last attempt
+    Job.objects.update(run_at=timezone.now())
+    Worker().work(burst=True)
+
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+
+
+def test_retry_delay_doubles():
+    job = Job(attempts=3)
+    later = timezone.now() + timedelta(seconds=40)
+
+    assert abs((job.retry_at(10) - later).total_seconds()) < 1
+
+
+def test_jobs_of_a_lost_worker_are_run_again():
+    job = record.enqueue(value=1)
+    Job.objects.update(
+        status=Job.RUNNING,
+        attempts=1,
+        locked_until=timezone.now() - timedelta(seconds=1),
+    )
+
+    Worker().work(burst=True)
+
+    assert calls == [1]
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+    assert job.attempts == 2
+
+
+def test_lost_jobs_fail_after_their_last_attempt():
+    job = record.enqueue(value=1)
+    Job.objects.update(
+        status=Job.RUNNING,
+        attempts=job.max_attempts,
+        worker="lost:1",
+        locked_until=timezone.now() - timedelta(seconds=1),
+    )
+
+    Worker().work(burst=True)
+
+    assert calls == []
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == job.max_attempts
+    assert "Timed out" in job.error
+
+
+def test_a_job_taken_over_is_left_to_the_new_worker():
+    job = record.enqueue(value=1)
+    slow = Worker(name="slow")
+    claimed = slow.claim()
+    # Past the timeout, another worker claims the job again
+    Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+    assert Worker(name="fast").claim() is not None
+
+    slow.run(claimed)
+
+    job.refresh_from_db()
+    assert job.status == Job.RUNNING
+    assert job.worker == "fast"
+    assert job.attempts == 2
+    assert job.locked_until is not None
+
+
+def test_running_jobs_are_not_taken_twice():
+    record.enqueue(value=1)
+    Job.objects.update(
+        status=Job.RUNNING, locked_until=timezone.now() + timedelta(minutes=5)
+    )
+
+    assert Worker().claim() is None
+
+
+def test_stats_per_task():
+    record.enqueue(value=1)
+    record.enqueue(value=2)
+    fail.enqueue()
+    Worker().work(burst=True)
+
+    stats = {row["name"]: row for row in Job.objects.stats()}
+
+    assert stats[record.name]["done"] == 2
+    assert stats[record.name]["max_duration"] >= stats[record.name]["avg_duration"]
+    assert stats[fail.name]["queued"] == 1
+    assert stats[fail.name]["retries"] == 0
+
+
+def test_job_stats_command():
+    record.enqueue(value=1)
+    Worker().work(burst=True)
+    Job.objects.update(finished_at=timezone.now() - timedelta(days=10))
+    record.enqueue(value=2)
+    stdout = StringIO()
+
+    call_command("job_stats", prune=7, stdout=stdout)
+
+    assert "Deleted 1 jobs" in stdout.getvalue()
+    assert record.name in stdout.getvalue()
+    assert Job.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_jobs_command_with_threads():
+    for value in range(10):
+        record.enqueue(value=value)
+
+    call_command("run_jobs", concurrency=3, burst=True, stdout=StringIO())
+
+    assert sorted(calls) == list(range(10))
+    assert Job.objects.filter(status=Job.DONE).count() == 10
@@ -0,0 +1,140 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from time import perf_counter
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Run the jobs of some queues one at a time. Several workers, in threads
+    or processes, can share the queues: a job is claimed with SELECT ...
+    FOR UPDATE SKIP LOCKED, so each job goes to one worker only.
+    """
+
+    def __init__(self, queues=("default",), poll_interval=1.0, name=None):
+        self.queues = list(queues)
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+
+    def claim(self):
+        while True:
+            with transaction.atomic():
+                job = (
+                    Job.objects.ready(self.queues)
+                    .select_for_update(skip_locked=True)
+                    .first()
+                )
+                if job is None:
+                    return None
+                now = timezone.now()
+                # Its worker died or overran the timeout on the last attempt
+                if job.status == Job.RUNNING and job.attempts >= job.max_attempts:
+                    self.time_out(job, now)
+                    continue
+                job.status = Job.RUNNING
+                job.attempts += 1
+                job.started_at = now
+                job.locked_until = now + timedelta(seconds=job.timeout)
+                job.worker = self.name
+                job.save(
+                    update_fields=[
+                        "status",
+                        "attempts",
+                        "started_at",
+                        "locked_until",
+                        "worker",
+                    ]
+                )
+            return job
+
+    def time_out(self, job, now):
+        job.status = Job.FAILED
+        job.finished_at = now
+        job.locked_until = None
+        job.error = f"Timed out after {job.timeout}s on {job.worker}"
+        logger.error("%s failed %s times: %s", job.name, job.attempts, job.error)
+        job.save(update_fields=["status", "finished_at", "locked_until", "error"])
+
+    def run(self, job):
+        start = perf_counter()
+        error = ""
+        try:
+            task = import_string(job.name)
+            with transaction.atomic():
+                task(**job.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+        job.duration = perf_counter() - start
+        job.finished_at = timezone.now()
+        job.locked_until = None
+        job.error = error
+
+        if not error:
+            job.status = Job.DONE
+        elif job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = job.retry_at(settings.JOBS_RETRY_DELAY)
+        else:
+            job.status = Job.FAILED
+
+        # Only while the job is still this attempt of this worker: past its
+        # timeout another worker may have claimed it again or failed it
+        updated = Job.objects.filter(
+            pk=job.pk, attempts=job.attempts, worker=self.name, status=Job.RUNNING
+        ).update(
+            status=job.status,
+            run_at=job.run_at,
+            duration=job.duration,
+            finished_at=job.finished_at,
+            locked_until=None,
+            error=error,
+        )
+        if not updated:
+            logger.warning(
+                "%s finished after its timeout of %ss, was taken over meanwhile",
+                job.name,
+                job.timeout,
+            )
+        elif job.status == Job.DONE:
+            logger.info("%s done in %.3fs", job.name, job.duration)
+        elif job.status == Job.QUEUED:
+            logger.warning(
+                "%s failed, retrying at %s:\n%s", job.name, job.run_at, error
+            )
+        else:
+            logger.error("%s failed %s times:\n%s", job.name, job.attempts, error)
+
+    def work(self, stop=None, burst=False):
+        """
+        Run jobs until stop (an Event) is set, or in burst mode until no
+        job is ready.
+        """
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                # Long lived, so drop broken or expired connections, unless
+                # running inside a transaction (the tests)
+                if not connection.in_atomic_block:
+                    close_old_connections()
+                job = self.claim()
+                if job is not None:
+                    self.run(job)
+                elif burst:
+                    return
+                else:
+                    stop.wait(self.poll_interval)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
@@ -1,6 +1,15 @@
 from django.contrib import admin
 
-from .models import Article, Article_image, Author, Book, Issue, Journal
+from .models import (
+    Article,
+    Article_image,
+    Author,
+    Book,
+    FileText,
+    Issue,
+    Journal,
+    TagUsage,
+)
 
 # Register your models here.
 admin.site.register(Journal)
@@ -9,3 +18,5 @@ admin.site.register(Article)
 admin.site.register(Article_image)
 admin.site.register(Author)
 admin.site.register(Book)
+admin.site.register(TagUsage)
+admin.site.register(FileText)
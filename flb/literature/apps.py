@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LiteratureConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "flb.literature"
+
+    def ready(self):
+        import flb.literature.signals  # noqa
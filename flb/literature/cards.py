@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+
+def _version_key(model):
+    return f"literature:card-version:{model._meta.label_lower}"
+
+
+def card_version(model):
+    """
+    The version of the cards of a model, bumped when something they show
+    from other objects changes.
+    """
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        # Starting from the clock, a version lost from the cache can never
+        # come back lower and revive stale fragments
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_card_version(model):
+    try:
+        cache.incr(_version_key(model))
+    except ValueError:
+        cache.set(_version_key(model), time.time_ns(), None)
+
+
+def card_key(template_name, obj, version, *vary):
+    parts = [template_name, obj.pk, obj.updated_at.timestamp(), version, *vary]
+    return "literature:card:" + ":".join(str(part) for part in parts)
+
+
+def attach_cards(objects, template_name, prefetch=(), context=None):
+    """
+    Set card_html on every object to its rendered card, from the cache when
+    possible. The cards are keyed on the object pk and updated_at plus the
+    card version of the model, so saving an object replaces its own card.
+
+    The prefetch lookups only run for the objects missing from the cache.
+    context is a function returning extra template context for an object,
+    its values are part of the key as well.
+    """
+    objects = list(objects)
+    if not objects:
+        return objects
+
+    version = card_version(type(objects[0]))
+    extra = {obj.pk: context(obj) if context else {} for obj in objects}
+    keys = {
+        obj.pk: card_key(template_name, obj, version, *extra[obj.pk].values())
+        for obj in objects
+    }
+    cached = cache.get_many(keys.values())
+
+    misses = [obj for obj in objects if keys[obj.pk] not in cached]
+    if misses:
+        prefetch_related_objects(misses, *prefetch)
+        rendered = {
+            keys[obj.pk]: render_to_string(
+                template_name, {"object": obj, **extra[obj.pk]}
+            )
+            for obj in misses
+        }
+        cache.set_many(rendered, settings.LITERATURE_CARD_CACHE_TIMEOUT)
+        cached.update(rendered)
+
+    for obj in objects:
+        obj.card_html = mark_safe(cached[keys[obj.pk]])
+    return objects
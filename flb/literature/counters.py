@@ -0,0 +1,67 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from taggit.models import TaggedItem
+
+from flb.literature.models import Article, Author, Book, Issue, Journal, TagUsage
+
+
+# COUNT(*) of the rows of a queryset correlated to the outer row, 0 for none
+def _count(queryset, field):
+    counts = (
+        queryset.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _rows(model, pks):
+    qs = model.objects.all()
+    if pks is not None:
+        qs = qs.filter(pk__in=[pk for pk in pks if pk is not None])
+    return qs
+
+
+# The refresh functions recompute the counters of the given rows (of every
+# row for pks=None) in one UPDATE, so they are exact under concurrent writes
+
+
+def refresh_journal_counts(pks=None):
+    return _rows(Journal, pks).update(
+        issue_count=_count(Issue.objects.all(), "journal"),
+        article_count=_count(Article.objects.all(), "issue__journal"),
+    )
+
+
+def refresh_issue_counts(pks=None):
+    return _rows(Issue, pks).update(
+        article_count=_count(Article.objects.all(), "issue")
+    )
+
+
+def refresh_author_counts(pks=None):
+    return _rows(Author, pks).update(
+        article_count=_count(Article.authors.through.objects.all(), "author")
+    )
+
+
+def refresh_tag_counts(pks=None):
+    if pks is not None:
+        pks = [pk for pk in pks if pk is not None]
+        TagUsage.objects.bulk_create(
+            [TagUsage(tag_id=pk) for pk in pks], ignore_conflicts=True
+        )
+    items = TaggedItem.objects.all()
+    return _rows(TagUsage, pks).update(
+        article_count=_count(
+            items.filter(content_type=ContentType.objects.get_for_model(Article)),
+            "tag",
+        ),
+        book_count=_count(
+            items.filter(content_type=ContentType.objects.get_for_model(Book)),
+            "tag",
+        ),
+    )
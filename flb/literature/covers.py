@@ -0,0 +1,119 @@
+"""
+Resized renditions of the journal, issue and book covers, made once in a
+background job when a cover is uploaded and stored next to it, e.g. for
+files/issues/covers/a.jpg files/issues/covers/a.320w.webp.
+
+The size of the cover and the widths of its renditions are kept in the
+cover_renditions column, so the pages list them in srcset without asking
+the storage.
+"""
+
+import io
+import logging
+import posixpath
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from flb.jobs.tasks import task
+
+logger = logging.getLogger(__name__)
+
+COVER_FIELDS = ("f_cover", "b_cover")
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+
+def rendition_name(name, width):
+    root, _ = posixpath.splitext(name)
+    return f"{root}.{width}w.{EXTENSIONS[settings.LITERATURE_COVER_FORMAT]}"
+
+
+def _resize(image, width):
+    file_format = settings.LITERATURE_COVER_FORMAT
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.LANCZOS)
+    if file_format == "JPEG" and resized.mode != "RGB":
+        resized = resized.convert("RGB")
+    elif resized.mode not in ("RGB", "RGBA"):
+        resized = resized.convert("RGBA")
+    buffer = io.BytesIO()
+    resized.save(buffer, file_format, quality=settings.LITERATURE_COVER_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+def make_renditions(file, force=False):
+    """
+    Store the renditions of an image field file narrower than the image
+    itself and return their description for cover_renditions. Renditions
+    already in the storage are kept unless force is set.
+    """
+    storage = file.storage
+    with file.open("rb"):
+        image = Image.open(file)
+        # Scans are often stored sideways with an EXIF orientation
+        image = ImageOps.exif_transpose(image)
+        widths = [w for w in settings.LITERATURE_COVER_WIDTHS if w < image.width]
+        for width in widths:
+            name = rendition_name(file.name, width)
+            if storage.exists(name):
+                if not force:
+                    continue
+                storage.delete(name)
+            storage.save(name, _resize(image, width))
+
+    return {
+        "name": file.name,
+        "width": image.width,
+        "height": image.height,
+        "widths": widths,
+    }
+
+
+def _is_current(instance, field):
+    file = getattr(instance, field)
+    cover = instance.cover_renditions.get(field)
+    if not file:
+        return cover is None
+    return cover is not None and cover["name"] == file.name
+
+
+def covers_changed(instance):
+    return not all(_is_current(instance, field) for field in COVER_FIELDS)
+
+
+def update_renditions(instance, force=False):
+    """
+    Make the renditions of the covers of a journal, issue or book that are
+    new since the last call, and save them. Returns whether
+    cover_renditions changed.
+    """
+    renditions = dict(instance.cover_renditions)
+    for field in COVER_FIELDS:
+        file = getattr(instance, field)
+        if not file:
+            renditions.pop(field, None)
+            continue
+        if not force and _is_current(instance, field):
+            continue
+        try:
+            renditions[field] = make_renditions(file, force)
+        except (OSError, ValueError) as e:
+            # Missing or broken images are shown as they are
+            logger.warning("No renditions of %s: %s", file.name, e)
+            renditions.pop(field, None)
+
+    if renditions == instance.cover_renditions:
+        return False
+    instance.cover_renditions = renditions
+    # A save, so the cached cards and pages showing the cover are renewed
+    instance.save(update_fields=["cover_renditions", "updated_at"])
+    return True
+
+
+@task(timeout=600)
+def update_renditions_task(model, pk):
+    instance = apps.get_model(model).objects.filter(pk=pk).first()
+    if instance is not None:
+        update_renditions(instance)
@@ -0,0 +1,153 @@
+"""
+Exports of search results as CSV, JSON or BibTeX, streamed from a server
+side cursor so the memory use does not grow with the number of rows.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+
+from flb.literature.search import authors_subquery, tags_subquery
+
+# Rows fetched from the cursor at a time
+CHUNK_SIZE = 2000
+# Rows are written out in chunks of about this many characters
+BUFFER_SIZE = 64 * 1024
+
+AUTHOR_SEPARATOR = "; "
+TAG_SEPARATOR = ", "
+
+# The exported columns and the values they come from, per model name
+COLUMNS = {
+    "article": {
+        "slug": "slug",
+        "title": "name",
+        "subtitle": "sub",
+        "authors": "export_authors",
+        "journal": "issue__journal__name",
+        "issue": "issue__name",
+        "volume": "issue__volume",
+        "date": "pub_date",
+        "tags": "export_tags",
+        "abstract": "abstract",
+        "link": "link",
+    },
+    "book": {
+        "slug": "slug",
+        "title": "name",
+        "authors": "export_authors",
+        "date": "date",
+        "volume": "volume",
+        "issn": "issn",
+        "tags": "export_tags",
+        "description": "desc",
+        "link": "link",
+    },
+}
+
+
+def export_rows(queryset, build_url):
+    """
+    Dicts of the exported columns of the rows of an article or book
+    queryset, plus the absolute url of their page from build_url(path).
+    """
+    model = queryset.model._meta.model_name
+    columns = COLUMNS[model]
+    rows = queryset.annotate(
+        export_authors=authors_subquery(queryset.model, AUTHOR_SEPARATOR),
+        export_tags=tags_subquery(queryset.model, TAG_SEPARATOR),
+    ).values(*columns.values())
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        path = reverse(f"literature:{model}-detail", kwargs={"slug": row["slug"]})
+        exported = {column: row[field] for column, field in columns.items()}
+        exported["url"] = build_url(path)
+        yield exported
+
+
+def _buffered(parts):
+    buffer = []
+    size = 0
+    for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= BUFFER_SIZE:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+class _Echo:
+    # A file for csv.writer, writerow() returns the line
+    def write(self, value):
+        return value
+
+
+def _csv(rows):
+    writer = csv.writer(_Echo())
+    first = next(rows, None)
+    if first is None:
+        return
+    yield writer.writerow(first.keys())
+    yield writer.writerow(first.values())
+    for row in rows:
+        yield writer.writerow(row.values())
+
+
+def _json(rows):
+    yield "["
+    separator = "\n"
+    for row in rows:
+        yield separator + json.dumps(row, cls=DjangoJSONEncoder)
+        separator = ",\n"
+    yield "\n]\n"
+
+
+def _bibtex_value(value):
+    return str(value).replace("{", "\\{").replace("}", "\\}")
+
+
+def _bibtex(rows, entry_type):
+    for row in rows:
+        fields = {
+            "title": row["title"],
+            "author": " and ".join((row["authors"] or "").split(AUTHOR_SEPARATOR)),
+            "journal": row.get("journal"),
+            "number": row.get("issue"),
+            "volume": row["volume"],
+            "year": row["date"].year if row["date"] else None,
+            "issn": row.get("issn"),
+            "keywords": row["tags"],
+            "abstract": row.get("abstract") or row.get("description"),
+            "url": row["url"],
+        }
+        lines = [
+            f"  {name} = {{{_bibtex_value(value)}}}"
+            for name, value in fields.items()
+            if value not in (None, "")
+        ]
+        yield "@%s{%s,\n%s\n}\n\n" % (entry_type, row["slug"], ",\n".join(lines))
+
+
+# File extension: content type
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+    "bib": "application/x-bibtex; charset=utf-8",
+}
+
+
+def export(queryset, file_format, build_url):
+    """The text chunks of the export of a queryset in one of the FORMATS."""
+    rows = export_rows(queryset, build_url)
+    if file_format == "csv":
+        parts = _csv(rows)
+    elif file_format == "json":
+        parts = _json(rows)
+    else:
+        # The model names are BibTeX entry types as well
+        parts = _bibtex(rows, queryset.model._meta.model_name)
+    return _buffered(parts)
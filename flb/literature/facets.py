@@ -0,0 +1,109 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import CharField, F, Q, Value
+from django.db.models.functions import Cast, ExtractYear
+from taggit.models import TaggedItem
+
+from flb.literature.models import Article, Book
+
+FACETS = ("tags", "journals", "authors", "years")
+# Number of values kept per facet, the most frequent first
+FACET_LIMIT = 25
+# The snapshot is dropped by signals on every change, the timeout is a safety net
+LANDING_FACETS_KEY = "literature:landing-facets"
+LANDING_FACETS_TIMEOUT = 60 * 60 * 24
+
+
+def _rows(qs, facet, value):
+    return qs.values(facet=Value(facet, output_field=CharField()), value=value)
+
+
+# One (facet, value) row per matching object and facet value
+def facet_rows(articles, books):
+    article_pks = articles.order_by().values("pk")
+    book_pks = books.order_by().values("pk")
+    matched_articles = Article.objects.filter(pk__in=article_pks).order_by()
+    matched_books = Book.objects.filter(pk__in=book_pks).order_by()
+    tagged_items = TaggedItem.objects.filter(
+        Q(
+            content_type=ContentType.objects.get_for_model(Article),
+            object_id__in=article_pks,
+        )
+        | Q(
+            content_type=ContentType.objects.get_for_model(Book),
+            object_id__in=book_pks,
+        )
+    ).order_by()
+
+    return _rows(tagged_items, "tags", F("tag__name")).union(
+        _rows(matched_articles, "journals", F("issue__journal__name")),
+        _rows(matched_articles, "authors", F("authors__name")),
+        _rows(matched_books, "authors", F("authors__name")),
+        _rows(
+            matched_articles,
+            "years",
+            Cast(ExtractYear("pub_date"), output_field=CharField()),
+        ),
+        _rows(
+            matched_books, "years", Cast(ExtractYear("date"), output_field=CharField())
+        ),
+        all=True,
+    )
+
+
+def search_facets(articles, books, limit=FACET_LIMIT):
+    """
+    Count the tags, journals, authors and years of the matching articles and
+    books in a single grouped query, keeping the top values of each facet.
+
+    Returns a dict of facet name to a list of (value, count) tuples, ordered
+    by count. The years are ordered from the most recent instead.
+    """
+    rows_sql, params = facet_rows(articles, books).query.sql_with_params()
+    sql = (
+        "SELECT facet, value, count FROM ("
+        " SELECT facet, value, COUNT(*) AS count,"
+        " ROW_NUMBER() OVER (PARTITION BY facet ORDER BY COUNT(*) DESC, value) AS position"
+        f" FROM ({rows_sql}) AS facet_rows"
+        " WHERE value IS NOT NULL"
+        " GROUP BY facet, value"
+        ") AS facet_counts WHERE position <= %s ORDER BY facet, position"
+    )
+
+    facets = {facet: [] for facet in FACETS}
+    with connections[articles.db].cursor() as cursor:
+        cursor.execute(sql, (*params, limit))
+        for facet, value, count in cursor.fetchall():
+            facets[facet].append((value, count))
+    facets["years"].sort(reverse=True)
+    return facets
+
+
+def landing_facets():
+    """
+    The facets of the unfiltered search page, served from the cache.
+
+    Next to the facets the snapshot holds the total "articles" and "books"
+    counts, so the landing page needs no COUNT query either.
+    """
+    snapshot = cache.get(LANDING_FACETS_KEY)
+    if snapshot is None:
+        articles = Article.objects.all()
+        books = Book.objects.all()
+        snapshot = search_facets(articles, books)
+        snapshot["articles"] = articles.count()
+        snapshot["books"] = books.count()
+        cache.set(LANDING_FACETS_KEY, snapshot, LANDING_FACETS_TIMEOUT)
+    return snapshot
+
+
+def _delete_landing_facets():
+    cache.delete(LANDING_FACETS_KEY)
+
+
+def invalidate_landing_facets():
+    # Dropped again after commit, so a request running meanwhile cannot
+    # put back a snapshot built from the old rows
+    _delete_landing_facets()
+    transaction.on_commit(_delete_landing_facets)
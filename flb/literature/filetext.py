@@ -0,0 +1,98 @@
+"""
+The text of the article, issue and book PDFs, extracted once in a background
+job when a file is uploaded and kept in FileText, so the searches never read
+the files.
+
+The searches match it through the search_vector of the FileText itself, see
+file_text_matches(), so the search_vector of the articles and books stays
+small and renaming an author or tag doesn't index the files again.
+"""
+
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVector
+from django.db import connections
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+
+from flb.jobs.tasks import task
+from flb.literature.models import FileText
+
+logger = logging.getLogger(__name__)
+
+
+def extract_text(file):
+    """
+    Return the text of a PDF field file, up to LITERATURE_FILE_TEXT_LIMIT
+    characters, and its number of pages.
+    """
+    limit = settings.LITERATURE_FILE_TEXT_LIMIT
+    texts = []
+    length = 0
+    with file.open("rb"):
+        reader = PdfReader(file)
+        for page in reader.pages:
+            # The rest of a long file is not read at all
+            if length >= limit:
+                break
+            text = page.extract_text() or ""
+            texts.append(text)
+            length += len(text) + 1
+        pages = len(reader.pages)
+    # Postgres text can't hold NUL characters
+    return "\n".join(texts)[:limit].replace("\x00", ""), pages
+
+
+def _file_texts(instance):
+    return FileText.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+    )
+
+
+def file_changed(instance):
+    """Whether the file of an object differs from the one its text is of."""
+    name = _file_texts(instance).values_list("file_name", flat=True).first()
+    return name != (instance.file.name or None)
+
+
+def update_file_text(instance, force=False):
+    """
+    Extract the text of the file of an article, issue or book when the file
+    is new since the last call, and drop it when the file is removed.
+    Returns whether the text changed.
+    """
+    file_texts = _file_texts(instance)
+    if not instance.file:
+        if not file_texts.delete()[0]:
+            return False
+    elif not force and file_texts.filter(file_name=instance.file.name).exists():
+        return False
+    else:
+        try:
+            text, pages = extract_text(instance.file)
+        except (OSError, ValueError, PyPdfError) as e:
+            # Kept without text, so a broken file is not read again
+            logger.warning("No text of %s: %s", instance.file.name, e)
+            text, pages = "", 0
+        file_texts.update_or_create(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=instance.pk,
+            defaults={"file_name": instance.file.name, "text": text, "pages": pages},
+        )
+        if connections[file_texts.db].vendor == "postgresql":
+            config = settings.LITERATURE_SEARCH_CONFIG
+            file_texts.update(
+                search_vector=SearchVector("text", weight="D", config=config)
+            )
+    return True
+
+
+@task(timeout=900)
+def update_file_text_task(model, pk):
+    instance = apps.get_model(model).objects.filter(pk=pk).first()
+    if instance is not None:
+        update_file_text(instance)
@@ -1,7 +1,14 @@
 import django_filters
 from taggit.models import Tag
 
-from flb.literature.models import Article, Author, Issue, Journal
+from flb.literature.models import (
+    Article,
+    Author,
+    Issue,
+    Journal,
+    authors_exist,
+    tags_exist,
+)
 
 
 class IssueFilter(django_filters.FilterSet):
@@ -17,11 +24,11 @@ class IssueFilter(django_filters.FilterSet):
 class ArticleFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(lookup_expr="contains")
     authors = django_filters.filters.ModelMultipleChoiceFilter(
-        field_name="authors", queryset=Author.objects.all()
+        field_name="authors", queryset=Author.objects.all(), method="filter_authors"
     )
     # We use the model tag from the taggit
     tags = django_filters.filters.ModelMultipleChoiceFilter(
-        field_name="tags", queryset=Tag.objects.all()
+        field_name="tags", queryset=Tag.objects.all(), method="filter_tags"
     )
     # We just use __ in field names to span across relationships
     journal = django_filters.ModelChoiceFilter(
@@ -32,6 +39,17 @@ class ArticleFilter(django_filters.FilterSet):
         model = Article
         fields = ["name", "tags", "issue__journal", "issue", "authors"]
 
+    # EXISTS subqueries instead of joins, so there is nothing to distinct()
+    def filter_authors(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(authors_exist(Article, author__in=value))
+
+    def filter_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(tags_exist(Article, tag__in=value))
+
 
 class AuthorFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(lookup_expr="contains")
@@ -5,7 +5,9 @@ from django import forms
 from django.urls.base import reverse_lazy
 from django_select2 import forms as s2forms
 
+from flb.literature.imports import READERS
 from flb.literature.models import Article, Author, Issue, Journal
+from flb.utils.uploads import DirectUploadFormMixin
 
 from .custom_layout_object import Formset
 
@@ -14,6 +16,15 @@ class AuthorWidget(s2forms.ModelSelect2MultipleWidget):
     search_fields = [
         "name__icontains",
     ]
+    max_results = 20
+
+    # Ranked, typo tolerant and limited lookup instead of a full table scan
+    def filter_queryset(self, request, term, queryset=None, **dependent_fields):
+        if queryset is None:
+            queryset = self.get_queryset()
+        if dependent_fields:
+            queryset = queryset.filter(**dependent_fields)
+        return queryset.autocomplete(term, limit=self.max_results)
 
 
 class AuthorForm(forms.ModelForm):
@@ -38,7 +49,9 @@ class AuthorForm(forms.ModelForm):
         )
 
 
-class ArticleForm(forms.ModelForm):
+class ArticleForm(DirectUploadFormMixin, forms.ModelForm):
+    direct_upload_fields = ("file",)
+
     class Meta:
         model = Article
         fields = ("name", "abstract", "text", "file", "link", "authors", "tags")
@@ -64,7 +77,7 @@ class ArticleForm(forms.ModelForm):
                 Div(Field("name"), css_class="col-md-6"),
                 Div(Field("authors"), css_class="col-md-6"),
                 Div(Field("abstract"), css_class="col-md-12"),
-                Div(Field("file"), css_class="col-md-12"),
+                Div(Field("file"), Field("file_upload"), css_class="col-md-12"),
                 Div(Field("text"), css_class="col-md-12"),
                 Div(
                     Fieldset("Add images", Formset("inline_formset")),
@@ -86,7 +99,9 @@ class DateInput(forms.DateInput):
     input_type = "date"
 
 
-class IssueForm(forms.ModelForm):
+class IssueForm(DirectUploadFormMixin, forms.ModelForm):
+    direct_upload_fields = ("file", "f_cover", "b_cover")
+
     class Meta:
         model = Issue
         fields = (
@@ -124,9 +139,9 @@ class IssueForm(forms.ModelForm):
                 Column("date"),
             ),
             Row(
-                Column("file"),
-                Column("f_cover"),
-                Column("b_cover"),
+                Column("file", "file_upload"),
+                Column("f_cover", "f_cover_upload"),
+                Column("b_cover", "b_cover_upload"),
             ),
             Row(
                 Column("issn"),
@@ -144,6 +159,30 @@ class IssueForm(forms.ModelForm):
         )
 
 
+class ArticleImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="A .csv or .jsonl file with one article per row: journal, issue, "
+        "issue_date, issue_volume, title, subtitle, abstract, text, link, authors "
+        "and tags."
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.helper = FormHelper()
+        self.helper.layout = Layout(
+            Field("file"),
+            Submit("submit", "Import", css_class="btn, btn-success"),
+        )
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        self.file_format = file.name.rpartition(".")[2].lower()
+        if self.file_format not in READERS:
+            raise forms.ValidationError("Upload a .csv or .jsonl file.")
+        return file
+
+
 class MainSearchForm(forms.Form):
     q = forms.CharField(required=False, max_length=100)
 
@@ -0,0 +1,306 @@
+"""
+Bulk import of article metadata from CSV or JSON lines files, one row per
+article:
+
+    journal       slug of an existing journal
+    issue         issue name, the issue is created when the journal has none
+                  of that name yet
+    issue_date    YYYY-MM-DD, only used for new issues
+    issue_volume  only used for new issues
+    title, subtitle, abstract, text, link
+    authors       full names, separated by ";" in CSV files or as a list
+    tags          tag names, separated by "," in CSV files or as a list
+
+Authors and tags are matched by name and created when missing.
+"""
+
+import csv
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.crypto import get_random_string
+from django.utils.dateparse import parse_date
+from django.utils.text import Truncator, slugify
+from taggit.models import Tag, TaggedItem
+
+from flb.literature.counters import (
+    refresh_author_counts,
+    refresh_issue_counts,
+    refresh_journal_counts,
+    refresh_tag_counts,
+)
+from flb.literature.facets import invalidate_landing_facets
+from flb.literature.models import (
+    ABSTRACT_EXCERPT_WORDS,
+    Article,
+    Author,
+    Issue,
+    Journal,
+)
+from flb.literature.search import update_search_vector
+from flb.utils.pagecache import object_tag, purge
+
+BATCH_SIZE = 1000
+
+# Row keys and the article fields they fill
+ARTICLE_FIELDS = {
+    "title": "name",
+    "subtitle": "sub",
+    "abstract": "abstract",
+    "text": "text",
+    "link": "link",
+}
+
+
+class InvalidRow(Exception):
+    def __init__(self, line, message):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+def read_csv(stream):
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl(stream):
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as e:
+            raise InvalidRow(line, f"invalid JSON: {e}")
+        if not isinstance(row, dict):
+            raise InvalidRow(line, "expected an object")
+        yield line, row
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+def _slug(name):
+    # The same slugs as the models save() gives
+    return slugify(name + "-" + get_random_string(8, "0123456789"))
+
+
+def _names(value, separator):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(separator)
+    return [str(name).strip() for name in value if str(name).strip()]
+
+
+# The value of a row as the model field takes it, max_length and all
+def _clean(line, key, model, field, value):
+    try:
+        return model._meta.get_field(field).clean(value, None)
+    except ValidationError as e:
+        raise InvalidRow(line, f"{key}: {' '.join(e.messages)}")
+
+
+def _tag_key(name):
+    return name.lower() if settings.TAGGIT_CASE_INSENSITIVE else name
+
+
+class ArticleImporter:
+    """
+    Import rows of (line number, dict) as given by the readers, inserting
+    them batch_size at a time with bulk_create.
+
+    Only the batch being inserted is kept in memory, plus lookup maps of
+    the issues of the journals and of the author and tag names.
+    """
+
+    def __init__(self, journals=None, user=None, batch_size=BATCH_SIZE):
+        if journals is None:
+            journals = Journal.objects.all()
+        self.user = user
+        self.batch_size = batch_size
+        self.journals = dict(journals.values_list("slug", "pk"))
+        self.issues = {
+            (journal_pk, name): (pk, date)
+            for pk, journal_pk, name, date in Issue.objects.filter(
+                journal__in=self.journals.values()
+            ).values_list("pk", "journal", "name", "date")
+        }
+        self.authors = {
+            name.casefold(): pk for pk, name in Author.objects.values_list("pk", "name")
+        }
+        self.tags = {
+            _tag_key(name): pk for pk, name in Tag.objects.values_list("pk", "name")
+        }
+        self.tag_slugs = set(Tag.objects.values_list("slug", flat=True))
+        self.created = Counter()
+
+    def run(self, rows):
+        """Import every row, or none of them when one is invalid."""
+        with transaction.atomic():
+            batch = []
+            for line, row in rows:
+                batch.append(self.clean(line, row))
+                if len(batch) >= self.batch_size:
+                    self.insert(batch)
+                    batch = []
+            if batch:
+                self.insert(batch)
+        invalidate_landing_facets()
+        return self.created
+
+    def clean(self, line, row):
+        journal = (row.get("journal") or "").strip()
+        if journal not in self.journals:
+            raise InvalidRow(line, f"unknown journal {journal!r}")
+        issue = (row.get("issue") or "").strip()
+        if not issue:
+            raise InvalidRow(line, "the issue is missing")
+
+        cleaned = {
+            "journal": self.journals[journal],
+            "issue": issue,
+            "authors": _names(row.get("authors"), ";"),
+            "tags": _names(row.get("tags"), ","),
+        }
+        for key, field in ARTICLE_FIELDS.items():
+            value = (row.get(key) or "").strip()
+            cleaned[field] = _clean(line, key, Article, field, value)
+        cleaned["issue_volume"] = _clean(
+            line, "issue_volume", Issue, "volume", row.get("issue_volume") or None
+        )
+        for name in cleaned["authors"]:
+            _clean(line, "authors", Author, "name", name)
+        for name in cleaned["tags"]:
+            _clean(line, "tags", Tag, "name", name)
+
+        date = row.get("issue_date") or None
+        cleaned["issue_date"] = parse_date(date) if date else None
+        if date and not cleaned["issue_date"]:
+            raise InvalidRow(line, f"invalid issue_date {date!r}")
+        return cleaned
+
+    def insert(self, batch):
+        self.create_issues(batch)
+        self.create_authors(batch)
+        self.create_tags(batch)
+
+        articles = []
+        for row in batch:
+            issue_pk, issue_date = self.issues[row["journal"], row["issue"]]
+            articles.append(
+                Article(
+                    slug=_slug(row["name"]),
+                    issue_id=issue_pk,
+                    pub_date=issue_date,
+                    abstract_excerpt=Truncator(row["abstract"]).words(
+                        ABSTRACT_EXCERPT_WORDS
+                    ),
+                    created_by=self.user,
+                    **{field: row[field] for field in ARTICLE_FIELDS.values()},
+                )
+            )
+        Article.objects.bulk_create(articles)
+        self.created["articles"] += len(articles)
+
+        author_pks = set()
+        tag_pks = set()
+        through = []
+        tagged = []
+        content_type = ContentType.objects.get_for_model(Article)
+        for article, row in zip(articles, batch):
+            for pk in {self.authors[name.casefold()] for name in row["authors"]}:
+                through.append(
+                    Article.authors.through(article_id=article.pk, author_id=pk)
+                )
+                author_pks.add(pk)
+            for pk in {self.tags[_tag_key(name)] for name in row["tags"]}:
+                tagged.append(
+                    TaggedItem(
+                        content_type=content_type, object_id=article.pk, tag_id=pk
+                    )
+                )
+                tag_pks.add(pk)
+        Article.authors.through.objects.bulk_create(through)
+        TaggedItem.objects.bulk_create(tagged)
+
+        # What the signals do on save, for the whole batch at once
+        update_search_vector(Article.objects.filter(pk__in=[a.pk for a in articles]))
+        issue_pks = {article.issue_id for article in articles}
+        journal_pks = {row["journal"] for row in batch}
+        refresh_issue_counts(issue_pks)
+        refresh_journal_counts(journal_pks)
+        refresh_author_counts(author_pks)
+        refresh_tag_counts(tag_pks)
+        purge(
+            "home",
+            "journals",
+            *[object_tag(Issue, pk) for pk in issue_pks],
+            *[f"issue-articles:{pk}" for pk in issue_pks],
+            *[object_tag(Journal, pk) for pk in journal_pks],
+            *[f"journal-issues:{pk}" for pk in journal_pks],
+        )
+
+    def create_issues(self, batch):
+        new = {}
+        for row in batch:
+            key = row["journal"], row["issue"]
+            if key not in self.issues and key not in new:
+                new[key] = Issue(
+                    name=row["issue"],
+                    slug=_slug(row["issue"]),
+                    date=row["issue_date"],
+                    volume=row["issue_volume"],
+                    journal_id=row["journal"],
+                    created_by=self.user,
+                )
+        Issue.objects.bulk_create(new.values())
+        for key, issue in new.items():
+            self.issues[key] = issue.pk, issue.date
+        self.created["issues"] += len(new)
+
+    def create_authors(self, batch):
+        new = {}
+        for row in batch:
+            for name in row["authors"]:
+                key = name.casefold()
+                if key not in self.authors and key not in new:
+                    first_name, _, last_name = name.rpartition(" ")
+                    new[key] = Author(
+                        name=name,
+                        first_name=first_name,
+                        last_name=last_name,
+                        slug=_slug(f"{first_name}-{last_name}"),
+                    )
+        Author.objects.bulk_create(new.values())
+        for key, author in new.items():
+            self.authors[key] = author.pk
+        self.created["authors"] += len(new)
+
+    def create_tags(self, batch):
+        new = {}
+        for row in batch:
+            for name in row["tags"]:
+                key = _tag_key(name)
+                if key not in self.tags and key not in new:
+                    tag = Tag(name=name)
+                    tag.slug = self.tag_slug(tag)
+                    new[key] = tag
+        Tag.objects.bulk_create(new.values())
+        for key, tag in new.items():
+            self.tags[key] = tag.pk
+        self.created["tags"] += len(new)
+
+    def tag_slug(self, tag):
+        # Numbered like taggit does when the slug is taken
+        slug = tag.slugify(tag.name)
+        i = 1
+        while slug in self.tag_slugs:
+            slug = tag.slugify(tag.name, i)
+            i += 1
+        self.tag_slugs.add(slug)
+        return slug
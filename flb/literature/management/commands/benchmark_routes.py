@@ -0,0 +1,513 @@
+"""
+Load test of the literature routes and the home page, in process with the
+Django test client, see the "Route benchmarks" section of the README.
+"""
+
+import json
+import platform
+import random
+import threading
+from collections import Counter
+from datetime import datetime
+from math import ceil
+from time import perf_counter
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import QueryDict
+from django.test import Client, override_settings
+from django.urls import reverse
+from taggit.models import Tag
+
+from flb.literature import urls as literature_urls
+from flb.literature.models import Article, Author, Book, Issue, Journal
+from flb.utils.querycount import QueryRecorder
+
+# Objects of each model the detail and form routes pick from
+SAMPLE_SIZE = 50
+
+PERCENTILES = (50, 95, 99)
+
+# The first bytes of a PDF, as asked for by the PDF viewers of browsers
+RANGE = "bytes=0-65535"
+
+
+def percentile(values, p):
+    """The nearest rank percentile of a sorted list."""
+    if not values:
+        return None
+    return values[max(ceil(p / 100 * len(values)) - 1, 0)]
+
+
+def summary(values):
+    values = sorted(values)
+    stats = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+    stats["mean"] = sum(values) / len(values) if values else None
+    stats["max"] = values[-1] if values else None
+    return stats
+
+
+class Case:
+    """
+    A route with its mix of parameters: urls() returns a fresh url (and
+    extra headers) per request, user is logged in when set.
+    """
+
+    def __init__(self, name, route, urls, user=False, headers=None):
+        self.name = name
+        self.route = route
+        self.urls = urls
+        self.user = user
+        self.headers = headers or {}
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every literature route and the home page with realistic "
+        "parameters, and report the latency percentiles, queries and bytes "
+        "per route."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            help="Replace the data with generate_data --scale first.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of generate_data and of the parameter mixes.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=50,
+            help="Number of requests per route and parameter mix.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Number of threads sending requests at the same time.",
+        )
+        parser.add_argument(
+            "--route",
+            action="append",
+            default=[],
+            help="Only run the cases with this name or route, can be repeated.",
+        )
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Clear the cache before every request.",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--compare", help="Print the changes from the results in this JSON file."
+        )
+        parser.add_argument(
+            "--noinput",
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Do not ask before generate_data deletes the existing rows.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+        if options["scale"] is not None:
+            call_command(
+                "generate_data",
+                scale=options["scale"],
+                seed=options["seed"],
+                interactive=options["interactive"],
+                stdout=self.stdout,
+            )
+
+        self.random = random.Random(options["seed"])
+        self.user = self.benchmark_user()
+        cases, skipped = self.cases()
+        if options["route"]:
+            cases = [
+                case
+                for case in cases
+                if case.name in options["route"] or case.route in options["route"]
+            ]
+            if not cases:
+                raise CommandError("No case matches --route.")
+
+        results = {
+            "meta": self.meta(options, skipped),
+            "routes": {},
+        }
+        # The test client host, and https for SECURE_SSL_REDIRECT
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for case in cases:
+                results["routes"][case.name] = self.run_case(case, options)
+                self.report(case.name, results["routes"][case.name])
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                self.compare(json.load(file), results)
+
+    def benchmark_user(self):
+        user, _ = get_user_model().objects.get_or_create(
+            username="benchmark", defaults={"email": "benchmark@example.com"}
+        )
+        # The issue and import forms list the journals of their editor
+        for journal in Journal.objects.order_by("pk")[:3]:
+            journal.editors.add(user)
+        return user
+
+    def meta(self, options, skipped):
+        return {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "seed": options["seed"],
+            "scale": options["scale"],
+            "requests": options["requests"],
+            "concurrency": options["concurrency"],
+            "cold": options["cold"],
+            "keyset_pagination": settings.LITERATURE_KEYSET_PAGINATION,
+            "parallel_threads": settings.PARALLEL_THREADS,
+            "page_cache_timeout": settings.PAGE_CACHE_TIMEOUT,
+            "rows": {
+                model._meta.model_name: model.objects.count()
+                for model in (Journal, Issue, Article, Book, Author, Tag)
+            },
+            "skipped": skipped,
+        }
+
+    # ********** PARAMETER MIXES **********
+
+    def sample(self, queryset, field):
+        # Picked with the seeded generator, so runs request the same urls
+        values = list(queryset.order_by("pk").values_list(field, flat=True))
+        return self.random.sample(values, min(len(values), SAMPLE_SIZE))
+
+    def cases(self):
+        """The cases of every route, and the routes skipped for lack of data."""
+        choice = self.random.choice
+        skipped = []
+
+        journals = self.sample(Journal.objects, "slug")
+        issue_slugs = self.sample(Issue.objects, "slug")
+        issue_pks = self.sample(Issue.objects, "pk")
+        article_slugs = self.sample(Article.objects, "slug")
+        article_pks = self.sample(Article.objects, "pk")
+        book_slugs = self.sample(Book.objects, "slug")
+        authors = self.sample(Author.objects, "slug")
+        author_pks = self.sample(Author.objects, "pk")
+        author_names = self.sample(Author.objects.exclude(name=""), "name")
+        tags = self.sample(Tag.objects, "name")
+        tag_pks = self.sample(Tag.objects, "pk")
+        years = sorted(
+            {
+                str(year)
+                for year in Article.objects.exclude(pub_date=None)
+                .values_list("pub_date__year", flat=True)
+                .distinct()
+            }
+        )
+        words = [name.split()[0] for name in self.sample(Article.objects, "name")]
+        if not (journals and issue_slugs and article_slugs and book_slugs and authors):
+            raise CommandError(
+                "There is not enough data, run with --scale or generate_data first."
+            )
+
+        def url(name, *args, **params):
+            return f"{reverse(name, args=args)}?{self.urlencode(params)}"
+
+        def some(values, most=3):
+            return self.random.sample(
+                values, min(len(values), self.random.randint(1, most))
+            )
+
+        article_pages = ceil(Article.objects.count() / 10)
+        book_pages = ceil(Book.objects.count() / 5)
+        search = "literature:search"
+        cases = [
+            Case("home", "mainsite:home", lambda: reverse("mainsite:home")),
+            Case(
+                "journal-list",
+                "literature:journal-list",
+                lambda: url(
+                    "literature:journal-list",
+                    sort=choice(["", "name", "issues", "articles"]),
+                ),
+            ),
+            Case(
+                "journal-detail",
+                "literature:journal-detail",
+                lambda: url("literature:journal-detail", choice(journals)),
+            ),
+            Case(
+                "issue-detail",
+                "literature:issue-detail",
+                lambda: url("literature:issue-detail", choice(issue_slugs)),
+            ),
+            Case(
+                "article-list",
+                "literature:article-list",
+                lambda: url(
+                    "literature:article-list",
+                    tags=some(tag_pks),
+                    authors=some(author_pks, 1),
+                ),
+            ),
+            Case(
+                "article-detail",
+                "literature:article-detail",
+                lambda: url("literature:article-detail", choice(article_slugs)),
+            ),
+            Case(
+                "book-list",
+                "literature:book-list",
+                lambda: url(
+                    "literature:book-list",
+                    **(
+                        {}
+                        if settings.LITERATURE_KEYSET_PAGINATION
+                        else {"page": self.random.randint(1, book_pages)}
+                    ),
+                ),
+            ),
+            Case(
+                "book-detail",
+                "literature:book-detail",
+                lambda: url("literature:book-detail", choice(book_slugs)),
+            ),
+            Case(
+                "author-detail",
+                "literature:author-detail",
+                lambda: url("literature:author-detail", choice(authors)),
+            ),
+            Case("search", search, lambda: url(search)),
+            Case("search q", search, lambda: url(search, q=choice(words))),
+            Case("search q year", search, lambda: url(search, q=choice(years))),
+            Case("search tags", search, lambda: url(search, tags=some(tags))),
+            Case(
+                "search authors",
+                search,
+                lambda: url(search, authors=some(author_names, 2)),
+            ),
+            Case("search years", search, lambda: url(search, years=some(years))),
+            Case(
+                "search mixed",
+                search,
+                lambda: url(
+                    search,
+                    q=choice(words),
+                    tags=some(tags, 2),
+                    years=some(years, 2),
+                    file=choice(["", "on"]),
+                ),
+            ),
+        ]
+        if not settings.LITERATURE_KEYSET_PAGINATION:
+            # The last pages, where offset pagination is at its slowest
+            cases.append(
+                Case(
+                    "search deep page",
+                    search,
+                    lambda: url(
+                        search,
+                        **{
+                            "a-page": self.random.randint(
+                                max(article_pages // 2, 1), article_pages
+                            )
+                        },
+                    ),
+                )
+            )
+        for file_format in ("csv", "json", "bib"):
+            for results in ("articles", "books"):
+                cases.append(
+                    Case(
+                        f"search-export {results}.{file_format}",
+                        "literature:search-export",
+                        lambda results=results, file_format=file_format: url(
+                            "literature:search-export",
+                            results,
+                            file_format,
+                            tags=some(tags, 1),
+                        ),
+                    )
+                )
+
+        # The form pages are only requested, nothing is posted
+        forms = {
+            "issue-create": lambda: url("literature:issue-create"),
+            "issue-update": lambda: url("literature:issue-update", choice(issue_pks)),
+            "issue-delete": lambda: url("literature:issue-delete", choice(issue_pks)),
+            "article-create": lambda: url(
+                "literature:article-create", choice(issue_pks)
+            ),
+            "article-import": lambda: url("literature:article-import"),
+            "article-update": lambda: url(
+                "literature:article-update", choice(article_pks)
+            ),
+            "article-delete": lambda: url(
+                "literature:article-delete", choice(article_pks)
+            ),
+            "author-create": lambda: url("literature:author-create"),
+            "author-update": lambda: url(
+                "literature:author-update", choice(author_pks)
+            ),
+            "author-delete": lambda: url(
+                "literature:author-delete", choice(author_pks)
+            ),
+        }
+        for name, urls in forms.items():
+            cases.append(Case(name, f"literature:{name}", urls, user=True))
+
+        for model in (Article, Issue, Book):
+            name = f"{model._meta.model_name}-file"
+            slugs = self.sample(model.objects.exclude(file=""), "slug")
+            if not slugs:
+                skipped.append(f"literature:{name}")
+                continue
+            route = f"literature:{name}"
+
+            def file_url(route=route, slugs=slugs):
+                return url(route, choice(slugs))
+
+            cases.append(Case(name, route, file_url))
+            cases.append(
+                Case(f"{name} range", route, file_url, headers={"HTTP_RANGE": RANGE})
+            )
+
+        missing = self.routes() - {case.route for case in cases} - set(skipped)
+        if missing:
+            raise CommandError(f"No case for {', '.join(sorted(missing))}.")
+        return cases, skipped
+
+    def routes(self):
+        return {"mainsite:home"} | {
+            f"{literature_urls.app_name}:{pattern.name}"
+            for pattern in literature_urls.urlpatterns
+        }
+
+    def urlencode(self, params):
+        query = QueryDict(mutable=True)
+        for key, value in params.items():
+            if value in ("", [], None):
+                continue
+            if isinstance(value, list):
+                query.setlist(key, [str(v) for v in value])
+            else:
+                query[key] = str(value)
+        return query.urlencode()
+
+    # ********** RUNNING **********
+
+    def run_case(self, case, options):
+        requests = [case.urls() for _ in range(options["requests"])]
+        samples = []
+        lock = threading.Lock()
+
+        def work(urls):
+            client = Client()
+            if case.user:
+                client.force_login(self.user)
+            recorder = QueryRecorder()
+            try:
+                with connection.execute_wrapper(recorder):
+                    for url in urls:
+                        if options["cold"]:
+                            cache.clear()
+                        queries = recorder.count
+                        start = perf_counter()
+                        response = client.get(url, secure=True, **case.headers)
+                        if response.streaming:
+                            size = sum(
+                                len(chunk) for chunk in response.streaming_content
+                            )
+                        else:
+                            size = len(response.content)
+                        elapsed = (perf_counter() - start) * 1000
+                        with lock:
+                            samples.append(
+                                (
+                                    elapsed,
+                                    recorder.count - queries,
+                                    size,
+                                    response.status_code,
+                                )
+                            )
+            finally:
+                # Threads don't close their connections by themselves
+                if threading.current_thread() is not threading.main_thread():
+                    connection.close()
+
+        concurrency = options["concurrency"]
+        if concurrency == 1:
+            work(requests)
+        else:
+            threads = [
+                threading.Thread(target=work, args=(requests[i::concurrency],))
+                for i in range(concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        latencies, queries, sizes, statuses = zip(*samples)
+        return {
+            "route": case.route,
+            "requests": len(samples),
+            "status": {
+                str(status): n for status, n in sorted(Counter(statuses).items())
+            },
+            "latency_ms": summary(latencies),
+            "queries": summary(queries),
+            "bytes": summary(sizes),
+        }
+
+    # ********** REPORTING **********
+
+    def report(self, name, stats):
+        latency = stats["latency_ms"]
+        status = ", ".join(f"{s}: {n}" for s, n in stats["status"].items())
+        self.stdout.write(
+            f"{name:<42}"
+            f"p50 {latency['p50']:8.1f}ms  p95 {latency['p95']:8.1f}ms  "
+            f"p99 {latency['p99']:8.1f}ms  "
+            f"queries {stats['queries']['mean']:5.1f}  "
+            f"bytes {stats['bytes']['mean']:10.0f}  ({status})"
+        )
+
+    def compare(self, old, new):
+        self.stdout.write(f"\nChanges since {old['meta'].get('date', 'the last run')}")
+        for name, stats in new["routes"].items():
+            before = old["routes"].get(name)
+            if before is None:
+                self.stdout.write(f"{name:<42}new")
+                continue
+            changes = []
+            for key, label in (
+                (("latency_ms", "p95"), "p95"),
+                (("queries", "mean"), "queries"),
+                (("bytes", "mean"), "bytes"),
+            ):
+                a = before[key[0]][key[1]]
+                b = stats[key[0]][key[1]]
+                change = f"{(b - a) / a * 100:+.0f}%" if a else f"{b - a:+.0f}"
+                changes.append(f"{label} {change:>6}")
+            self.stdout.write(f"{name:<42}" + "  ".join(changes))
+        for name in old["routes"].keys() - new["routes"].keys():
+            self.stdout.write(f"{name:<42}gone")
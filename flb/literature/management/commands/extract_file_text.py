@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from flb.literature.filetext import update_file_text
+from flb.literature.models import Article, Book, Issue
+
+
+class Command(BaseCommand):
+    help = "Extract the searched text of the article, issue and book PDFs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Extract it again, after changing LITERATURE_FILE_TEXT_LIMIT.",
+        )
+
+    def handle(self, *args, **options):
+        for model in (Article, Issue, Book):
+            updated = 0
+            for obj in model.objects.exclude(file="").only("pk", "file").iterator():
+                updated += update_file_text(obj, force=options["force"])
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Updated the file text of {updated} "
+                    f"{model._meta.verbose_name_plural.lower()}"
+                )
+            )
@@ -0,0 +1,327 @@
+import random
+from datetime import date, timedelta
+from time import perf_counter
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.text import Truncator, slugify
+from faker import Faker
+from taggit.models import Tag, TaggedItem
+
+from flb.literature.models import (
+    ABSTRACT_EXCERPT_WORDS,
+    Article,
+    Author,
+    Book,
+    Issue,
+    Journal,
+)
+from flb.mainsite.models import Organization
+from flb.posts.models import Post
+
+# Rows per model at --scale 1, the size of the old dummy_data script
+COUNTS = {
+    Organization: 50,
+    Tag: 200,
+    Author: 500,
+    Journal: 13,
+    Issue: 300,
+    Book: 200,
+    Article: 1000,
+    Post: 200,
+}
+
+JOURNAL_NAMES = [
+    "Lappmeisen",
+    "Fugler i Troms",
+    "Trøndersk Natur",
+    "Rallus",
+    "Fuglar i Hordaland",
+    "Falco",
+    "Piplerka",
+    "Fugler i Aust-Agder",
+    "Fugler i Telemark",
+    "Vestfold-Ornitologen",
+    "Buskskvetten",
+    "Hujon",
+    "Kornkråka",
+]
+
+# Issue and book dates
+FIRST_DATE = date(2000, 1, 1)
+DATE_RANGE = (date(2020, 12, 31) - FIRST_DATE).days + 1
+
+# Faker is only used to fill these pools once, the rows are put together
+# from them with the seeded random generator, which is much faster
+POOL_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Replace the organizations, literature, tags and posts with a generated "
+        "dataset. The same --seed and --scale always give the same rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1,
+            help="Multiplier of the number of rows, 1 gives 1000 articles.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of rows inserted per statement.",
+        )
+        parser.add_argument(
+            "--noinput",
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Do not ask before deleting the existing rows.",
+        )
+
+    def handle(self, *args, **options):
+        if options["scale"] <= 0:
+            raise CommandError("--scale must be positive.")
+        if options["interactive"]:
+            answer = input(
+                "This deletes every organization, author, journal, issue, "
+                "article, book, tag and post. Type 'yes' to continue: "
+            )
+            if answer != "yes":
+                raise CommandError("Cancelled.")
+
+        self.batch_size = options["batch_size"]
+        self.counts = {
+            model: max(1, round(count * options["scale"]))
+            for model, count in COUNTS.items()
+        }
+        self.random = random.Random(options["seed"])
+        fake = Faker()
+        fake.seed_instance(options["seed"])
+        self.words = fake.get_words_list()
+        self.first_names = [fake.first_name() for _ in range(POOL_SIZE)]
+        self.last_names = [fake.last_name() for _ in range(POOL_SIZE)]
+        self.companies = [fake.company() for _ in range(POOL_SIZE)]
+
+        with transaction.atomic():
+            self.truncate()
+            self.generate_all()
+
+        # The counters and search vectors are normally kept up to date by
+        # signals, which bulk_create does not send
+        call_command("update_search_vectors", stdout=self.stdout)
+        call_command("repair_counters", stdout=self.stdout)
+        # Cached cards, pages and facets may show objects that are gone
+        cache.clear()
+
+    def truncate(self):
+        models = [Organization, Tag, Author, Journal, Issue, Article, Book, Post]
+        tables = ", ".join(
+            connection.ops.quote_name(model._meta.db_table) for model in models
+        )
+        with connection.cursor() as cursor:
+            # Deferred foreign key checks of this transaction block TRUNCATE
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            # The sequences are restarted as well, so the pks are repeatable
+            cursor.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+
+    def generate_all(self):
+        rng = self.random
+        org_pks = self.generate(
+            Organization,
+            lambda i: Organization(
+                name=rng.choice(self.companies), desc=self.text(100, 200)
+            ),
+        )
+        tag_pks = self.generate(Tag, self.build_tag)
+        author_pks = self.generate(
+            Author, lambda i: self.build_author(i, rng.choice(org_pks))
+        )
+
+        journal_pks = self.generate(
+            Journal, lambda i: self.build_journal(i, rng.choice(org_pks))
+        )
+
+        issue_dates = {}
+
+        def keep_dates(issues):
+            issue_dates.update((issue.pk, issue.date) for issue in issues)
+
+        self.generate(
+            Issue,
+            lambda i: self.build_issue(
+                i, rng.choice(journal_pks), rng.choice(author_pks)
+            ),
+            keep_dates,
+        )
+        issue_pks = list(issue_dates)
+
+        self.generate(
+            Book,
+            self.build_book,
+            lambda books: self.add_related(Book, books, author_pks, 4, tag_pks),
+        )
+        self.generate(
+            Article,
+            lambda i: self.build_article(i, rng.choice(issue_pks), issue_dates),
+            lambda articles: self.add_related(
+                Article, articles, author_pks, 3, tag_pks
+            ),
+        )
+        self.generate(Post, self.build_post)
+
+    def generate(self, model, build, related=None):
+        """
+        Insert the rows of a model in batches of build(index), calling
+        related(objects) after each batch. Returns the pks.
+        """
+        start = perf_counter()
+        count = self.counts[model]
+        pks = []
+        for offset in range(0, count, self.batch_size):
+            objects = model.objects.bulk_create(
+                [build(i) for i in range(offset, min(offset + self.batch_size, count))]
+            )
+            if related:
+                related(objects)
+            pks.extend(obj.pk for obj in objects)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {count} {model._meta.verbose_name_plural.lower()} "
+                f"in {perf_counter() - start:.1f}s"
+            )
+        )
+        return pks
+
+    def bulk(self, objects):
+        objects = list(objects)
+        if objects:
+            type(objects[0]).objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def pick(self, pks, most):
+        count = min(len(pks), self.random.randint(1, most))
+        return self.random.sample(pks, count)
+
+    def add_related(self, model, objects, author_pks, max_authors, tag_pks):
+        through = model.authors.through
+        owner = f"{model._meta.model_name}_id"
+        self.bulk(
+            through(**{owner: obj.pk, "author_id": author_pk})
+            for obj in objects
+            for author_pk in self.pick(author_pks, max_authors)
+        )
+        content_type = ContentType.objects.get_for_model(model)
+        self.bulk(
+            TaggedItem(content_type=content_type, object_id=obj.pk, tag_id=tag_pk)
+            for obj in objects
+            for tag_pk in self.pick(tag_pks, 5)
+        )
+
+    # Text and values
+
+    def text(self, min_chars, max_chars):
+        length = self.random.randint(min_chars, max_chars)
+        words = self.random.choices(self.words, k=length // 6 + 1)
+        return (" ".join(words)[: length - 1].capitalize()).rstrip() + "."
+
+    def date(self):
+        return FIRST_DATE + timedelta(days=self.random.randrange(DATE_RANGE))
+
+    def digits(self, length):
+        return "".join(self.random.choices("0123456789", k=length))
+
+    def link(self, slug):
+        return f"https://example.org/{slug}"
+
+    # Rows, slugs are set here since bulk_create skips save()
+
+    def build_tag(self, i):
+        # Numbered once the word list is used up, tag names are unique
+        word = self.words[i % len(self.words)]
+        name = word if i < len(self.words) else f"{word} {i // len(self.words)}"
+        return Tag(name=name, slug=slugify(name))
+
+    def build_author(self, i, org_pk):
+        first_name = self.random.choice(self.first_names)
+        last_name = self.random.choice(self.last_names)
+        return Author(
+            name=f"{first_name} {last_name}",
+            first_name=first_name,
+            last_name=last_name,
+            slug=slugify(f"{first_name}-{last_name}-{i}"),
+            org_id=org_pk,
+        )
+
+    def build_journal(self, i, org_pk):
+        name = JOURNAL_NAMES[i % len(JOURNAL_NAMES)]
+        if i >= len(JOURNAL_NAMES):
+            name = f"{name} {i // len(JOURNAL_NAMES) + 1}"
+        slug = slugify(f"{name}-{i}")
+        return Journal(
+            name=name,
+            slug=slug,
+            desc=self.text(100, 500),
+            link=self.link(slug),
+            publisher_id=org_pk,
+        )
+
+    def build_issue(self, i, journal_pk, redactor_pk):
+        issue_date = self.date()
+        name = issue_date.strftime("%B, %Y")
+        slug = slugify(f"{name}-{i}")
+        return Issue(
+            name=name,
+            slug=slug,
+            volume=self.random.randint(1, 5),
+            date=issue_date,
+            issn=self.digits(13),
+            desc=self.text(100, 500),
+            link=self.link(slug),
+            redactor_id=redactor_pk,
+            journal_id=journal_pk,
+        )
+
+    def build_book(self, i):
+        name = self.text(10, 50)
+        slug = slugify(f"{name}-{i}")
+        return Book(
+            name=name,
+            slug=slug,
+            desc=self.text(100, 250),
+            link=self.link(slug),
+            date=self.date(),
+            issn=self.digits(13),
+        )
+
+    def build_article(self, i, issue_pk, issue_dates):
+        name = self.text(50, 100)
+        slug = slugify(f"{name}-{i}")
+        abstract = self.text(100, 500)
+        return Article(
+            name=name,
+            slug=slug,
+            abstract=abstract,
+            abstract_excerpt=Truncator(abstract).words(ABSTRACT_EXCERPT_WORDS),
+            text=self.text(500, 2000),
+            link=self.link(slug),
+            issue_id=issue_pk,
+            pub_date=issue_dates[issue_pk],
+        )
+
+    def build_post(self, i):
+        first_name = self.random.choice(self.first_names)
+        last_name = self.random.choice(self.last_names)
+        return Post(
+            name=self.text(10, 50),
+            text=self.text(100, 500),
+            author=f"{first_name} {last_name}",
+        )
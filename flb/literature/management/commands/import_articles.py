@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from flb.literature.imports import BATCH_SIZE, READERS, ArticleImporter, InvalidRow
+
+
+class Command(BaseCommand):
+    help = (
+        "Import articles, with their issues, authors and tags, from a CSV or "
+        "JSON lines file. See flb.literature.imports for the columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='The file to import, "-" for stdin.')
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="The file format, by default from the file extension.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Number of articles inserted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or Path(path).suffix.lstrip(".").lower()
+        if file_format not in READERS:
+            raise CommandError("Use --format to give the format of the file.")
+
+        importer = ArticleImporter(batch_size=options["batch_size"])
+        if path == "-":
+            stream = sys.stdin
+        else:
+            stream = open(path, newline="", encoding="utf-8-sig")
+        try:
+            created = importer.run(READERS[file_format](stream))
+        except InvalidRow as e:
+            raise CommandError(f"Nothing was imported. {e}")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Imported {articles} articles, created {issues} issues, "
+                "{authors} authors and {tags} tags".format_map(created)
+            )
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from flb.literature.covers import update_renditions
+from flb.literature.models import Book, Issue, Journal
+
+
+class Command(BaseCommand):
+    help = "Make the resized renditions of the journal, issue and book covers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Make them again, after changing the LITERATURE_COVER_ settings.",
+        )
+
+    def handle(self, *args, **options):
+        for model in (Journal, Issue, Book):
+            updated = 0
+            for obj in model.objects.only(
+                "pk", "f_cover", "b_cover", "cover_renditions"
+            ).iterator():
+                updated += update_renditions(obj, force=options["force"])
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Updated the covers of {updated} "
+                    f"{model._meta.verbose_name_plural.lower()}"
+                )
+            )
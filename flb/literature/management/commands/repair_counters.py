@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from taggit.models import Tag
+
+from flb.literature.counters import (
+    refresh_author_counts,
+    refresh_issue_counts,
+    refresh_journal_counts,
+    refresh_tag_counts,
+)
+from flb.literature.models import Author, Issue, Journal
+from flb.utils.pagecache import purge
+
+COUNTERS = (
+    (Journal, refresh_journal_counts),
+    (Issue, refresh_issue_counts),
+    (Author, refresh_author_counts),
+    (Tag, refresh_tag_counts),
+)
+
+
+class Command(BaseCommand):
+    help = "Recompute the counter columns of journals, issues, authors and tags."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of rows updated per statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        for model, refresh in COUNTERS:
+            qs = model.objects.order_by("pk")
+            updated = 0
+            last_pk = 0
+            while True:
+                pks = list(
+                    qs.filter(pk__gt=last_pk).values_list("pk", flat=True)[:batch_size]
+                )
+                if not pks:
+                    break
+                updated += refresh(pks)
+                last_pk = pks[-1]
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Updated the counts of {updated} "
+                    f"{model._meta.verbose_name_plural.lower()}"
+                )
+            )
+        purge("journals")
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from flb.literature.search import SEARCHABLE_MODELS, update_search_vector
+
+
+class Command(BaseCommand):
+    help = "Backfill the full text search_vector column of articles and books."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Number of rows updated per statement.",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only update rows that have no search vector yet.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        for model in SEARCHABLE_MODELS:
+            qs = model.objects.order_by("pk")
+            if options["missing"]:
+                qs = qs.filter(search_vector__isnull=True)
+
+            updated = 0
+            last_pk = 0
+            while True:
+                pks = list(
+                    qs.filter(pk__gt=last_pk).values_list("pk", flat=True)[:batch_size]
+                )
+                if not pks:
+                    break
+                updated += update_search_vector(model.objects.filter(pk__in=pks))
+                last_pk = pks[-1]
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Updated {updated} {model._meta.verbose_name_plural.lower()}"
+                )
+            )
@@ -0,0 +1,20 @@
+# Generated by Django 3.1.13 on 2026-10-18 17:09
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('literature', '0002_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='author',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='literature_author_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
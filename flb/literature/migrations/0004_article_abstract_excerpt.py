@@ -0,0 +1,33 @@
+# Generated by Django 3.1.13 on 2026-10-18 19:02
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_abstract_excerpt(apps, schema_editor):
+    Article = apps.get_model('literature', 'Article')
+    articles = Article.objects.only('abstract').order_by('pk')
+    batch = []
+    for article in articles.iterator(chunk_size=2000):
+        article.abstract_excerpt = Truncator(article.abstract).words(50)
+        batch.append(article)
+        if len(batch) == 2000:
+            Article.objects.bulk_update(batch, ['abstract_excerpt'])
+            batch = []
+    Article.objects.bulk_update(batch, ['abstract_excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('literature', '0003_author_name_trgm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='abstract_excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name="Article's abstract excerpt"),
+        ),
+        migrations.RunPython(fill_abstract_excerpt, migrations.RunPython.noop),
+    ]
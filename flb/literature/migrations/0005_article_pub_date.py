@@ -0,0 +1,36 @@
+# Generated by Django 3.1.13 on 2026-10-18 20:14
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_pub_date(apps, schema_editor):
+    Article = apps.get_model('literature', 'Article')
+    Issue = apps.get_model('literature', 'Issue')
+    Article.objects.update(
+        pub_date=Subquery(Issue.objects.filter(pk=OuterRef('issue_id')).values('date')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('literature', '0004_article_abstract_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='pub_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Publishing date'),
+        ),
+        migrations.RunPython(fill_pub_date, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='article',
+            options={'ordering': ['-pub_date', 'name'], 'verbose_name': 'Article', 'verbose_name_plural': 'Articles'},
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-pub_date', 'name', 'id'], name='literature_article_pub_date'),
+        ),
+    ]
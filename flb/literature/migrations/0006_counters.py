@@ -0,0 +1,47 @@
+# Generated by Django 3.1.13 on 2026-10-18 21:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taggit', '0003_taggeditem_add_unique_index'),
+        ('literature', '0005_article_pub_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='article_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of articles'),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='article_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of articles'),
+        ),
+        migrations.AddField(
+            model_name='journal',
+            name='article_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of articles'),
+        ),
+        migrations.AddField(
+            model_name='journal',
+            name='issue_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of issues'),
+        ),
+        migrations.CreateModel(
+            name='TagUsage',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='usage', serialize=False, to='taggit.tag', verbose_name='Tag')),
+                ('article_count', models.PositiveIntegerField(default=0, verbose_name='Number of articles')),
+                ('book_count', models.PositiveIntegerField(default=0, verbose_name='Number of books')),
+            ],
+            options={
+                'verbose_name': 'Tag usage',
+                'verbose_name_plural': 'Tag usages',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.1.13 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('literature', '0006_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='cover_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Cover renditions'),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='cover_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Cover renditions'),
+        ),
+        migrations.AddField(
+            model_name='journal',
+            name='cover_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Cover renditions'),
+        ),
+    ]
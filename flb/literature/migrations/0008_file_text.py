@@ -0,0 +1,42 @@
+# Generated by Django 3.1.13 on 2026-10-19 14:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('literature', '0007_cover_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileText',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Object id')),
+                ('file_name', models.CharField(max_length=255, verbose_name='File name')),
+                ('text', models.TextField(blank=True, verbose_name='Text')),
+                ('pages', models.PositiveIntegerField(default=0, verbose_name='Number of pages')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Search vector')),
+                ('extracted_at', models.DateTimeField(auto_now=True, verbose_name='Extracted on')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='Content type')),
+            ],
+            options={
+                'verbose_name': 'File text',
+                'verbose_name_plural': 'File texts',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='filetext',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='literature__search__5cfff8_gin'),
+        ),
+        migrations.AddConstraint(
+            model_name='filetext',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='literature_filetext_object'),
+        ),
+    ]
@@ -1,11 +1,107 @@
 from django.conf import settings
-from django.db import models
-from django.db.models import Q
+from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField,
+    TrigramSimilarity,
+)
+from django.db import connections, models
+from django.db.models import Exists, F, FloatField, OuterRef, Prefetch, Q, lookups
+from django.db.models.functions import Cast
 from django.urls import reverse  # just to chill pylance
 from django.utils.crypto import get_random_string
-from django.utils.text import slugify
+from django.utils.text import Truncator, slugify
 from django.utils.translation import gettext as _  # just to chill pylance
 from taggit.managers import TaggableManager
+from taggit.models import TaggedItem
+
+
+# A Postgres icontains as "name ILIKE '%term%'": the built-in icontains
+# compiles to UPPER(name) LIKE UPPER(...), which a gin_trgm_ops index on the
+# column can't serve.
+@models.CharField.register_lookup
+class ILikeContains(lookups.IContains):
+    lookup_name = "ilike_contains"
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", lhs_params + rhs_params
+
+
+# Correlated EXISTS over the authors of a model instead of a join, so author
+# conditions never multiply the rows and need no distinct(). The lookups are
+# on the through model, e.g. author__name__in=names.
+def authors_exist(model, *args, **lookups):
+    through = model.authors.through
+    return Exists(
+        through.objects.filter(
+            *args, **{model._meta.model_name: OuterRef("pk")}, **lookups
+        )
+    )
+
+
+# The same for tags, with lookups on the tagged items, e.g. tag__name__in=names
+def tags_exist(model, *args, **lookups):
+    return Exists(
+        TaggedItem.objects.filter(
+            *args,
+            content_type=ContentType.objects.get_for_model(model),
+            object_id=OuterRef("pk"),
+            **lookups,
+        )
+    )
+
+
+# Full text search over the maintained search_vector column, ranked by relevance.
+# The text of the objects file also matches, ranked below the rest, and digit
+# queries also match the publishing year through year_lookup.
+def fulltext_search(qs, query, year_lookup=None):
+    if not query.strip():
+        return qs
+    search_query = SearchQuery(
+        query, config=settings.LITERATURE_SEARCH_CONFIG, search_type="websearch"
+    )
+    lookup = Q(search_vector=search_query) | Q(file_text_matches(qs.model, query))
+    if year_lookup and query.isdigit():
+        lookup |= Q(**{year_lookup: query})
+    # As double precision, so the rank survives a keyset cursor round trip
+    rank = Cast(SearchRank(F("search_vector"), search_query), FloatField())
+    return (
+        qs.filter(lookup)
+        .annotate(rank=rank)
+        .order_by("-rank", *qs.model._meta.ordering)
+    )
+
+
+# Whether the text extracted from the file of an object matches the query
+def file_text_matches(model, query):
+    search_query = SearchQuery(
+        query, config=settings.LITERATURE_SEARCH_CONFIG, search_type="websearch"
+    )
+    return Exists(
+        FileText.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+            object_id=OuterRef("pk"),
+            search_vector=search_query,
+        )
+    )
+
+
+# Author name lookups for the icontains search, on the through model
+def author_name_lookup(query):
+    return (
+        Q(author__first_name__icontains=query)
+        | Q(author__last_name__icontains=query)
+        | Q(author__name__icontains=query)
+    )
+
+
+# Words of the abstract kept in Article.abstract_excerpt for the cards
+ABSTRACT_EXCERPT_WORDS = 50
 
 
 # The manager for searching after a keyword
@@ -14,26 +110,16 @@ class BookManager(models.Manager):
     def search(self, query=None):
         qs = self.get_queryset()
         if query is not None:
+            if connections[self.db].vendor == "postgresql":
+                return fulltext_search(qs, query, year_lookup="date__year")
+            or_lookup = (
+                Q(name__icontains=query)
+                | Q(authors_exist(self.model, author_name_lookup(query)))
+                | Q(tags_exist(self.model, tag__name__in=[query]))
+            )
             if query.isdigit():
-                or_lookup = (
-                    Q(name__icontains=query)
-                    | Q(date__year=query)
-                    | Q(authors__first_name__icontains=query)
-                    | Q(authors__last_name__icontains=query)
-                    | Q(authors__name__icontains=query)
-                    | Q(tags__name__in=[query])
-                )
-            else:
-                or_lookup = (
-                    Q(name__icontains=query)
-                    | Q(authors__first_name__icontains=query)
-                    | Q(authors__last_name__icontains=query)
-                    | Q(authors__name__icontains=query)
-                    | Q(tags__name__in=[query])
-                )
-            qs = qs.filter(
-                or_lookup
-            ).distinct()  # distinct() is often necessary with Q lookups
+                or_lookup |= Q(date__year=query)
+            qs = qs.filter(or_lookup)
         return qs
 
 
@@ -59,6 +145,10 @@ class Book(models.Model):
     b_cover = models.ImageField(
         _("The back cover image"), upload_to="files/books/covers", blank=True, null=True
     )
+    # Sizes of the resized covers, see flb.literature.covers
+    cover_renditions = models.JSONField(
+        _("Cover renditions"), default=dict, blank=True, editable=False
+    )
     volume = models.SmallIntegerField(_("Volume number"), blank=True, null=True)
     date = models.DateField(
         _("Publishing date"), auto_now=False, auto_now_add=False, blank=True, null=True
@@ -67,6 +157,8 @@ class Book(models.Model):
     file = models.FileField(
         _("The Issue file (pdf)"), upload_to="files/books", blank=True
     )
+    # The text of the file, see flb.literature.filetext
+    file_text = GenericRelation("literature.FileText")
     tags = TaggableManager(
         blank=True,
     )
@@ -75,6 +167,9 @@ class Book(models.Model):
     custom_num = models.IntegerField(_("Custom number"), blank=True, null=True)
     custom_bool = models.BooleanField(_("Custom bool"), default=False)
 
+    # Maintained by flb.literature.search, see signals.py
+    search_vector = SearchVectorField(_("Search vector"), null=True, editable=False)
+
     authors = models.ManyToManyField(
         "literature.Author",
         verbose_name=_("Books's authors"),
@@ -113,6 +208,11 @@ class Book(models.Model):
                     "date",
                 ]
             ),
+            GinIndex(
+                fields=[
+                    "search_vector",
+                ]
+            ),
         ]
 
     def __str__(self):
@@ -131,13 +231,22 @@ class Book(models.Model):
         return self.__class__.__name__
 
 
-class JournalManager(models.Manager):
+# Loading profiles: card() for lists of objects, detail() for the page of one
+class JournalQuerySet(models.QuerySet):
+    def card(self):
+        return self.only("id", "name", "slug", "f_cover", "cover_renditions")
+
+    def detail(self):
+        return self.select_related("publisher", "county", "city").prefetch_related(
+            "editors"
+        )
+
+
+class JournalManager(models.Manager.from_queryset(JournalQuerySet)):
     def search(self, query=None):
         qs = self.get_queryset()
         if query is not None:
-            qs = qs.filter(
-                name__icontains=query
-            ).distinct()  # distinct() is often necessary with Q lookups
+            qs = qs.filter(name__icontains=query)
         return qs
 
 
@@ -164,11 +273,23 @@ class Journal(models.Model):
         blank=True,
         null=True,
     )
+    # Sizes of the resized covers, see flb.literature.covers
+    cover_renditions = models.JSONField(
+        _("Cover renditions"), default=dict, blank=True, editable=False
+    )
 
     custom_txt = models.CharField(_("Custom text"), max_length=350, blank=True)
     custom_num = models.IntegerField(_("Custom number"), blank=True, null=True)
     custom_bool = models.BooleanField(_("Custom bool"), default=False)
 
+    # Maintained by flb.literature.counters, see signals.py
+    issue_count = models.PositiveIntegerField(
+        _("Number of issues"), default=0, editable=False
+    )
+    article_count = models.PositiveIntegerField(
+        _("Number of articles"), default=0, editable=False
+    )
+
     editors = models.ManyToManyField(
         settings.AUTH_USER_MODEL, verbose_name=_("Editors of the journal"), blank=True
     )
@@ -230,7 +351,30 @@ class Journal(models.Model):
         return self.__class__.__name__
 
 
-class IssueManager(models.Manager):
+class IssueQuerySet(models.QuerySet):
+    def card(self):
+        return self.select_related("journal").only(
+            "id",
+            "name",
+            "slug",
+            "date",
+            "f_cover",
+            "cover_renditions",
+            "created_at",
+            "updated_at",
+            "created_by",
+            "journal__id",
+            "journal__name",
+            "journal__slug",
+        )
+
+    def detail(self):
+        return self.select_related(
+            "journal", "redactor", "created_by"
+        ).prefetch_related("journal__editors")
+
+
+class IssueManager(models.Manager.from_queryset(IssueQuerySet)):
     def search(self, query=None):
         qs = self.get_queryset()
         if query is not None:
@@ -238,9 +382,9 @@ class IssueManager(models.Manager):
                 or_lookup = Q(name__icontains=query) | Q(date__year=query)
             else:
                 or_lookup = Q(name__icontains=query)
-            qs = qs.filter(
-                or_lookup
-            ).distinct()  # distinct() is often necessary with Q lookups
+            if query.strip() and connections[self.db].vendor == "postgresql":
+                or_lookup |= Q(file_text_matches(self.model, query))
+            qs = qs.filter(or_lookup)
         return qs
 
 
@@ -255,6 +399,8 @@ class Issue(models.Model):
     file = models.FileField(
         _("The Issue file (pdf)"), upload_to="files/issues", blank=True
     )
+    # The text of the file, see flb.literature.filetext
+    file_text = GenericRelation("literature.FileText")
     desc = models.TextField(_("Issue description"), blank=True)
     link = models.CharField(_("Link to journal"), max_length=150, blank=True)
     created_at = models.DateTimeField(
@@ -272,11 +418,20 @@ class Issue(models.Model):
     b_cover = models.ImageField(
         _("The back cover image"), upload_to="files/issues/covers", blank=True
     )
+    # Sizes of the resized covers, see flb.literature.covers
+    cover_renditions = models.JSONField(
+        _("Cover renditions"), default=dict, blank=True, editable=False
+    )
 
     custom_txt = models.CharField(_("Custom text"), max_length=350, blank=True)
     custom_num = models.IntegerField(_("Custom number"), blank=True, null=True)
     custom_bool = models.BooleanField(_("Custom bool"), default=False)
 
+    # Maintained by flb.literature.counters, see signals.py
+    article_count = models.PositiveIntegerField(
+        _("Number of articles"), default=0, editable=False
+    )
+
     redactor = models.ForeignKey(
         "literature.Author",
         verbose_name=_("The redactor of the issue"),
@@ -339,32 +494,57 @@ class Issue(models.Model):
         return self.__class__.__name__
 
 
-class ArticleManager(models.Manager):
+class ArticleQuerySet(models.QuerySet):
+    # Leaves out the text, abstract and search_vector columns, the cards show
+    # the stored abstract_excerpt instead. Views rendering cached cards skip
+    # the prefetching, see flb.literature.cards.
+    def card(self, prefetch=True):
+        qs = self.select_related("issue__journal").only(
+            "id",
+            "name",
+            "slug",
+            "sub",
+            "abstract_excerpt",
+            "created_at",
+            "updated_at",
+            "issue__id",
+            "issue__name",
+            "issue__slug",
+            "pub_date",
+            "issue__date",
+            "issue__journal__id",
+            "issue__journal__name",
+            "issue__journal__slug",
+        )
+        if prefetch:
+            qs = qs.prefetch_related(self.card_authors(), "tags")
+        return qs
+
+    @staticmethod
+    def card_authors():
+        return Prefetch("authors", queryset=Author.objects.only("id", "name", "slug"))
+
+    def detail(self):
+        return self.select_related("issue__journal", "created_by").prefetch_related(
+            "authors", "tags", "article_image_set"
+        )
+
+
+class ArticleManager(models.Manager.from_queryset(ArticleQuerySet)):
     def search(self, query=None):
         qs = self.get_queryset()
         if query is not None:
+            if connections[self.db].vendor == "postgresql":
+                return fulltext_search(qs, query, year_lookup="pub_date__year")
+            or_lookup = (
+                Q(name__icontains=query)
+                | Q(abstract__icontains=query)
+                | Q(authors_exist(self.model, author_name_lookup(query)))
+                | Q(tags_exist(self.model, tag__name__in=[query]))
+            )
             if query.isdigit():
-                or_lookup = (
-                    Q(name__icontains=query)
-                    | Q(abstract__icontains=query)
-                    | Q(issue__date__year=query)
-                    | Q(authors__first_name__icontains=query)
-                    | Q(authors__last_name__icontains=query)
-                    | Q(authors__name__icontains=query)
-                    | Q(tags__name__in=[query])
-                )
-            else:
-                or_lookup = (
-                    Q(name__icontains=query)
-                    | Q(abstract__icontains=query)
-                    | Q(authors__first_name__icontains=query)
-                    | Q(authors__last_name__icontains=query)
-                    | Q(authors__name__icontains=query)
-                    | Q(tags__name__in=[query])
-                )
-            qs = qs.filter(
-                or_lookup
-            ).distinct()  # distinct() is often necessary with Q lookups
+                or_lookup |= Q(pub_date__year=query)
+            qs = qs.filter(or_lookup)
         return qs
 
 
@@ -373,8 +553,13 @@ class Article(models.Model):
     slug = models.SlugField(_("Article Slug"), max_length=255, unique=True, blank=True)
     sub = models.CharField(_("Article's subtitle"), max_length=250, blank=True)
     abstract = models.TextField(_("Article's abstract"), blank=True)
+    abstract_excerpt = models.TextField(
+        _("Article's abstract excerpt"), blank=True, editable=False
+    )
     text = models.TextField(_("Article's text"), blank=True)
     file = models.FileField(_("Article's file"), upload_to="files/articles", blank=True)
+    # The text of the file, see flb.literature.filetext
+    file_text = GenericRelation("literature.FileText")
     link = models.CharField(_("Link to article"), max_length=150, blank=True)
     tags = TaggableManager(blank=True)
 
@@ -389,6 +574,9 @@ class Article(models.Model):
     custom_num = models.IntegerField(_("Custom number"), blank=True, null=True)
     custom_bool = models.BooleanField(_("Custom bool"), default=False)
 
+    # Maintained by flb.literature.search, see signals.py
+    search_vector = SearchVectorField(_("Search vector"), null=True, editable=False)
+
     authors = models.ManyToManyField(
         "literature.Author",
         verbose_name=_("Article's authors"),
@@ -398,6 +586,10 @@ class Article(models.Model):
     issue = models.ForeignKey(
         "literature.Issue", verbose_name=_("Issue"), on_delete=models.CASCADE, null=True
     )
+    # The date of the issue, kept here to sort articles without a join
+    pub_date = models.DateField(
+        _("Publishing date"), blank=True, null=True, editable=False
+    )
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         related_name="art_creators",
@@ -412,7 +604,7 @@ class Article(models.Model):
     class Meta:
         verbose_name = _("Article")
         verbose_name_plural = _("Articles")
-        ordering = ["-issue__date", "name"]
+        ordering = ["-pub_date", "name"]
 
         indexes = [
             models.Index(
@@ -430,6 +622,20 @@ class Article(models.Model):
                     "issue",
                 ]
             ),
+            GinIndex(
+                fields=[
+                    "search_vector",
+                ]
+            ),
+            # The default ordering, with the pk keyset pagination adds
+            models.Index(
+                name="literature_article_pub_date",
+                fields=[
+                    "-pub_date",
+                    "name",
+                    "id",
+                ],
+            ),
         ]
 
     def __str__(self):
@@ -438,6 +644,8 @@ class Article(models.Model):
     def save(self, *args, **kwargs):  # new
         if not self.slug:
             self.slug = slugify(self.name + "-" + get_random_string(8, "0123456789"))
+        self.pub_date = self.issue.date if self.issue_id else None
+        self.abstract_excerpt = Truncator(self.abstract).words(ABSTRACT_EXCERPT_WORDS)
         return super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -469,6 +677,37 @@ class Article_image(models.Model):
         return self.name
 
 
+class AuthorQuerySet(models.QuerySet):
+    # Typo tolerant name lookup for autocomplete widgets, backed by the
+    # trigram index on name and capped at limit rows.
+    def autocomplete(self, term, limit=25):
+        term = term.strip()
+        if not term:
+            return self[:limit]
+        if connections[self.db].vendor != "postgresql":
+            return self.filter(name__icontains=term)[:limit]
+
+        contains = Q()
+        for bit in term.split():
+            contains &= Q(name__ilike_contains=bit)
+        return (
+            self.filter(contains | Q(name__trigram_similar=term))
+            .annotate(similarity=TrigramSimilarity("name", term))
+            .order_by("-similarity", "name")[:limit]
+        )
+
+    # Authors of any of the articles, without the duplicates of a join
+    def of_articles(self, articles):
+        through = Article.authors.through
+        return self.filter(
+            Exists(
+                through.objects.filter(
+                    author=OuterRef("pk"), article__in=articles.values("pk")
+                )
+            )
+        )
+
+
 class Author(models.Model):
 
     name = models.CharField(_("Author's full name"), max_length=100, blank=True)
@@ -490,6 +729,13 @@ class Author(models.Model):
         blank=True,
     )
 
+    # Maintained by flb.literature.counters, see signals.py
+    article_count = models.PositiveIntegerField(
+        _("Number of articles"), default=0, editable=False
+    )
+
+    objects = AuthorQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Author")
         verbose_name_plural = _("Authors")
@@ -511,6 +757,15 @@ class Author(models.Model):
                     "last_name",
                 ]
             ),
+            GinIndex(
+                name="literature_author_name_trgm",
+                fields=[
+                    "name",
+                ],
+                opclasses=[
+                    "gin_trgm_ops",
+                ],
+            ),
         ]
 
     def __str__(self):
@@ -531,3 +786,62 @@ class Author(models.Model):
 
     def get_absolute_url(self):
         return reverse("literature:author-update", kwargs={"pk": self.pk})
+
+
+class TagUsage(models.Model):
+    """How many articles and books use a tag, maintained like the counters above."""
+
+    tag = models.OneToOneField(
+        "taggit.Tag",
+        verbose_name=_("Tag"),
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="usage",
+    )
+    article_count = models.PositiveIntegerField(_("Number of articles"), default=0)
+    book_count = models.PositiveIntegerField(_("Number of books"), default=0)
+
+    class Meta:
+        verbose_name = _("Tag usage")
+        verbose_name_plural = _("Tag usages")
+
+    def __str__(self):
+        return str(self.tag)
+
+
+class FileText(models.Model):
+    """
+    The text of the PDF file of an article, issue or book, extracted once in
+    a background job, see flb.literature.filetext.
+    """
+
+    content_type = models.ForeignKey(
+        ContentType, verbose_name=_("Content type"), on_delete=models.CASCADE
+    )
+    object_id = models.PositiveIntegerField(_("Object id"))
+    # The file the text was extracted from, to extract it again on a new file
+    file_name = models.CharField(_("File name"), max_length=255)
+    text = models.TextField(_("Text"), blank=True)
+    pages = models.PositiveIntegerField(_("Number of pages"), default=0)
+    search_vector = SearchVectorField(_("Search vector"), null=True, editable=False)
+    extracted_at = models.DateTimeField(_("Extracted on"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("File text")
+        verbose_name_plural = _("File texts")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id"],
+                name="literature_filetext_object",
+            )
+        ]
+        indexes = [
+            GinIndex(
+                fields=[
+                    "search_vector",
+                ]
+            ),
+        ]
+
+    def __str__(self):
+        return self.file_name
@@ -0,0 +1,190 @@
+import json
+from collections.abc import Sequence
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+
+CURSOR_SALT = "flb.literature.pagination"
+# Below this planner estimate the exact count is cheap enough to run
+EXACT_COUNT_THRESHOLD = 1000
+
+
+class CursorSerializer:
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"), cls=DjangoJSONEncoder).encode(
+            "latin-1"
+        )
+
+    def loads(self, data):
+        return json.loads(data.decode("latin-1"))
+
+
+def approximate_count(queryset, threshold=EXACT_COUNT_THRESHOLD):
+    """
+    Count the rows of a queryset from the Postgres planner estimate, falling
+    back to an exact count for small results and other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate > threshold:
+            return estimate
+    return queryset.count()
+
+
+class KeysetPage(Sequence):
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return "<Keyset page of %s objects>" % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+
+class KeysetPaginator:
+    """
+    Seek pagination over the queryset ordering, with the primary key as the
+    tiebreaker. Pages are addressed by opaque cursors instead of numbers, so
+    a deep page costs the same index range scan as the first one.
+
+    The ordering must be made of field names and annotations. Relations in
+    it should be select_related, the cursor of a page is read from its
+    objects. Nulls are expected to sort like Postgres does: last ascending,
+    first descending.
+    """
+
+    def __init__(self, queryset, per_page):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not any(field.lstrip("-") in ("pk", "id") for field in ordering):
+            ordering.append("pk")
+        self.ordering = ordering
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self._count = None
+
+    # Approximate for large results, unless set to a known count
+    @property
+    def count(self):
+        if self._count is None:
+            self._count = approximate_count(self.queryset)
+        return self._count
+
+    @count.setter
+    def count(self, value):
+        self._count = value
+
+    def encode_cursor(self, obj, direction):
+        values = [self._key_value(obj, field) for field in self.ordering]
+        return signing.dumps(
+            [direction, values], salt=CURSOR_SALT, serializer=CursorSerializer
+        )
+
+    def decode_cursor(self, cursor):
+        try:
+            direction, values = signing.loads(
+                cursor, salt=CURSOR_SALT, serializer=CursorSerializer
+            )
+            if direction in ("next", "previous") and len(values) == len(self.ordering):
+                return direction, values
+        except (signing.BadSignature, TypeError, ValueError):
+            pass
+        return None, None
+
+    def get_page(self, cursor=None):
+        """Return the page after (or before) a cursor, the first one without."""
+        direction, values = self.decode_cursor(cursor) if cursor else (None, None)
+
+        if direction == "previous":
+            ordering = [self._reverse(field) for field in self.ordering]
+            qs = self.queryset.filter(self._seek(ordering, values))
+            rows = list(qs.order_by(*ordering)[: self.per_page + 1])
+            more_before = len(rows) > self.per_page
+            object_list = rows[: self.per_page][::-1]
+            has_previous, has_next = more_before, True
+        else:
+            qs = self.queryset
+            if direction == "next":
+                qs = qs.filter(self._seek(self.ordering, values))
+            rows = list(qs[: self.per_page + 1])
+            object_list = rows[: self.per_page]
+            has_previous, has_next = direction == "next", len(rows) > self.per_page
+
+        next_cursor = previous_cursor = None
+        if object_list and has_next:
+            next_cursor = self.encode_cursor(object_list[-1], "next")
+        if object_list and has_previous:
+            previous_cursor = self.encode_cursor(object_list[0], "previous")
+        return KeysetPage(object_list, self, next_cursor, previous_cursor)
+
+    @staticmethod
+    def _reverse(field):
+        return field[1:] if field.startswith("-") else "-" + field
+
+    @staticmethod
+    def _key_value(obj, field):
+        value = obj
+        for attr in field.lstrip("-").split("__"):
+            if value is None:
+                break
+            value = getattr(value, attr)
+        return value
+
+    def _nullable(self, name):
+        # Annotations such as the search rank are never null
+        model = self.queryset.model
+        try:
+            for attr in name.split("__"):
+                field = model._meta.pk if attr == "pk" else model._meta.get_field(attr)
+                if field.null:
+                    return True
+                model = field.related_model
+        except FieldDoesNotExist:
+            pass
+        return False
+
+    def _seek(self, ordering, values):
+        # Rows strictly after the key in the given ordering: equal on the
+        # leading fields and after on the next one, for every position.
+        seek = Q(pk__in=[])
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip("-")
+            descending = field.startswith("-")
+            if value is None:
+                # Nulls come first descending and last ascending
+                after = Q(**{f"{name}__isnull": False}) if descending else Q(pk__in=[])
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                after = Q(**{f"{name}__lt" if descending else f"{name}__gt": value})
+                if not descending and self._nullable(name):
+                    after |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            seek |= equal & after
+            equal &= same
+        return seek
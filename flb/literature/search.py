@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import connections
+from django.db.models import OuterRef, Subquery, TextField
+from taggit.models import TaggedItem
+
+from flb.literature.models import Article, Book
+
+SEARCHABLE_MODELS = (Article, Book)
+
+
+# Space separated names of the objects authors, as a correlated subquery
+def authors_subquery(model, separator=" "):
+    through = model.authors.through
+    owner = model._meta.model_name
+    names = (
+        through.objects.filter(**{owner: OuterRef("pk")})
+        .order_by()
+        .values(owner)
+        .annotate(names=StringAgg("author__name", separator, ordering="id"))
+        .values("names")
+    )
+    return Subquery(names, output_field=TextField())
+
+
+# Space separated names of the objects tags, as a correlated subquery
+def tags_subquery(model, separator=" "):
+    names = (
+        TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+            object_id=OuterRef("pk"),
+        )
+        .order_by()
+        .values("object_id")
+        .annotate(names=StringAgg("tag__name", separator, ordering="tag__name"))
+        .values("names")
+    )
+    return Subquery(names, output_field=TextField())
+
+
+# The weighted document of a model: title, then authors and tags, then the
+# text. The text of its file has a vector of its own, see file_text_matches()
+def search_vector(model):
+    config = settings.LITERATURE_SEARCH_CONFIG
+    body = "abstract" if model is Article else "desc"
+    vector = SearchVector("name", weight="A", config=config)
+    if model is Article:
+        vector += SearchVector("sub", weight="A", config=config)
+    return (
+        vector
+        + SearchVector(authors_subquery(model), weight="B", config=config)
+        + SearchVector(tags_subquery(model), weight="B", config=config)
+        + SearchVector(body, weight="C", config=config)
+    )
+
+
+def update_search_vector(queryset):
+    """Recompute the search_vector column of every row in the queryset."""
+    if connections[queryset.db].vendor != "postgresql":
+        return 0
+    return queryset.update(search_vector=search_vector(queryset.model))
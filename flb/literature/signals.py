@@ -0,0 +1,333 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from taggit.models import Tag, TaggedItem
+
+from flb.literature.cards import bump_card_version
+from flb.literature.counters import (
+    refresh_author_counts,
+    refresh_issue_counts,
+    refresh_journal_counts,
+    refresh_tag_counts,
+)
+from flb.literature.covers import covers_changed, update_renditions_task
+from flb.literature.facets import invalidate_landing_facets
+from flb.literature.filetext import file_changed, update_file_text_task
+from flb.literature.models import Article, Author, Book, Issue, Journal
+from flb.literature.search import SEARCHABLE_MODELS, update_search_vector
+from flb.utils.pagecache import object_tag, object_tags, purge
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Book)
+def post_save_update_search_vector(sender, instance, **kwargs):
+    update_search_vector(sender.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Article.authors.through)
+@receiver(m2m_changed, sender=Book.authors.through)
+def authors_changed_update_search_vector(sender, instance, action, reverse, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            update_search_vector(type(instance).objects.filter(pk=instance.pk))
+        return
+
+    # Changed from the author side, the pk_set holds the articles or books
+    model = Article if sender is Article.authors.through else Book
+    if action == "pre_clear":
+        instance._search_vector_pks = list(
+            model.objects.filter(authors=instance).values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        pks = getattr(instance, "_search_vector_pks", [])
+        update_search_vector(model.objects.filter(pk__in=pks))
+    elif action in ("post_add", "post_remove"):
+        update_search_vector(model.objects.filter(pk__in=kwargs["pk_set"]))
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def tags_changed_update_search_vector(sender, instance, action, **kwargs):
+    if isinstance(instance, SEARCHABLE_MODELS) and action in (
+        "post_add",
+        "post_remove",
+        "post_clear",
+    ):
+        update_search_vector(type(instance).objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Author)
+def author_saved_update_search_vector(sender, instance, created, **kwargs):
+    if not created:
+        update_search_vector(Article.objects.filter(authors=instance))
+        update_search_vector(Book.objects.filter(authors=instance))
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved_update_search_vector(sender, instance, created, **kwargs):
+    if not created:
+        for model in SEARCHABLE_MODELS:
+            update_search_vector(model.objects.filter(tags=instance))
+
+
+# Deletes cascade to the through rows and tagged items without m2m_changed,
+# so the articles and books are read before and updated after
+@receiver(pre_delete, sender=Author)
+@receiver(pre_delete, sender=Tag)
+def remember_search_vector_relations(sender, instance, **kwargs):
+    field = "authors" if sender is Author else "tags"
+    instance._search_vector_pks = {
+        model: list(
+            model.objects.filter(**{field: instance}).values_list("pk", flat=True)
+        )
+        for model in SEARCHABLE_MODELS
+    }
+
+
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Tag)
+def deleted_update_search_vector(sender, instance, **kwargs):
+    for model, pks in getattr(instance, "_search_vector_pks", {}).items():
+        update_search_vector(model.objects.filter(pk__in=pks))
+
+
+# Articles keep the date of their issue as pub_date
+@receiver(post_save, sender=Issue)
+def issue_saved_update_pub_date(sender, instance, created, **kwargs):
+    if not created:
+        Article.objects.filter(issue=instance).exclude(pub_date=instance.date).update(
+            pub_date=instance.date
+        )
+
+
+# New covers get their resized renditions, see flb.literature.covers
+@receiver(post_save, sender=Journal)
+@receiver(post_save, sender=Issue)
+@receiver(post_save, sender=Book)
+def saved_update_cover_renditions(sender, instance, **kwargs):
+    if covers_changed(instance):
+        update_renditions_task.enqueue(model=sender._meta.label, pk=instance.pk)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Issue)
+@receiver(post_save, sender=Book)
+def saved_update_file_text(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and "file" not in update_fields:
+        return
+    if file_changed(instance):
+        update_file_text_task.enqueue(model=sender._meta.label, pk=instance.pk)
+
+
+# Any change to the searchable objects or their facet values drops the
+# cached facets of the search landing page. Deleted authors and tags take
+# their relations along without m2m_changed.
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Issue)
+@receiver(post_save, sender=Journal)
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Tag)
+def saved_invalidate_landing_facets(sender, **kwargs):
+    invalidate_landing_facets()
+
+
+@receiver(m2m_changed, sender=Article.authors.through)
+@receiver(m2m_changed, sender=Book.authors.through)
+@receiver(m2m_changed, sender=TaggedItem)
+def relations_changed_invalidate_landing_facets(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_landing_facets()
+
+
+# The article cards show the authors, issue and journal. Changes to those
+# renew every article card, an article's own save changes its updated_at.
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Issue)
+@receiver(post_save, sender=Journal)
+def saved_bump_article_cards(sender, created, **kwargs):
+    if not created:
+        bump_card_version(Article)
+
+
+@receiver(post_delete, sender=Author)
+def deleted_bump_article_cards(sender, **kwargs):
+    bump_card_version(Article)
+
+
+@receiver(m2m_changed, sender=Article.authors.through)
+def authors_changed_bump_article_cards(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_card_version(Article)
+
+
+# Drop the cached pages showing a changed object, see the page_cache_tags()
+# of the views
+@receiver(post_save, sender=Journal)
+@receiver(post_delete, sender=Journal)
+def journal_changed_purge_pages(sender, instance, **kwargs):
+    purge(object_tag(Journal, instance.pk), "journals", "home")
+
+
+@receiver(post_save, sender=Issue)
+@receiver(post_delete, sender=Issue)
+def issue_changed_purge_pages(sender, instance, **kwargs):
+    purge(
+        object_tag(Issue, instance.pk),
+        f"journal-issues:{instance.journal_id}",
+        "home",
+    )
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def article_changed_purge_pages(sender, instance, **kwargs):
+    purge(
+        object_tag(Article, instance.pk),
+        f"issue-articles:{instance.issue_id}",
+        "home",
+    )
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def book_changed_purge_pages(sender, instance, **kwargs):
+    purge(object_tag(Book, instance.pk), "books")
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def author_changed_purge_pages(sender, instance, **kwargs):
+    if not kwargs.get("created"):
+        purge(object_tag(Author, instance.pk))
+
+
+def _purge_object_pages(model, pks):
+    # The pages listing the articles or books show their authors and tags
+    tags = object_tags(model, pks)
+    if model is Article:
+        issues = model.objects.filter(pk__in=pks).values_list("issue_id", flat=True)
+        tags += [f"issue-articles:{issue}" for issue in set(issues)]
+    else:
+        tags.append("books")
+    purge(*tags)
+
+
+@receiver(m2m_changed, sender=Article.authors.through)
+@receiver(m2m_changed, sender=Book.authors.through)
+def authors_changed_purge_pages(sender, instance, action, reverse, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        _purge_object_pages(type(instance), [instance.pk])
+        return
+    # The pages showing the author already carry its tag, those of the
+    # articles or books it was added to don't yet
+    purge(object_tag(Author, instance.pk))
+    if action == "post_add":
+        model = Article if sender is Article.authors.through else Book
+        _purge_object_pages(model, kwargs["pk_set"])
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def tags_changed_purge_pages(sender, instance, action, **kwargs):
+    if isinstance(instance, SEARCHABLE_MODELS) and action in (
+        "post_add",
+        "post_remove",
+        "post_clear",
+    ):
+        _purge_object_pages(type(instance), [instance.pk])
+
+
+# Counters: the parents of a created, moved or deleted object, and the
+# authors and tags of changed relations get their counts recomputed
+@receiver(pre_save, sender=Issue)
+@receiver(pre_save, sender=Article)
+def remember_counted_parent(sender, instance, **kwargs):
+    field = "journal_id" if sender is Issue else "issue_id"
+    instance._counted_parent = None
+    if not instance._state.adding:
+        instance._counted_parent = (
+            sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+        )
+
+
+def _journals_of(issues):
+    return Issue.objects.filter(pk__in=issues).values_list("journal", flat=True)
+
+
+@receiver(post_save, sender=Issue)
+def issue_saved_refresh_counts(sender, instance, created, **kwargs):
+    old = getattr(instance, "_counted_parent", None)
+    if created or old != instance.journal_id:
+        refresh_journal_counts([old, instance.journal_id])
+        purge("journals")
+
+
+@receiver(post_delete, sender=Issue)
+def issue_deleted_refresh_counts(sender, instance, **kwargs):
+    refresh_journal_counts([instance.journal_id])
+    purge("journals")
+
+
+@receiver(post_save, sender=Article)
+def article_saved_refresh_counts(sender, instance, created, **kwargs):
+    old = getattr(instance, "_counted_parent", None)
+    if created or old != instance.issue_id:
+        issues = [old, instance.issue_id]
+        refresh_issue_counts(issues)
+        refresh_journal_counts(_journals_of(issues))
+        purge("journals")
+
+
+# The through rows are gone by post_delete, so the relations are read before
+@receiver(pre_delete, sender=Article)
+@receiver(pre_delete, sender=Book)
+def remember_counted_relations(sender, instance, **kwargs):
+    if sender is Article:
+        instance._counted_authors = list(instance.authors.values_list("pk", flat=True))
+    instance._counted_tags = list(instance.tags.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Book)
+def deleted_refresh_counts(sender, instance, **kwargs):
+    if sender is Article:
+        refresh_issue_counts([instance.issue_id])
+        refresh_journal_counts(_journals_of([instance.issue_id]))
+        refresh_author_counts(getattr(instance, "_counted_authors", []))
+        purge("journals")
+    refresh_tag_counts(getattr(instance, "_counted_tags", []))
+
+
+@receiver(m2m_changed, sender=Article.authors.through)
+def authors_changed_refresh_counts(sender, instance, action, reverse, **kwargs):
+    if reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_author_counts([instance.pk])
+    elif action == "pre_clear":
+        instance._counted_authors = list(instance.authors.values_list("pk", flat=True))
+    elif action == "post_clear":
+        refresh_author_counts(getattr(instance, "_counted_authors", []))
+    elif action in ("post_add", "post_remove"):
+        refresh_author_counts(kwargs["pk_set"])
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def tags_changed_refresh_counts(sender, instance, action, **kwargs):
+    if not isinstance(instance, SEARCHABLE_MODELS):
+        return
+    if action == "pre_clear":
+        instance._counted_tags = list(instance.tags.values_list("pk", flat=True))
+    elif action == "post_clear":
+        refresh_tag_counts(getattr(instance, "_counted_tags", []))
+    elif action in ("post_add", "post_remove"):
+        refresh_tag_counts(kwargs["pk_set"])
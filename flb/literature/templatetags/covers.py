@@ -0,0 +1,46 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from flb.literature.covers import rendition_name
+
+register = template.Library()
+
+
+# An <img> of a journal, issue or book cover, listing its renditions in srcset,
+# e.g. {% cover_img issue sizes="(min-width: 768px) 16vw, 50vw" class="img-fluid" %}
+@register.simple_tag
+def cover_img(obj, field="f_cover", sizes="100vw", **attrs):
+    file = getattr(obj, field)
+    if not file:
+        return ""
+    attrs.setdefault("loading", "lazy")
+
+    # Covers without renditions yet are shown as they are
+    cover = obj.cover_renditions.get(field)
+    if cover is None or cover["name"] != file.name:
+        return format_html('<img src="{}"{}>', file.url, flatatt(attrs))
+    if not cover["widths"]:
+        return format_html(
+            '<img src="{}" width="{}" height="{}"{}>',
+            file.url,
+            cover["width"],
+            cover["height"],
+            flatatt(attrs),
+        )
+
+    urls = [
+        (file.storage.url(rendition_name(file.name, width)), width)
+        for width in cover["widths"]
+    ]
+    width = cover["widths"][-1]
+    height = round(cover["height"] * width / cover["width"])
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}"{}>',
+        urls[-1][0],
+        ", ".join(f"{url} {w}w" for url, w in urls),
+        sizes,
+        width,
+        height,
+        flatatt(attrs),
+    )
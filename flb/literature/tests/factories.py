@@ -0,0 +1,53 @@
+from factory import Faker, SubFactory
+from factory.django import DjangoModelFactory
+
+from flb.literature.models import Article, Author, Book, Issue, Journal
+
+
+class AuthorFactory(DjangoModelFactory):
+
+    first_name = Faker("first_name")
+    last_name = Faker("last_name")
+
+    class Meta:
+        model = Author
+
+
+class JournalFactory(DjangoModelFactory):
+
+    name = Faker("company")
+    desc = Faker("text", max_nb_chars=200)
+
+    class Meta:
+        model = Journal
+
+
+class IssueFactory(DjangoModelFactory):
+
+    name = Faker("month_name")
+    date = Faker("date_this_century")
+    journal = SubFactory(JournalFactory)
+
+    class Meta:
+        model = Issue
+
+
+class ArticleFactory(DjangoModelFactory):
+
+    name = Faker("sentence", nb_words=6)
+    abstract = Faker("text", max_nb_chars=300)
+    text = Faker("text", max_nb_chars=1000)
+    issue = SubFactory(IssueFactory)
+
+    class Meta:
+        model = Article
+
+
+class BookFactory(DjangoModelFactory):
+
+    name = Faker("sentence", nb_words=4)
+    desc = Faker("text", max_nb_chars=200)
+    date = Faker("date_this_century")
+
+    class Meta:
+        model = Book
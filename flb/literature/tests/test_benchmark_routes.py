@@ -0,0 +1,70 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+
+from flb.literature.management.commands.benchmark_routes import percentile
+from flb.literature.models import Article
+
+pytestmark = pytest.mark.django_db
+
+
+def benchmark(**options):
+    stdout = StringIO()
+    call_command("benchmark_routes", requests=2, stdout=stdout, **options)
+    return stdout.getvalue()
+
+
+@pytest.fixture
+def data():
+    call_command("generate_data", scale=0.02, interactive=False, stdout=StringIO())
+    article = Article.objects.first()
+    article.file.save("paper.pdf", ContentFile(b"%PDF-1.4 " * 100))
+
+
+def test_percentile():
+    values = list(range(1, 101))
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+def test_every_route_is_requested(data, tmp_path):
+    output = tmp_path / "results.json"
+
+    benchmark(output=str(output))
+
+    results = json.loads(output.read_text())
+    routes = {stats["route"] for stats in results["routes"].values()}
+    assert "mainsite:home" in routes
+    assert "literature:search-export" in routes
+    assert results["meta"]["skipped"] == [
+        "literature:issue-file",
+        "literature:book-file",
+    ]
+    for name, stats in results["routes"].items():
+        assert stats["requests"] == 2
+        assert set(stats["status"]) <= {"200", "206"}, name
+        assert stats["latency_ms"]["p99"] >= stats["latency_ms"]["p50"] > 0
+        assert stats["bytes"]["mean"] > 0
+    assert results["routes"]["article-file range"]["status"] == {"206": 2}
+    assert results["routes"]["search q"]["queries"]["mean"] > 0
+
+
+def test_compare_with_an_earlier_run(data, tmp_path):
+    output = tmp_path / "results.json"
+    benchmark(route=["search"], output=str(output))
+
+    report = benchmark(route=["literature:journal-detail", "search"], compare=output)
+
+    assert "Changes since" in report
+    assert "journal-detail" in report.split("Changes since")[1]
+
+
+def test_needs_data():
+    with pytest.raises(CommandError, match="not enough data"):
+        benchmark()
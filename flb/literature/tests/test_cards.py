@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from flb.literature.tests.factories import (
+    ArticleFactory,
+    AuthorFactory,
+    IssueFactory,
+    JournalFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.content.decode(), len(queries)
+
+
+@pytest.fixture
+def issue():
+    issue = IssueFactory()
+    for article in ArticleFactory.create_batch(3, issue=issue):
+        article.authors.add(AuthorFactory())
+    return issue
+
+
+def issue_url(issue):
+    return reverse("literature:issue-detail", args=[issue.slug])
+
+
+def test_cached_cards_skip_the_authors_query(client, issue, settings):
+    settings.PAGE_CACHE_TIMEOUT = 0
+    first, first_queries = get(client, issue_url(issue))
+    second, second_queries = get(client, issue_url(issue))
+
+    assert second == first
+    assert second_queries == first_queries - 1
+
+
+def test_saving_an_article_renews_its_card(client, issue):
+    get(client, issue_url(issue))
+    article = issue.article_set.first()
+
+    article.name = "Kongeørn i Troms"
+    article.save()
+
+    assert "Kongeørn i Troms" in get(client, issue_url(issue))[0]
+
+
+def test_renaming_an_author_renews_the_cards(client, issue):
+    get(client, issue_url(issue))
+    author = issue.article_set.first().authors.get()
+
+    author.name = "Kari Fjellvik"
+    author.save()
+
+    assert "Kari Fjellvik" in get(client, issue_url(issue))[0]
+
+
+def test_adding_an_author_renews_the_card(client, issue):
+    get(client, issue_url(issue))
+
+    issue.article_set.first().authors.add(AuthorFactory(name="Ola Vidde"))
+
+    assert "Ola Vidde" in get(client, issue_url(issue))[0]
+
+
+def test_issue_cards_vary_on_the_owner(client, user):
+    journal = JournalFactory()
+    issue = IssueFactory(journal=journal, created_by=user)
+    url = reverse("literature:journal-detail", args=[journal.slug])
+    delete_url = reverse("literature:issue-delete", args=[issue.pk])
+
+    assert delete_url not in get(client, url)[0]
+    client.force_login(user)
+    assert delete_url in get(client, url)[0]
@@ -0,0 +1,109 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from taggit.models import Tag
+
+from flb.literature.models import Author, Issue, Journal, TagUsage
+from flb.literature.tests.factories import (
+    ArticleFactory,
+    AuthorFactory,
+    BookFactory,
+    IssueFactory,
+    JournalFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def counts(obj, *fields):
+    obj.refresh_from_db()
+    return tuple(getattr(obj, field) for field in fields)
+
+
+def test_issue_and_article_counts():
+    journal = JournalFactory()
+    issue = IssueFactory(journal=journal)
+    ArticleFactory.create_batch(2, issue=issue)
+
+    assert counts(journal, "issue_count", "article_count") == (1, 2)
+    assert counts(issue, "article_count") == (2,)
+
+
+def test_moving_an_article_updates_both_issues():
+    article = ArticleFactory()
+    old_issue = article.issue
+    new_issue = IssueFactory()
+
+    article.issue = new_issue
+    article.save()
+
+    assert counts(old_issue, "article_count") == (0,)
+    assert counts(old_issue.journal, "article_count") == (0,)
+    assert counts(new_issue, "article_count") == (1,)
+    assert counts(new_issue.journal, "article_count") == (1,)
+
+
+def test_deleting_an_issue_updates_the_journal():
+    issue = IssueFactory()
+    ArticleFactory.create_batch(2, issue=issue)
+
+    issue.delete()
+
+    assert counts(issue.journal, "issue_count", "article_count") == (0, 0)
+
+
+def test_author_counts_follow_the_relation():
+    author = AuthorFactory()
+    first, second = ArticleFactory.create_batch(2)
+    first.authors.add(author)
+    author.authors.add(second)
+    assert counts(author, "article_count") == (2,)
+
+    first.authors.clear()
+    assert counts(author, "article_count") == (1,)
+
+    second.delete()
+    assert counts(author, "article_count") == (0,)
+
+
+def test_tag_usage():
+    article = ArticleFactory()
+    article.tags.add("rovfugl", "vadere")
+    BookFactory().tags.add("rovfugl")
+    usage = TagUsage.objects.get(tag__name="rovfugl")
+    assert counts(usage, "article_count", "book_count") == (1, 1)
+
+    article.tags.remove("rovfugl")
+    assert counts(usage, "article_count", "book_count") == (0, 1)
+
+    article.delete()
+    assert TagUsage.objects.get(tag__name="vadere").article_count == 0
+
+
+def test_repair_counters():
+    issue = IssueFactory()
+    article = ArticleFactory(issue=issue)
+    article.authors.add(AuthorFactory())
+    article.tags.add("rovfugl")
+    Journal.objects.update(issue_count=0, article_count=0)
+    Issue.objects.update(article_count=0)
+    Author.objects.update(article_count=0)
+    TagUsage.objects.all().delete()
+
+    call_command("repair_counters", stdout=None)
+
+    assert counts(issue.journal, "issue_count", "article_count") == (1, 1)
+    assert counts(issue, "article_count") == (1,)
+    assert Author.objects.get().article_count == 1
+    assert Tag.objects.get().usage.article_count == 1
+
+
+def test_journal_list_sorts_by_counts(client):
+    small, big = JournalFactory(name="A"), JournalFactory(name="B")
+    IssueFactory(journal=small)
+    IssueFactory.create_batch(2, journal=big)
+
+    response = client.get(reverse("literature:journal-list"), {"sort": "issues"})
+
+    assert list(response.context["object_list"]) == [big, small]
+    assert "2 issues" in response.content.decode()
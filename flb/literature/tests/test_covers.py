@@ -0,0 +1,98 @@
+import io
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from PIL import Image
+
+from flb.literature.covers import rendition_name
+from flb.literature.models import Issue
+from flb.literature.tests.factories import IssueFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def image(width, height, file_format="PNG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "green").save(buffer, file_format)
+    return ContentFile(buffer.getvalue(), name="cover.png")
+
+
+def render(issue):
+    template = Template('{% load covers %}{% cover_img issue sizes="50vw" %}')
+    return template.render(Context({"issue": issue}))
+
+
+def test_upload_makes_renditions(settings):
+    settings.LITERATURE_COVER_WIDTHS = [160, 320, 640]
+    issue = IssueFactory(f_cover=image(500, 700))
+
+    issue.refresh_from_db()
+    assert issue.cover_renditions["f_cover"] == {
+        "name": issue.f_cover.name,
+        "width": 500,
+        "height": 700,
+        "widths": [160, 320],
+    }
+    with default_storage.open(rendition_name(issue.f_cover.name, 320)) as file:
+        assert Image.open(file).size == (320, 448)
+    assert not default_storage.exists(rendition_name(issue.f_cover.name, 640))
+
+
+def test_cover_img_lists_the_renditions(settings):
+    settings.LITERATURE_COVER_WIDTHS = [160, 320]
+    issue = IssueFactory(f_cover=image(500, 700))
+    issue.refresh_from_db()
+
+    html = render(issue)
+
+    root = issue.f_cover.url.rsplit(".", 1)[0]
+    assert f'srcset="{root}.160w.webp 160w, {root}.320w.webp 320w"' in html
+    assert 'sizes="50vw" width="320" height="448"' in html
+    assert 'loading="lazy"' in html
+
+
+def test_small_covers_are_shown_as_they_are(settings):
+    settings.LITERATURE_COVER_WIDTHS = [160]
+    issue = IssueFactory(f_cover=image(100, 140))
+    issue.refresh_from_db()
+
+    html = render(issue)
+
+    assert f'src="{issue.f_cover.url}" width="100" height="140"' in html
+    assert "srcset" not in html
+
+
+def test_missing_cover_file_is_shown_without_renditions():
+    # The default cover is not in the test media storage
+    issue = IssueFactory()
+
+    assert issue.cover_renditions == {}
+    assert render(issue).startswith(f'<img src="{issue.f_cover.url}"')
+
+
+def test_saving_again_keeps_the_renditions():
+    issue = IssueFactory(f_cover=image(500, 700))
+    issue.refresh_from_db()
+    cover = issue.cover_renditions
+
+    issue.name = "Renamed"
+    issue.save()
+
+    assert Issue.objects.get(pk=issue.pk).cover_renditions == cover
+
+
+def test_make_cover_renditions_command(settings):
+    issue = IssueFactory(f_cover=image(500, 700))
+    Issue.objects.update(cover_renditions={})
+    settings.LITERATURE_COVER_FORMAT = "JPEG"
+
+    call_command("make_cover_renditions", stdout=StringIO())
+
+    issue.refresh_from_db()
+    assert issue.cover_renditions["f_cover"]["widths"] == [160, 320]
+    assert default_storage.exists(rendition_name(issue.f_cover.name, 160))
+    assert rendition_name(issue.f_cover.name, 160).endswith(".160w.jpg")
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+
+import pytest
+from django.urls import reverse
+
+from flb.literature.models import Article
+from flb.literature.search import update_search_vector
+from flb.literature.tests.factories import ArticleFactory, AuthorFactory, BookFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def export(client, results, file_format, **params):
+    url = reverse("literature:search-export", args=[results, file_format])
+    response = client.get(url, params)
+    assert response.status_code == 200
+    assert response.streaming
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.fixture
+def article():
+    article = ArticleFactory(name="Owls of Troms")
+    article.authors.add(
+        AuthorFactory(first_name="Kari", last_name="Nordmann"),
+        AuthorFactory(first_name="Ola", last_name="Hansen"),
+    )
+    article.tags.add("owls", "birds")
+    return article
+
+
+def test_csv_export(client, article):
+    ArticleFactory(name="Gulls")
+
+    content = export(client, "articles", "csv", tags="owls")
+
+    [row] = list(csv.DictReader(io.StringIO(content)))
+    assert row["title"] == "Owls of Troms"
+    assert row["authors"] == "Kari Nordmann; Ola Hansen"
+    assert row["tags"] == "birds, owls"
+    assert row["journal"] == article.issue.journal.name
+    assert row["url"] == "http://testserver" + reverse(
+        "literature:article-detail", kwargs={"slug": article.slug}
+    )
+
+
+def test_json_export_of_a_full_text_search(client, article):
+    ArticleFactory(name="Gulls")
+    update_search_vector(Article.objects.all())
+
+    rows = json.loads(export(client, "articles", "json", q="owls"))
+
+    assert [row["title"] for row in rows] == ["Owls of Troms"]
+    assert rows[0]["date"] == str(article.pub_date)
+
+
+def test_bibtex_export(client, article):
+    content = export(client, "articles", "bib")
+
+    assert content.startswith(f"@article{{{article.slug},")
+    assert "  author = {Kari Nordmann and Ola Hansen}," in content
+    assert f"  year = {{{article.pub_date.year}}}," in content
+
+
+def test_book_export(client):
+    BookFactory(name="Birds of Norway")
+
+    rows = json.loads(export(client, "books", "json"))
+
+    assert rows[0]["title"] == "Birds of Norway"
+
+
+def test_empty_export(client):
+    assert export(client, "articles", "csv") == ""
+    assert json.loads(export(client, "articles", "json")) == []
+
+
+def test_unknown_format(client):
+    url = reverse("literature:search-export", args=["articles", "xml"])
+
+    assert client.get(url).status_code == 404
@@ -0,0 +1,94 @@
+import pytest
+
+from flb.literature.facets import landing_facets, search_facets
+from flb.literature.models import Article, Book
+from flb.literature.tests.factories import (
+    ArticleFactory,
+    AuthorFactory,
+    BookFactory,
+    IssueFactory,
+    JournalFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def test_search_facets_counts_articles_and_books():
+    author = AuthorFactory(first_name="Ola", last_name="Nordmann")
+    journal = JournalFactory(name="Rallus")
+    issue = IssueFactory(journal=journal, date="2001-03-01")
+    for article in ArticleFactory.create_batch(2, issue=issue):
+        article.authors.add(author)
+        article.tags.add("ugle", "hekking")
+    book = BookFactory(date="2001-06-01")
+    book.authors.add(author)
+    book.tags.add("ugle")
+
+    facets = search_facets(Article.objects.all(), Book.objects.all())
+
+    assert facets["tags"] == [("ugle", 3), ("hekking", 2)]
+    assert facets["journals"] == [("Rallus", 2)]
+    assert facets["authors"] == [("Ola Nordmann", 3)]
+    assert facets["years"] == [("2001", 3)]
+
+
+def test_search_facets_follow_the_filtered_querysets():
+    kept, skipped = ArticleFactory.create_batch(2)
+    kept.tags.add("ugle")
+    skipped.tags.add("vadere")
+
+    facets = search_facets(Article.objects.filter(pk=kept.pk), Book.objects.none())
+
+    assert facets["tags"] == [("ugle", 1)]
+    assert facets["journals"] == [(kept.issue.journal.name, 1)]
+
+
+def test_search_facets_keep_the_top_values():
+    for i, article in enumerate(ArticleFactory.create_batch(3)):
+        article.tags.add(*["tag%s" % n for n in range(i + 1)])
+
+    facets = search_facets(Article.objects.all(), Book.objects.all(), limit=2)
+
+    assert facets["tags"] == [("tag0", 3), ("tag1", 2)]
+
+
+def test_landing_facets_are_cached(django_assert_num_queries):
+    ArticleFactory().tags.add("ugle")
+    landing_facets()
+
+    with django_assert_num_queries(0):
+        snapshot = landing_facets()
+
+    assert snapshot["tags"] == [("ugle", 1)]
+    assert snapshot["articles"] == 1
+    assert snapshot["books"] == 0
+
+
+def test_landing_facets_are_invalidated_by_changes():
+    article = ArticleFactory()
+    assert landing_facets()["tags"] == []
+
+    article.tags.add("ugle")
+    assert landing_facets()["tags"] == [("ugle", 1)]
+
+    BookFactory().tags.add("ugle")
+    assert landing_facets()["tags"] == [("ugle", 2)]
+
+    article.delete()
+    assert landing_facets()["tags"] == [("ugle", 1)]
+    assert landing_facets()["articles"] == 0
+
+
+def test_landing_facets_forget_deleted_authors_and_tags():
+    article = ArticleFactory()
+    author = AuthorFactory(first_name="Ola", last_name="Nordmann")
+    article.authors.add(author)
+    article.tags.add("ugle")
+    assert landing_facets()["tags"] == [("ugle", 1)]
+    assert landing_facets()["authors"]
+
+    author.delete()
+    article.tags.get().delete()
+
+    assert landing_facets()["tags"] == []
+    assert landing_facets()["authors"] == []
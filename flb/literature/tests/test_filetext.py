@@ -0,0 +1,149 @@
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+from flb.literature.filetext import update_file_text
+from flb.literature.models import Article, FileText, Issue
+from flb.literature.tests.factories import ArticleFactory, BookFactory, IssueFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def pdf(*pages):
+    """A PDF with a line of text on every page."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (
+            b" ".join(b"%d 0 R" % (4 + 2 * n) for n in range(len(pages))),
+            len(pages),
+        ),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for n, text in enumerate(pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % text.encode()
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * n)
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+
+    content = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(content))
+        content += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(content)
+    content += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    content += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    content += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return ContentFile(content, name="file.pdf")
+
+
+def test_upload_extracts_the_text():
+    article = ArticleFactory(file=pdf("Photosynthesis of lichens", "Second page"))
+
+    file_text = FileText.objects.get(object_id=article.pk)
+    assert file_text.file_name == article.file.name
+    assert file_text.pages == 2
+    assert "Photosynthesis of lichens" in file_text.text
+    assert "Second page" in file_text.text
+
+
+def test_articles_and_books_are_found_by_their_file_text():
+    article = ArticleFactory(file=pdf("Photosynthesis of lichens"))
+    book = BookFactory(file=pdf("Photosynthesis of mosses"))
+    ArticleFactory(name="Other")
+
+    assert list(Article.objects.search("lichens")) == [article]
+    assert list(type(book).objects.search("mosses")) == [book]
+
+
+def test_file_text_ranks_below_the_title():
+    in_file = ArticleFactory(name="Mosses", file=pdf("Lichens everywhere"))
+    in_title = ArticleFactory(name="Lichens")
+
+    assert list(Article.objects.search("lichens")) == [in_title, in_file]
+
+
+def test_file_text_stays_out_of_the_search_vector():
+    article = ArticleFactory(name="Mosses", file=pdf("Lichens everywhere"))
+    article.refresh_from_db()
+
+    assert "lichen" not in article.search_vector
+    assert list(Article.objects.search("lichens")) == [article]
+
+
+def test_issues_are_found_by_their_file_text():
+    issue = IssueFactory(file=pdf("Annual report on lichens"))
+    IssueFactory(name="Other")
+
+    assert list(Issue.objects.search("lichens")) == [issue]
+
+
+def test_text_is_only_extracted_for_a_new_file():
+    article = ArticleFactory(file=pdf("Lichens"))
+    FileText.objects.update(text="kept")
+
+    article.name = "Renamed"
+    article.save()
+    assert FileText.objects.get().text == "kept"
+
+    article.file = pdf("Mosses")
+    article.save()
+    assert "Mosses" in FileText.objects.get().text
+    assert list(Article.objects.search("mosses")) == [article]
+    assert not Article.objects.search("lichens").exists()
+
+
+def test_removing_the_file_drops_the_text():
+    article = ArticleFactory(file=pdf("Lichens"))
+
+    article.file = ""
+    article.save()
+
+    assert not FileText.objects.exists()
+    assert not Article.objects.search("lichens").exists()
+
+
+def test_deleting_the_object_drops_the_text():
+    issue = IssueFactory(file=pdf("Lichens"))
+
+    issue.delete()
+
+    assert not FileText.objects.exists()
+
+
+def test_broken_files_are_kept_without_text():
+    article = ArticleFactory(file=ContentFile(b"not a pdf", name="file.pdf"))
+
+    file_text = FileText.objects.get()
+    assert file_text.text == ""
+    assert not update_file_text(article)
+
+
+def test_text_is_cut_at_the_limit(settings):
+    settings.LITERATURE_FILE_TEXT_LIMIT = 10
+    ArticleFactory(file=pdf("Photosynthesis of lichens", "Second page"))
+
+    assert FileText.objects.get().text == "Photosynth"
+
+
+def test_extract_file_text_command(settings):
+    article = ArticleFactory(file=pdf("Photosynthesis of lichens"))
+    settings.LITERATURE_FILE_TEXT_LIMIT = 5
+    stdout = StringIO()
+
+    call_command("extract_file_text", stdout=stdout)
+    assert FileText.objects.get().text.startswith("Photosynthesis")
+
+    call_command("extract_file_text", force=True, stdout=stdout)
+    assert FileText.objects.get(object_id=article.pk).text == "Photo"
+    assert "Updated the file text of 1 articles" in stdout.getvalue()
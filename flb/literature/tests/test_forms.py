@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+
+from flb.literature.forms import AuthorWidget
+from flb.literature.models import Author
+from flb.literature.tests.factories import AuthorFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestAuthorWidget:
+    def test_filter_queryset_tolerates_typos(self, rf):
+        author = AuthorFactory(first_name="Ola", last_name="Nordmann")
+        AuthorFactory(first_name="Kari", last_name="Fjellvik")
+        widget = AuthorWidget(queryset=Author.objects.all())
+
+        results = widget.filter_queryset(rf.get("/"), "Ola Nordman")
+
+        assert list(results) == [author]
+
+    def test_filter_queryset_matches_partial_words(self, rf):
+        author = AuthorFactory(first_name="Ola", last_name="Nordmann")
+        widget = AuthorWidget(queryset=Author.objects.all())
+
+        results = widget.filter_queryset(rf.get("/"), "nordm ola")
+
+        assert list(results) == [author]
+
+    def test_filter_queryset_is_limited(self, rf):
+        AuthorFactory.create_batch(5, last_name="Hansen")
+        widget = AuthorWidget(queryset=Author.objects.all(), max_results=3)
+
+        results = widget.filter_queryset(rf.get("/"), "hansen")
+
+        assert len(results) == 3
+
+
+def trigram_installed():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def test_autocomplete_uses_the_trigram_index():
+    if not trigram_installed():
+        pytest.skip("The pg_trgm extension is not installed")
+    AuthorFactory.create_batch(5)
+
+    with connection.cursor() as cursor:
+        # The plan the index gives, even for a table this small
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = Author.objects.autocomplete("nordm ola").explain()
+
+    assert "literature_author_name_trgm" in plan
+    assert "Seq Scan on literature_author" not in plan
+
+
+def test_autocomplete_filters_the_indexed_column():
+    sql = str(Author.objects.autocomplete("nordm ola").query)
+
+    assert '"literature_author"."name" ILIKE' in sql
+    assert "UPPER" not in sql
+
+
+def test_autocomplete_escapes_the_term():
+    author = AuthorFactory(first_name="Ola", last_name="100%_Nordmann")
+    AuthorFactory(first_name="Kari", last_name="1000 Nordmann")
+
+    assert list(Author.objects.filter(name__ilike_contains="0%_n")) == [author]
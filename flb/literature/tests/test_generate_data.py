@@ -0,0 +1,61 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+from taggit.models import Tag
+
+from flb.literature.models import Article, Author, Book, Issue, Journal
+from flb.literature.tests.factories import ArticleFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def generate(**options):
+    call_command(
+        "generate_data", scale=0.05, interactive=False, stdout=StringIO(), **options
+    )
+
+
+def snapshot():
+    return [
+        (article.pk, article.name, article.issue_id, article.pub_date, authors)
+        for article in Article.objects.order_by("pk")
+        for authors in [sorted(a.pk for a in article.authors.all())]
+    ]
+
+
+def test_generates_rows_for_the_scale():
+    ArticleFactory()
+
+    generate(batch_size=7)
+
+    assert Article.objects.count() == 50
+    assert Book.objects.count() == 10
+    assert Issue.objects.count() == 15
+    assert Author.objects.count() == 25
+    assert Journal.objects.count() == 1
+    assert Tag.objects.count() == 10
+
+
+def test_fills_the_columns_save_and_signals_would():
+    generate()
+
+    article = Article.objects.select_related("issue").first()
+    assert article.slug
+    assert article.pub_date == article.issue.date
+    assert article.abstract_excerpt
+    assert not Article.objects.filter(search_vector__isnull=True).exists()
+    assert Issue.objects.aggregate(total=Sum("article_count"))["total"] == 50
+    assert Tag.objects.filter(usage__article_count__gt=0).exists()
+
+
+def test_same_seed_gives_the_same_rows():
+    generate(seed=3)
+    first = snapshot()
+
+    generate(seed=3)
+    assert snapshot() == first
+
+    generate(seed=4)
+    assert snapshot() != first
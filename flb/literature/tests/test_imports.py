@@ -0,0 +1,125 @@
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from taggit.models import Tag
+
+from flb.literature.imports import ArticleImporter, InvalidRow, read_csv, read_jsonl
+from flb.literature.models import Article, Author, Issue
+from flb.literature.tests.factories import AuthorFactory, IssueFactory, JournalFactory
+
+pytestmark = pytest.mark.django_db
+
+HEADER = "journal,issue,issue_date,issue_volume,title,abstract,authors,tags\n"
+
+
+@pytest.fixture
+def journal():
+    return JournalFactory(slug="falco")
+
+
+def test_csv_import(journal):
+    existing = AuthorFactory(first_name="Kari", last_name="Nordmann")
+    data = HEADER + (
+        "falco,Spring 2020,2020-04-01,2,Owls,About owls,Kari Nordmann; Ola Hansen,"
+        '"owls, birds"\n'
+        "falco,Spring 2020,,,Gulls,About gulls,ola hansen,Birds\n"
+    )
+
+    created = ArticleImporter().run(read_csv(io.StringIO(data)))
+
+    assert created == {"articles": 2, "issues": 1, "authors": 1, "tags": 2}
+    issue = Issue.objects.get(journal=journal)
+    assert (issue.name, issue.volume, str(issue.date)) == (
+        "Spring 2020",
+        2,
+        "2020-04-01",
+    )
+    owls = Article.objects.get(name="Owls")
+    assert owls.slug and owls.abstract_excerpt == "About owls"
+    assert owls.pub_date == issue.date
+    assert set(owls.authors.values_list("name", flat=True)) == {
+        "Kari Nordmann",
+        "Ola Hansen",
+    }
+    assert set(owls.tags.names()) == {"owls", "birds"}
+    assert Article.objects.filter(search_vector__isnull=True).count() == 0
+
+    existing.refresh_from_db()
+    issue.refresh_from_db()
+    assert existing.article_count == 1
+    assert issue.article_count == 2
+    assert Author.objects.get(name="Ola Hansen").article_count == 2
+
+
+def test_jsonl_import_into_an_existing_issue(journal):
+    issue = IssueFactory(journal=journal, name="Autumn")
+    rows = [
+        {"journal": "falco", "issue": "Autumn", "title": f"Article {n}", "tags": ["x"]}
+        for n in range(5)
+    ]
+    data = "\n".join(json.dumps(row) for row in rows)
+
+    created = ArticleImporter(batch_size=2).run(read_jsonl(io.StringIO(data)))
+
+    assert created == {"articles": 5, "issues": 0, "authors": 0, "tags": 1}
+    assert issue.article_set.count() == 5
+    assert Tag.objects.get(name="x").usage.article_count == 5
+
+
+def test_invalid_row_imports_nothing(journal):
+    data = HEADER + "falco,Spring,,,Owls,,,\nfalco,Spring,,,,,,\n"
+
+    with pytest.raises(InvalidRow, match="Line 3: title: This field cannot be blank"):
+        ArticleImporter(batch_size=1).run(read_csv(io.StringIO(data)))
+
+    assert not Article.objects.exists()
+    assert not Issue.objects.exists()
+
+
+def test_unknown_journal(journal):
+    data = HEADER + "hujon,Spring,,,Owls,,,\n"
+
+    with pytest.raises(InvalidRow, match="unknown journal 'hujon'"):
+        ArticleImporter().run(read_csv(io.StringIO(data)))
+
+
+def test_import_command(journal, tmp_path):
+    path = tmp_path / "articles.csv"
+    path.write_text(HEADER + "falco,Spring,,,Owls,,,\n")
+    out = StringIO()
+
+    call_command("import_articles", str(path), stdout=out)
+
+    assert "Imported 1 articles" in out.getvalue()
+    with pytest.raises(CommandError, match="--format"):
+        call_command("import_articles", str(tmp_path / "articles.txt"))
+
+
+def test_upload_imports_into_the_editors_journals(client, user, journal):
+    journal.editors.add(user)
+    JournalFactory(slug="hujon")
+    client.force_login(user)
+    url = reverse("literature:article-import")
+
+    data = HEADER + "falco,Spring,,,Owls,,,\n"
+    upload = SimpleUploadedFile("a.csv", data.encode())
+    response = client.post(url, {"file": upload})
+    assert response.status_code == 302
+    assert Article.objects.filter(issue__journal=journal).count() == 1
+
+    upload = SimpleUploadedFile("a.csv", data.replace("falco", "hujon").encode())
+    response = client.post(url, {"file": upload})
+    assert "unknown journal" in response.content.decode()
+    assert Article.objects.count() == 1
+
+
+def test_upload_requires_login(client):
+    response = client.get(reverse("literature:article-import"))
+
+    assert response.status_code == 302
@@ -0,0 +1,95 @@
+import pytest
+from django.urls import reverse
+
+from flb.literature.models import Article, Book
+from flb.literature.pagination import KeysetPaginator, approximate_count
+from flb.literature.tests.factories import ArticleFactory, BookFactory, IssueFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def walk(paginator):
+    pages = [paginator.get_page()]
+    while pages[-1].has_next():
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+    return pages
+
+
+@pytest.fixture
+def articles():
+    # Ties on the date and the name, and articles without a date
+    dated = IssueFactory(date="2001-03-01")
+    undated = IssueFactory(date=None)
+    ArticleFactory.create_batch(3, issue=dated, name="Ugle")
+    ArticleFactory.create_batch(2, issue=dated, name="Hekking")
+    ArticleFactory.create_batch(2, issue=undated)
+    ArticleFactory.create_batch(4)
+
+
+class TestKeysetPaginator:
+    def test_pages_follow_the_model_ordering(self, articles):
+        qs = Article.objects.select_related("issue")
+        expected = list(qs.order_by("-pub_date", "name", "pk"))
+
+        pages = walk(KeysetPaginator(qs, 3))
+
+        assert [obj for page in pages for obj in page] == expected
+        assert not pages[0].has_previous()
+        assert all(page.has_previous() for page in pages[1:])
+
+    def test_previous_cursor_returns_the_same_pages(self, articles):
+        paginator = KeysetPaginator(Article.objects.select_related("issue"), 3)
+        pages = walk(paginator)
+
+        for before, page in zip(pages, pages[1:]):
+            previous = paginator.get_page(page.previous_cursor)
+            assert list(previous) == list(before)
+            assert previous.has_next()
+
+    def test_pages_follow_the_search_rank(self):
+        BookFactory.create_batch(4, name="Kongeørn")
+        BookFactory.create_batch(3, name="Fugler", desc="Om kongeørn")
+        qs = Book.objects.search("kongeørn")
+
+        pages = walk(KeysetPaginator(qs, 2))
+
+        assert [obj for page in pages for obj in page] == list(
+            qs.order_by("-rank", "-date", "name", "pk")
+        )
+
+    def test_invalid_cursor_returns_the_first_page(self, articles):
+        paginator = KeysetPaginator(Article.objects.all(), 3)
+
+        page = paginator.get_page("garbage")
+
+        assert list(page) == list(paginator.get_page())
+
+    def test_count_can_be_approximate(self, articles):
+        assert approximate_count(Article.objects.all()) == 11
+        assert KeysetPaginator(Article.objects.all(), 3).count == 11
+
+
+class TestKeysetViews:
+    def test_search_view(self, client, settings, articles):
+        settings.LITERATURE_KEYSET_PAGINATION = True
+        url = reverse("literature:search")
+
+        first = client.get(url).context["paged_articles"]
+        second = client.get(url, {"a-cursor": first.next_cursor}).context[
+            "paged_articles"
+        ]
+
+        assert len(first) == 10
+        assert len(second) == 1
+        assert not second.has_next()
+
+    def test_book_list_view(self, client, settings):
+        settings.LITERATURE_KEYSET_PAGINATION = True
+        BookFactory.create_batch(7)
+        url = reverse("literature:book-list")
+
+        first = client.get(url).context["page_obj"]
+        second = client.get(url, {"cursor": first.next_cursor}).context["page_obj"]
+
+        assert len(first) == 5
+        assert len(second) == 2
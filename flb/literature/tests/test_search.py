@@ -0,0 +1,133 @@
+import pytest
+from django.core.management import call_command
+
+from flb.literature.filters import ArticleFilter
+from flb.literature.models import Article, Book
+from flb.literature.tests.factories import (
+    ArticleFactory,
+    AuthorFactory,
+    BookFactory,
+    IssueFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def test_article_search_matches_title_and_abstract():
+    article = ArticleFactory(name="Hekking hos lirype", abstract="Om fjellryper")
+    ArticleFactory(name="Trekkfugler", abstract="Om vadere")
+
+    assert list(Article.objects.search("lirype")) == [article]
+    assert list(Article.objects.search("fjellryper")) == [article]
+
+
+def test_article_search_matches_authors_and_tags():
+    article = ArticleFactory()
+    ArticleFactory()
+    article.authors.add(AuthorFactory(first_name="Ola", last_name="Nordmann"))
+    article.tags.add("ornitologi")
+
+    assert list(Article.objects.search("nordmann")) == [article]
+    assert list(Article.objects.search("ornitologi")) == [article]
+
+
+def test_article_search_follows_author_rename():
+    article = ArticleFactory()
+    author = AuthorFactory()
+    article.authors.add(author)
+
+    author.name = "Kari Fjellvik"
+    author.save()
+
+    assert list(Article.objects.search("fjellvik")) == [article]
+
+
+def test_search_forgets_deleted_authors_and_tags():
+    article = ArticleFactory()
+    book = BookFactory()
+    author = AuthorFactory(first_name="Ola", last_name="Nordmann")
+    article.authors.add(author)
+    book.authors.add(author)
+    article.tags.add("ornitologi")
+    book.tags.add("ornitologi")
+
+    author.delete()
+    article.tags.get().delete()
+
+    assert not Article.objects.search("nordmann").exists()
+    assert not Book.objects.search("nordmann").exists()
+    assert not Article.objects.search("ornitologi").exists()
+    assert not Book.objects.search("ornitologi").exists()
+
+
+def test_article_search_ranks_title_above_abstract():
+    in_abstract = ArticleFactory(name="Vinterfugler", abstract="Om kongeørn")
+    in_title = ArticleFactory(name="Kongeørn i Troms", abstract="Om hekking")
+
+    assert list(Article.objects.search("kongeørn")) == [in_title, in_abstract]
+
+
+def test_article_search_digit_query_matches_year():
+    article = ArticleFactory(issue=IssueFactory(date="1999-05-01"))
+    ArticleFactory(issue=IssueFactory(date="2005-05-01"))
+
+    assert list(Article.objects.search("1999")) == [article]
+
+
+def test_blank_query_returns_everything():
+    ArticleFactory.create_batch(2)
+
+    assert Article.objects.search("").count() == 2
+
+
+def test_book_search_matches_description_and_tags():
+    book = BookFactory(desc="Fuglene i Finnmark")
+    BookFactory(desc="Fuglene i Agder")
+    book.tags.add("atlas")
+
+    assert list(Book.objects.search("finnmark")) == [book]
+    assert list(Book.objects.search("atlas")) == [book]
+
+
+def test_update_search_vectors_backfills_missing_rows():
+    article = ArticleFactory(name="Dvergspett")
+    Article.objects.update(search_vector=None)
+
+    call_command("update_search_vectors", "--missing", stdout=None)
+
+    assert list(Article.objects.search("dvergspett")) == [article]
+
+
+def test_article_filter_returns_each_match_once():
+    article = ArticleFactory()
+    article.tags.add("rovfugl", "vadere")
+    authors = AuthorFactory.create_batch(2)
+    article.authors.add(*authors)
+    tags = list(article.tags.all())
+
+    qs = ArticleFilter(
+        {"tags": [tag.pk for tag in tags], "authors": [a.pk for a in authors]},
+        queryset=Article.objects.all(),
+    ).qs
+
+    assert list(qs) == [article]
+    assert "DISTINCT" not in str(qs.query)
+
+
+def test_pub_date_follows_the_issue():
+    article = ArticleFactory(issue=IssueFactory(date="1999-05-01"))
+    assert str(article.pub_date) == "1999-05-01"
+
+    article.issue.date = "2001-02-03"
+    article.issue.save()
+    article.refresh_from_db()
+    assert str(article.pub_date) == "2001-02-03"
+
+    article.issue = IssueFactory(date=None)
+    article.save()
+    article.refresh_from_db()
+    assert article.pub_date is None
+
+
+def test_default_article_ordering_needs_no_join():
+    assert "JOIN" not in str(Article.objects.all().query)
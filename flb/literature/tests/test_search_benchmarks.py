@@ -0,0 +1,159 @@
+"""
+Timings and EXPLAIN ANALYZE plans of the manager search() methods on
+generated datasets, run on demand with the sizes as generate_data scales:
+
+    $ LITERATURE_BENCHMARK_SCALES=10,100,1000 pytest flb/literature/tests/test_search_benchmarks.py
+
+Scale 1 is 1000 articles, so 10, 100 and 1000 are 10k, 100k and 1M. The
+results are written to LITERATURE_BENCHMARK_OUTPUT as JSON.
+"""
+
+import json
+import os
+from io import StringIO
+from statistics import median
+from time import perf_counter
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from taggit.models import Tag
+
+from flb.literature.management.commands.generate_data import Command as GenerateData
+from flb.literature.models import Article, Book, Issue, Journal
+
+SCALES = [
+    float(scale)
+    for scale in os.environ.get("LITERATURE_BENCHMARK_SCALES", "").split(",")
+    if scale.strip()
+]
+REPEAT = int(os.environ.get("LITERATURE_BENCHMARK_REPEAT", 5))
+OUTPUT = os.environ.get("LITERATURE_BENCHMARK_OUTPUT", "search-benchmarks.json")
+
+# The rows of the first search page
+PAGE_SIZE = 20
+
+MODELS = [Article, Book, Issue, Journal]
+QUERIES = ["digit", "token", "phrase", "empty", "tag"]
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(not SCALES, reason="LITERATURE_BENCHMARK_SCALES is not set"),
+]
+
+results = []
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda scale: f"scale-{scale:g}")
+def dataset(request, django_db_setup, django_db_blocker):
+    """
+    The rows of a scale, committed so the plans see real tables, and the
+    queries of each kind of search for them.
+    """
+    with django_db_blocker.unblock():
+        call_command(
+            "generate_data", scale=request.param, interactive=False, stdout=StringIO()
+        )
+        # Fresh statistics, as autovacuum would have them by now
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        tag = (
+            Tag.objects.annotate(items=Count("taggit_taggeditem_items"))
+            .order_by("-items", "pk")
+            .first()
+        )
+        yield {
+            "scale": request.param,
+            "rows": Article.objects.count(),
+            "queries": {model: _queries(model, tag) for model in MODELS},
+        }
+        # The other tests expect empty tables
+        GenerateData().truncate()
+        _write(request.config, request.param)
+
+
+def _queries(model, tag):
+    # Words and a year of the first row of the model, so they match
+    obj = model.objects.order_by("pk").first()
+    words = obj.name.rstrip(".").split()
+    date = getattr(obj, "pub_date", None) or getattr(obj, "date", None)
+    return {
+        "digit": str(date.year) if date else "2010",
+        "token": words[0],
+        "phrase": " ".join(words[:3]),
+        "empty": "qqqxqqq",
+        # The most used tag, matching the most rows of all tags
+        "tag": tag.name,
+    }
+
+
+def _timed(func):
+    # Best and median of a few runs, in milliseconds
+    times = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        func()
+        times.append((perf_counter() - start) * 1000)
+    return {"best": min(times), "median": median(times)}
+
+
+def _explain(func):
+    # The plan of the last query of func, as it ran
+    with CaptureQueriesContext(connection) as context:
+        func()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + context[-1]["sql"])
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+
+def _write(config, scale):
+    with open(OUTPUT, "w") as file:
+        json.dump(results, file, indent=2)
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    capture = config.pluginmanager.get_plugin("capturemanager")
+    if reporter is None:
+        return
+    # Fixture teardowns are captured, the table is shown anyway
+    with capture.global_and_fixture_disabled():
+        reporter.write_line("")
+        for result in results:
+            if result["scale"] == scale:
+                reporter.write_line(
+                    f"{result['rows']:>8} {result['model']:<8}{result['kind']:<8}"
+                    f"page {result['page_ms']['median']:9.2f}ms  "
+                    f"count {result['count_ms']['median']:9.2f}ms  "
+                    f"{result['count']:>8} rows"
+                )
+        reporter.write_line(f"Wrote {OUTPUT}")
+
+
+@pytest.mark.parametrize("kind", QUERIES)
+@pytest.mark.parametrize("model", MODELS, ids=lambda model: model.__name__)
+def test_search(dataset, model, kind):
+    query = dataset["queries"][model][kind]
+    queryset = model.objects.search(query)
+
+    def page():
+        # Sliced again each time, a sliced queryset keeps its rows
+        return list(queryset[:PAGE_SIZE])
+
+    count = queryset.count()
+    result = {
+        "scale": dataset["scale"],
+        "rows": dataset["rows"],
+        "model": model.__name__,
+        "kind": kind,
+        "query": query,
+        "count": count,
+        "page_ms": _timed(page),
+        "count_ms": _timed(queryset.count),
+        "page_plan": _explain(page),
+        "count_plan": _explain(queryset.count),
+    }
+    results.append(result)
+
+    if kind == "empty":
+        assert count == 0
+    assert "actual time" in result["page_plan"]
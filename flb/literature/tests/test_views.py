@@ -0,0 +1,138 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from flb.literature.tests.factories import (
+    ArticleFactory,
+    AuthorFactory,
+    BookFactory,
+    IssueFactory,
+    JournalFactory,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+class TestSearchView:
+    def test_facets_and_counts(self, client):
+        article = ArticleFactory(name="Kongeørn i Troms")
+        article.tags.add("rovfugl")
+        ArticleFactory(name="Vadere")
+        BookFactory(name="Kongeørn")
+
+        response = client.get(reverse("literature:search"), {"q": "kongeørn"})
+
+        assert response.status_code == 200
+        assert response.context["articles_count"] == 1
+        assert response.context["books_count"] == 1
+        assert response.context["tags"] == [("rovfugl", 1)]
+
+    def test_filter_by_tag(self, client):
+        article = ArticleFactory()
+        article.tags.add("rovfugl")
+        ArticleFactory()
+
+        response = client.get(reverse("literature:search"), {"tags": "rovfugl"})
+
+        assert list(response.context["paged_articles"]) == [article]
+
+    def test_filters_return_each_match_once(self, client):
+        article = ArticleFactory()
+        article.tags.add("rovfugl", "vadere")
+        first, second = AuthorFactory(), AuthorFactory()
+        article.authors.add(first, second)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(
+                reverse("literature:search"),
+                {"tags": ["rovfugl", "vadere"], "authors": [first.name, second.name]},
+            )
+
+        assert list(response.context["paged_articles"]) == [article]
+        assert response.context["articles_count"] == 1
+        # taggit prefetches the tags of the page with a DISTINCT of its own
+        article_queries = [
+            query["sql"]
+            for query in queries
+            if 'FROM "literature_article"' in query["sql"]
+        ]
+        assert article_queries
+        assert not any("DISTINCT" in sql for sql in article_queries)
+
+
+class TestArticleCards:
+    def test_abstract_excerpt_is_stored_on_save(self):
+        article = ArticleFactory(abstract="ord " * 80)
+
+        assert article.abstract_excerpt == "ord " * 49 + "ord…"
+
+    @pytest.mark.parametrize(
+        "url", [reverse("literature:search"), reverse("mainsite:home")]
+    )
+    def test_cards_skip_the_heavy_columns(self, client, url):
+        ArticleFactory.create_batch(2)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+
+        assert response.status_code == 200
+        for query in queries:
+            assert '"literature_article"."text"' not in query["sql"]
+            assert '"literature_article"."abstract",' not in query["sql"]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(queries)
+
+
+def add_articles(issue, n):
+    for article in ArticleFactory.create_batch(n, issue=issue):
+        article.authors.add(*AuthorFactory.create_batch(2))
+        article.tags.add("rovfugl")
+
+
+# The detail pages render in the same number of queries for any number of rows
+class TestDetailViewQueries:
+    def test_journal_detail(self, client, user):
+        journal = JournalFactory()
+        url = reverse("literature:journal-detail", args=[journal.slug])
+        IssueFactory.create_batch(2, journal=journal, created_by=user)
+        few = count_queries(client, url)
+
+        IssueFactory.create_batch(10, journal=journal, created_by=user)
+
+        assert count_queries(client, url) == few
+
+    def test_issue_detail(self, client):
+        issue = IssueFactory()
+        url = reverse("literature:issue-detail", args=[issue.slug])
+        add_articles(issue, 2)
+        few = count_queries(client, url)
+
+        add_articles(issue, 10)
+
+        assert count_queries(client, url) == few
+
+    def test_article_detail(self, client):
+        article = ArticleFactory()
+        url = reverse("literature:article-detail", args=[article.slug])
+        article.authors.add(AuthorFactory())
+        few = count_queries(client, url)
+
+        article.authors.add(*AuthorFactory.create_batch(5))
+
+        assert count_queries(client, url) == few
+
+    def test_author_detail(self, client):
+        author = AuthorFactory()
+        url = reverse("literature:author-detail", args=[author.slug])
+        author.authors.add(*ArticleFactory.create_batch(2))
+        few = count_queries(client, url)
+
+        author.authors.add(*ArticleFactory.create_batch(10))
+
+        assert count_queries(client, url) == few
@@ -1,9 +1,12 @@
 from django.urls import path
 
+from flb.literature.models import Article, Book, Issue
+
 from .views import (
     ArticleCreateView,
     ArticleDeleteView,
     ArticleDetailView,
+    ArticleImportView,
     ArticleListView,
     ArticleUpdateView,
     AuthorCreateView,
@@ -12,12 +15,14 @@ from .views import (
     AuthorUpdateView,
     BookDetailView,
     BookListView,
+    FileDownloadView,
     IssueCreateView,
     IssueDeleteView,
     IssueDetailView,
     IssueUpdateView,
     JournalDetailView,
     JournalListView,
+    SearchExportView,
     SearchView,
 )
 
@@ -31,16 +36,37 @@ urlpatterns = [
     path("issue/<pk>/update/", IssueUpdateView.as_view(), name="issue-update"),
     path("issue/<pk>/delete/", IssueDeleteView.as_view(), name="issue-delete"),
     path("issue/<slug:slug>/", IssueDetailView.as_view(), name="issue-detail"),
+    path(
+        "issue/<slug:slug>/file/",
+        FileDownloadView.as_view(model=Issue),
+        name="issue-file",
+    ),
     path("articles/", ArticleListView.as_view(), name="article-list"),
     path("article/create/<pk>/", ArticleCreateView.as_view(), name="article-create"),
+    path("articles/import/", ArticleImportView.as_view(), name="article-import"),
     path("article/<pk>/update/", ArticleUpdateView.as_view(), name="article-update"),
     path("article/<pk>/delete/", ArticleDeleteView.as_view(), name="article-delete"),
     path("article/<slug:slug>/", ArticleDetailView.as_view(), name="article-detail"),
+    path(
+        "article/<slug:slug>/file/",
+        FileDownloadView.as_view(model=Article),
+        name="article-file",
+    ),
     path("books/", BookListView.as_view(), name="book-list"),
     path("book/<slug:slug>/", BookDetailView.as_view(), name="book-detail"),
+    path(
+        "book/<slug:slug>/file/",
+        FileDownloadView.as_view(model=Book),
+        name="book-file",
+    ),
     path("author/create/", AuthorCreateView.as_view(), name="author-create"),
     path("author/<pk>/update/", AuthorUpdateView.as_view(), name="author-update"),
     path("author/<pk>/delete/", AuthorDeleteView.as_view(), name="author-delete"),
     path("author/<slug:slug>/", AuthorDetailView.as_view(), name="author-detail"),
     path("search/", SearchView.as_view(), name="search"),
+    path(
+        "search/export/<slug:results>.<slug:file_format>",
+        SearchExportView.as_view(),
+        name="search-export",
+    ),
 ]
@@ -1,7 +1,16 @@
+import io
+import posixpath
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
-from django.http import HttpResponse
+from django.db.models import prefetch_related_objects
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django.urls.base import reverse_lazy
 from django.utils import timezone
+from django.views.generic import View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, DeleteView, FormView, UpdateView
 from django.views.generic.list import ListView
@@ -11,22 +20,66 @@ from extra_views import (
     UpdateWithInlinesView,
 )
 
-from flb.literature.models import Article, Article_image, Author, Book, Issue, Journal
-
+from flb.literature.models import (
+    Article,
+    Article_image,
+    Author,
+    Book,
+    Issue,
+    Journal,
+    authors_exist,
+    tags_exist,
+)
+from flb.utils.asyncviews import AsyncViewMixin
+from flb.utils.downloads import serve_file
+from flb.utils.pagecache import AnonymousPageCacheMixin, object_tag, object_tags
+from flb.utils.parallel import ParallelTimeout, run_parallel
+
+from .cards import attach_cards
+from .exports import FORMATS, export
+from .facets import landing_facets, search_facets
 from .filters import ArticleFilter, IssueFilter
-from .forms import ArticleForm, AuthorForm, IssueForm, MainSearchForm
+from .forms import ArticleForm, ArticleImportForm, AuthorForm, IssueForm, MainSearchForm
+from .imports import READERS, ArticleImporter, InvalidRow
+from .pagination import KeysetPaginator
 
 # ********** BOOK VIEWS **********
 
 
-class BookListView(ListView):
+class BookListView(AnonymousPageCacheMixin, ListView):
     model = Book
     paginate_by = 5
 
+    # The page of books and their authors
+    def page_cache_tags(self):
+        through = Book.authors.through
+        authors = through.objects.filter(book__in=self.page_books).values_list(
+            "author_id", flat=True
+        )
+        return ["books", *object_tags(Author, set(authors))]
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.LITERATURE_KEYSET_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size)
+        page = paginator.get_page(self.request.GET.get("cursor"))
+        return (paginator, page, page.object_list, page.has_other_pages())
 
-class BookDetailView(DetailView):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["keyset"] = settings.LITERATURE_KEYSET_PAGINATION
+        self.page_books = [book.pk for book in context["object_list"]]
+        return context
+
+
+class BookDetailView(AsyncViewMixin, AnonymousPageCacheMixin, DetailView):
     model = Book
 
+    def page_cache_tags(self):
+        authors = self.object.authors.values_list("pk", flat=True)
+        return [object_tag(Book, self.object.pk), *object_tags(Author, authors)]
+
 
 # ********** ARTICLE VIEWS **********
 
@@ -87,8 +140,17 @@ class ArticleUpdateView(UpdateWithInlinesView):
         return super(ArticleUpdateView, self).form_valid(form)
 
 
-class ArticleDetailView(DetailView):
+class ArticleDetailView(AsyncViewMixin, AnonymousPageCacheMixin, DetailView):
     model = Article
+    queryset = Article.objects.detail()
+
+    def page_cache_tags(self):
+        tags = [object_tag(Article, self.object.pk)]
+        tags += object_tags(Author, [author.pk for author in self.object.authors.all()])
+        if self.object.issue:
+            tags.append(object_tag(Issue, self.object.issue_id))
+            tags.append(object_tag(Journal, self.object.issue.journal_id))
+        return tags
 
 
 class ArticleDeleteView(DeleteView):
@@ -98,14 +160,44 @@ class ArticleDeleteView(DeleteView):
     # To add loginmixin and editor check
 
 
+class ArticleImportView(LoginRequiredMixin, FormView):
+    template_name = "literature/article_import.html"
+    form_class = ArticleImportForm
+    success_url = reverse_lazy("literature:journal-list")
+
+    def form_valid(self, form):
+        # Editors import into their own journals only
+        importer = ArticleImporter(
+            journals=Journal.objects.filter(editors=self.request.user),
+            user=self.request.user,
+        )
+        stream = io.TextIOWrapper(
+            form.cleaned_data["file"], encoding="utf-8-sig", newline=""
+        )
+        try:
+            created = importer.run(READERS[form.file_format](stream))
+        except (InvalidRow, UnicodeDecodeError) as e:
+            form.add_error("file", f"Nothing was imported. {e}")
+            return self.form_invalid(form)
+
+        messages.success(
+            self.request,
+            "Imported {articles} articles, created {issues} issues, "
+            "{authors} authors and {tags} tags.".format_map(created),
+        )
+        return super().form_valid(form)
+
+
 class ArticleListView(ListView):
     model = Article
+    queryset = Article.objects.card()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         filtered_articles = ArticleFilter(
             self.request.GET,
+            queryset=self.get_queryset(),
         )
         context["filtered_articles"] = filtered_articles
 
@@ -115,46 +207,86 @@ class ArticleListView(ListView):
 # ********** JOURNAL VIEWS **********
 
 
-class JournalDetailView(DetailView):
+class JournalDetailView(AsyncViewMixin, AnonymousPageCacheMixin, DetailView):
     model = Journal
+    queryset = Journal.objects.detail()
+
+    def page_cache_tags(self):
+        return [
+            object_tag(Journal, self.object.pk),
+            f"journal-issues:{self.object.pk}",
+        ]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        issues = self.object.issue_set.all()
-        context["issues"] = issues
+        issues = self.object.issue_set.card()
         issues_filtered_list = IssueFilter(self.request.GET, queryset=issues)
         context["filtered_issues"] = issues_filtered_list
+        user = self.request.user
+        context["issues"] = attach_cards(
+            issues,
+            "literature/cards/issue.html",
+            context=lambda issue: {
+                "owner": user.is_authenticated and issue.created_by_id == user.pk
+            },
+        )
 
-        articles = Article.objects.filter(issue__journal=self.object)
+        articles = Article.objects.card().filter(issue__journal=self.object)
         context["articles"] = articles
 
-        authors = Author.objects.filter(authors__issue__journal=self.object).distinct
+        authors = Author.objects.of_articles(articles)
         context["authors"] = authors
 
         return context
 
 
-class JournalListView(ListView):
+class JournalListView(AnonymousPageCacheMixin, ListView):
     model = Journal
     # paginate_by = 10
+    # The "sort" param, the counters are columns so sorting by them is cheap
+    orderings = {
+        "name": ["name"],
+        "issues": ["-issue_count", "name"],
+        "articles": ["-article_count", "name"],
+    }
+
+    def get_ordering(self):
+        return self.orderings.get(self.request.GET.get("sort"), ["name"])
+
+    def page_cache_tags(self):
+        return ["journals"]
 
 
 # ********** ISSUE VIEWS **********
 
 
-class IssueDetailView(DetailView):
+class IssueDetailView(AsyncViewMixin, AnonymousPageCacheMixin, DetailView):
     model = Issue
+    queryset = Issue.objects.detail()
+
+    def page_cache_tags(self):
+        return [
+            object_tag(Issue, self.object.pk),
+            f"issue-articles:{self.object.pk}",
+            object_tag(Journal, self.object.journal_id),
+            *object_tags(Author, [author.pk for author in self.authors]),
+        ]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["now"] = timezone.now()
 
-        articles = self.object.article_set.all()
-        context["articles"] = articles
+        articles = self.object.article_set.card(prefetch=False)
+        context["articles"] = attach_cards(
+            articles,
+            "literature/cards/article.html",
+            prefetch=[Article.objects.card_authors()],
+        )
 
-        authors = Author.objects.filter(authors__issue=self.object).distinct
+        authors = Author.objects.of_articles(articles)
         context["authors"] = authors
+        self.authors = authors
 
         return context
 
@@ -205,7 +337,7 @@ class AuthorDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         context["now"] = timezone.now()
 
-        articles = Article.objects.filter(authors=self.object)
+        articles = Article.objects.card().filter(authors=self.object)
         context["articles"] = articles
 
         return context
@@ -230,7 +362,59 @@ class AuthorDeleteView(DeleteView):
     template_name = "snippets/confirm_delete.html"
 
 
-class SearchView(FormView):
+def search_results(params):
+    """
+    The articles and books matching the search parameters (a QueryDict),
+    and the parameters themselves.
+    """
+    query = params.get("q", None)
+    filters = {
+        "query": query,
+        "file": params.get("file", None),
+        "tags": params.getlist("tags", None),
+        "journals": params.getlist("journals", None),
+        "authors": params.getlist("authors", None),
+        "years": params.getlist("years", None),
+    }
+
+    # Filtering the objects by query
+    if query is not None:
+        articles = Article.objects.search(query)
+        books = Book.objects.search(query)
+    else:
+        articles = Article.objects.all()
+        books = Book.objects.all()
+
+    # Filter by file
+    if filters["file"] is not None:
+        articles = articles.exclude(file="")
+        books = books.exclude(file="")
+
+    # Filter by tags, the m2m filters are EXISTS subqueries so the
+    # results need no distinct()
+    if filters["tags"]:
+        articles = articles.filter(tags_exist(Article, tag__name__in=filters["tags"]))
+        books = books.filter(tags_exist(Book, tag__name__in=filters["tags"]))
+
+    # Filter by journal
+    if filters["journals"]:
+        articles = articles.filter(issue__journal__name__in=filters["journals"])
+
+    # Filter by authors
+    if filters["authors"]:
+        authors = filters["authors"]
+        articles = articles.filter(authors_exist(Article, author__name__in=authors))
+        books = books.filter(authors_exist(Book, author__name__in=authors))
+
+    # Filter by years
+    if filters["years"]:
+        articles = articles.filter(pub_date__year__in=filters["years"])
+        books = books.filter(date__year__in=filters["years"])
+
+    return articles, books, filters
+
+
+class SearchView(AsyncViewMixin, FormView):
     template_name = "literature/search.html"
     form_class = MainSearchForm
 
@@ -239,115 +423,99 @@ class SearchView(FormView):
         initial.update(self.request.GET.items())
         return initial
 
+    def get(self, request, *args, **kwargs):
+        try:
+            return super().get(request, *args, **kwargs)
+        except ParallelTimeout:
+            return HttpResponse(
+                "The search took too long, please narrow it down.", status=503
+            )
+
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
 
         request = self.request
 
-        # Getting query param from GET
-        query = request.GET.get("q", None)
-
-        # Filtering the context objects by query
-        if query is not None:
-            articles = (
-                Article.objects.search(query)
-                .select_related("issue", "issue__journal")
-                .prefetch_related(
-                    "authors",
-                    "tags",
-                )
-            )
-            books = Book.objects.search(query).prefetch_related(
-                "authors",
-                "tags",
-            )
+        articles, books, filters = search_results(request.GET)
+        query = filters["query"]
+        file = filters["file"]
+        get_tags = filters["tags"]
+        get_journals = filters["journals"]
+        get_authors = filters["authors"]
+        get_years = filters["years"]
+
+        # The rest of the article cards is cached, see attach_cards below
+        articles = articles.card(prefetch=False)
+        books = books.prefetch_related("authors", "tags")
+
+        # Setting the filters value after filtering, with counts. The
+        # unfiltered landing page is served from the cached snapshot.
+        unfiltered = not (
+            query
+            or file is not None
+            or get_tags
+            or get_journals
+            or get_authors
+            or get_years
+        )
+        facets = landing_facets() if unfiltered else None
+
+        # Setting the pagination, by cursor in keyset mode
+        keyset = settings.LITERATURE_KEYSET_PAGINATION
+        if keyset:
+            articles_paginator = KeysetPaginator(articles, 10)
+            books_paginator = KeysetPaginator(books, 10)
+            a_page = request.GET.get("a-cursor")
+            b_page = request.GET.get("b-cursor")
         else:
-            articles = (
-                Article.objects.all()
-                .select_related("issue", "issue__journal")
-                .prefetch_related(
-                    "authors",
-                    "tags",
-                )
+            articles_paginator = Paginator(articles, 10)
+            books_paginator = Paginator(books, 10)
+            a_page = request.GET.get("a-page")
+            b_page = request.GET.get("b-page")
+        if unfiltered:
+            articles_paginator.count = facets["articles"]
+            books_paginator.count = facets["books"]
+
+        def article_group():
+            page = articles_paginator.get_page(a_page)
+            article_cards = attach_cards(
+                page,
+                "literature/cards/article.html",
+                prefetch=[Article.objects.card_authors()],
+                context=lambda article: {"show_journal": True},
             )
-            books = Book.objects.all().prefetch_related(
-                "authors",
-                "tags",
-            )
-
-        # Filter by file
-        file = request.GET.get("file", None)
-        if file is not None:
-            articles = articles.exclude(file="")
-            books = books.exclude(file="")
-
-        # Filter by tags
-        get_tags = request.GET.getlist("tags", None)
-        if get_tags:
-            articles = articles.filter(tags__name__in=get_tags)
-            books = books.filter(tags__name__in=get_tags)
-
-        # Filter by journal
-        get_journals = request.GET.getlist("journals", None)
-        if get_journals:
-            articles = articles.filter(issue__journal__name__in=get_journals)
-
-        # Filter by authors
-        get_authors = request.GET.getlist("authors", None)
-        if get_authors:
-            articles = articles.filter(authors__name__in=get_authors)
-            books = books.filter(authors__name__in=get_authors)
-
-        # Filter by years
-        get_years = request.GET.getlist("years", None)
-        if get_years:
-            articles = articles.filter(issue__date__year__in=get_years)
-            books = books.filter(date__year__in=get_years)
-
-        # Setting the filters value after filtering
-        article_tags = list(articles.values_list("tags__name", flat=True))
-        book_tags = list(books.values_list("tags__name", flat=True))
-        tags = set(article_tags + book_tags)
-
-        journals = set(articles.values_list("issue__journal__name", flat=True))
-
-        article_authors = list(articles.values_list("authors__name", flat=True))
-        book_authors = list(books.values_list("authors__name", flat=True))
-        authors = set(article_authors + book_authors)
-
-        article_years = list(articles.values_list("issue__date__year", flat=True))
-        book_years = list(books.values_list("date__year", flat=True))
-        years = set(article_years + book_years)
-
-        # Making sure there are no duplicates
-        articles = articles.distinct()
-        books = books.distinct()
-
-        # Setting the pagination
-        articles_paginator = Paginator(articles, 10)
-        a_page_number = request.GET.get("a-page")
-        paged_articles = articles_paginator.get_page(a_page_number)
-        context["paged_articles"] = paged_articles
-
-        books_paginator = Paginator(books, 10)
-        b_page_number = request.GET.get("b-page")
-        paged_books = books_paginator.get_page(b_page_number)
-        context["paged_books"] = paged_books
-
-        # Setting the counts
-        context["articles_count"] = articles.count()
-        context["books_count"] = books.count()
+            prefetch_related_objects(article_cards, "tags")
+            return page, articles_paginator.count
+
+        def book_group():
+            page = books_paginator.get_page(b_page)
+            page.object_list = list(page.object_list)
+            return page, books_paginator.count
+
+        # The article and book sides are independent, and run side by side
+        # with PARALLEL_THREADS
+        groups = {"articles": article_group, "books": book_group}
+        if not unfiltered:
+            groups["facets"] = lambda: search_facets(articles, books)
+        results = run_parallel(groups, timeout=settings.LITERATURE_SEARCH_TIMEOUT)
+        facets = results.get("facets", facets)
+
+        context["keyset"] = keyset
+        # Setting the counts, already computed by the paginators (approximate
+        # for large results in keyset mode)
+        context["paged_articles"], context["articles_count"] = results["articles"]
+        context["paged_books"], context["books_count"] = results["books"]
 
         # Setting the params in context
         context["query"] = query
         context["get_years"] = get_years
-        context["years"] = years
+        context["years"] = facets["years"]
         context["file"] = file
         context["get_tags"] = get_tags
-        context["tags"] = tags
-        context["authors"] = authors
+        context["tags"] = facets["tags"]
+        context["authors"] = facets["authors"]
         context["get_authors"] = get_authors
-        context["journals"] = journals
+        context["journals"] = facets["journals"]
         context["get_journals"] = get_journals
 
         context["request"] = request
@@ -355,3 +523,43 @@ class SearchView(FormView):
         # context['form'] = form
 
         return context
+
+
+class SearchExportView(View):
+    """
+    All the articles or books of a search as a CSV, JSON or BibTeX file,
+    taking the same parameters as SearchView.
+    """
+
+    def get(self, request, results, file_format):
+        if results not in ("articles", "books") or file_format not in FORMATS:
+            raise Http404
+        articles, books, filters = search_results(request.GET)
+        queryset = articles if results == "articles" else books
+
+        response = StreamingHttpResponse(
+            export(queryset, file_format, request.build_absolute_uri),
+            content_type=FORMATS[file_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{results}.{file_format}"'
+        )
+        return response
+
+
+class FileDownloadView(AsyncViewMixin, View):
+    """
+    The PDF of an article, issue or book, with range requests so browsers
+    can open a page without downloading the whole file.
+    """
+
+    model = None
+
+    def get(self, request, slug):
+        obj = get_object_or_404(
+            self.model.objects.only("id", "slug", "file"), slug=slug
+        )
+        if not obj.file:
+            raise Http404
+        _, extension = posixpath.splitext(obj.file.name)
+        return serve_file(request, obj.file, filename=obj.slug + extension)
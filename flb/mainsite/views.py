@@ -1,24 +1,35 @@
 from django.views.generic.edit import FormView
 from literature.forms import MainSearchForm
 
-from flb.literature.models import Article, Issue
+from flb.literature.models import Article, Author, Issue
 from flb.posts.models import Post
+from flb.utils.pagecache import AnonymousPageCacheMixin, object_tags
 
 
-class HomeView(FormView):
+class HomeView(AnonymousPageCacheMixin, FormView):
     template_name = "mainsite/home.html"
     form_class = MainSearchForm
 
+    # The latest articles, issues and posts, and the authors of the articles
+    def page_cache_tags(self):
+        authors = {a.pk for article in self.articles for a in article.authors.all()}
+        return [
+            "home",
+            *object_tags(Article, [article.pk for article in self.articles]),
+            *object_tags(Author, authors),
+        ]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        articles = Article.objects.all().order_by("-created_at")[:5]
+        articles = Article.objects.card().order_by("-created_at")[:5]
         context["articles"] = articles
+        self.articles = articles
 
         posts = Post.objects.all().order_by("-created_at")[:5]
         context["posts"] = posts
 
-        issues = Issue.objects.all().order_by("-created_at")[:5]
+        issues = Issue.objects.card().order_by("-created_at")[:5]
         context["issues"] = issues
 
         return context
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PostsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "flb.posts"
+
+    def ready(self):
+        import flb.posts.signals  # noqa
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from flb.posts.models import Post
+from flb.utils.pagecache import purge
+
+
+# The home page lists the latest posts
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed_purge_pages(sender, **kwargs):
+    purge("home")
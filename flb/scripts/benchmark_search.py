@@ -0,0 +1,123 @@
+"""
+Compare the search filters written as m2m joins plus DISTINCT with the
+EXISTS subqueries the views use now.
+
+Seed a large dataset first (python manage.py generate_data --scale 100),
+then run with: python manage.py runscript benchmark_search
+"""
+
+import json
+from time import perf_counter
+
+from django.db import connection
+from django.db.models import Q
+from taggit.models import Tag
+
+from flb.literature.models import (
+    Article,
+    Author,
+    Book,
+    author_name_lookup,
+    authors_exist,
+    tags_exist,
+)
+
+REPEAT = 5
+
+
+def legacy_search(model, query):
+    # The join based search as it was before the EXISTS rewrite
+    lookup = Q(authors__first_name__icontains=query)
+    lookup |= Q(authors__last_name__icontains=query)
+    lookup |= Q(authors__name__icontains=query)
+    lookup |= Q(tags__name__in=[query])
+    if query.isdigit():
+        lookup |= (
+            Q(issue__date__year=query) if model is Article else Q(date__year=query)
+        )
+    return model.objects.filter(lookup).distinct()
+
+
+def exists_search(model, query):
+    lookup = Q(authors_exist(model, author_name_lookup(query)))
+    lookup |= Q(tags_exist(model, tag__name__in=[query]))
+    if query.isdigit():
+        lookup |= Q(pub_date__year=query) if model is Article else Q(date__year=query)
+    return model.objects.filter(lookup)
+
+
+def cases():
+    tags = list(Tag.objects.values_list("name", flat=True)[:3])
+    authors = list(Author.objects.values_list("name", flat=True)[:3])
+    author = Author.objects.first()
+    year = str(Article.objects.values_list("pub_date__year", flat=True).first())
+    text = author.last_name if author else "a"
+
+    for model in (Article, Book):
+        name = model._meta.verbose_name_plural.lower()
+        yield (
+            f"{name}: q text",
+            legacy_search(model, text),
+            exists_search(model, text),
+        )
+        yield (
+            f"{name}: q digit",
+            legacy_search(model, year),
+            exists_search(model, year),
+        )
+        yield (
+            f"{name}: tags",
+            model.objects.filter(tags__name__in=tags).distinct(),
+            model.objects.filter(tags_exist(model, tag__name__in=tags)),
+        )
+        yield (
+            f"{name}: authors",
+            model.objects.filter(authors__name__in=authors).distinct(),
+            model.objects.filter(authors_exist(model, author__name__in=authors)),
+        )
+        yield (
+            f"{name}: tags and authors",
+            model.objects.filter(tags__name__in=tags)
+            .filter(authors__name__in=authors)
+            .distinct(),
+            model.objects.filter(tags_exist(model, tag__name__in=tags)).filter(
+                authors_exist(model, author__name__in=authors)
+            ),
+        )
+
+
+def plan_cost(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Total Cost"]
+
+
+def timing(queryset):
+    # Best of a few runs of the first search page, in milliseconds
+    best = None
+    for _ in range(REPEAT):
+        start = perf_counter()
+        list(queryset[:20])
+        elapsed = (perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(*args):
+    print(
+        f"{Article.objects.count()} articles, {Book.objects.count()} books, "
+        f"{Author.objects.count()} authors, {Tag.objects.count()} tags"
+    )
+    print(
+        f"{'case':<30}{'distinct cost':>15}{'exists cost':>15}{'distinct ms':>13}{'exists ms':>11}"
+    )
+    for label, legacy, current in cases():
+        assert legacy.count() == current.count(), label
+        print(
+            f"{label:<30}{plan_cost(legacy):>15.1f}{plan_cost(current):>15.1f}"
+            f"{timing(legacy):>13.2f}{timing(current):>11.2f}"
+        )
@@ -0,0 +1,71 @@
+/*
+ * Uploads the files of inputs with data-direct-upload straight to the
+ * storage, and sends the form with the token of the upload instead of the
+ * file, see flb/utils/uploads.py.
+ */
+(function () {
+  function post(url, data, onProgress) {
+    return new Promise(function (resolve, reject) {
+      const request = new XMLHttpRequest();
+      request.open("POST", url);
+      request.upload.addEventListener("progress", function (event) {
+        if (event.lengthComputable) onProgress(event.loaded / event.total);
+      });
+      request.addEventListener("load", function () {
+        if (request.status >= 200 && request.status < 300) {
+          resolve(request.responseText);
+        } else {
+          reject(new Error(request.responseText || request.statusText));
+        }
+      });
+      request.addEventListener("error", function () {
+        reject(new Error("The upload failed"));
+      });
+      request.send(data);
+    });
+  }
+
+  async function upload(input, status) {
+    const form = input.form;
+    const file = input.files[0];
+    const token = form.elements[input.name + "_upload"];
+    const buttons = form.querySelectorAll("[type=submit]");
+    token.value = "";
+    if (!file) return;
+
+    buttons.forEach((button) => (button.disabled = true));
+    try {
+      const presign = new FormData();
+      presign.append("csrfmiddlewaretoken", form.elements.csrfmiddlewaretoken.value);
+      presign.append("field", input.dataset.directUpload);
+      presign.append("filename", file.name);
+      presign.append("content_type", file.type);
+      presign.append("size", file.size);
+      const policy = JSON.parse(await post(input.dataset.presignUrl, presign, () => {}));
+
+      const data = new FormData();
+      Object.entries(policy.fields).forEach(([name, value]) => data.append(name, value));
+      // S3 wants the file last
+      data.append("file", file);
+      await post(policy.url, data, function (done) {
+        status.textContent = `Uploading ${file.name}: ${Math.round(done * 100)}%`;
+      });
+
+      token.value = policy.token;
+      status.textContent = `Uploaded ${file.name}`;
+      // Not sent again with the form
+      input.value = "";
+    } catch (error) {
+      status.textContent = `${file.name} was not uploaded: ${error.message}`;
+    } finally {
+      buttons.forEach((button) => (button.disabled = false));
+    }
+  }
+
+  document.querySelectorAll("input[type=file][data-direct-upload]").forEach(function (input) {
+    const status = document.createElement("small");
+    status.className = "form-text text-muted";
+    input.after(status);
+    input.addEventListener("change", () => upload(input, status));
+  });
+})();
@@ -0,0 +1,140 @@
+"""
+Views answered by a coroutine, so a worker of the ASGI server (see
+config/asgi.py) keeps serving other requests while one of them waits on the
+database, the cache or the storage.
+
+Django 3.1 has no async ORM, cache nor storage API, so the sync view still
+does the work, on a bounded pool of ASYNC_VIEW_THREADS threads with database
+connections of their own, as in flb.utils.parallel. Django would otherwise
+run every sync view of the process on one and the same thread. Under WSGI,
+as in the tests, the view runs in the request thread as before.
+
+ASGIHandler, the application of config/asgi.py, also reads the bodies of
+streaming responses off the event loop.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers import asgi
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections, connection, transaction
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                settings.ASYNC_VIEW_THREADS, thread_name_prefix="asyncview"
+            )
+    return _executor
+
+
+def _call(func, *args, **kwargs):
+    if not connection.settings_dict["ATOMIC_REQUESTS"]:
+        return func(*args, **kwargs)
+    # In place of ATOMIC_REQUESTS, which the async views opt out of
+    with transaction.atomic():
+        return func(*args, **kwargs)
+
+
+def _pool_call(func, *args, **kwargs):
+    # Like around a request: drop the connection when it broke or expired
+    close_old_connections()
+    try:
+        return _call(func, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(request, func, *args, **kwargs):
+    """Await func(*args, **kwargs), the sync work of a request."""
+    if isinstance(request, ASGIRequest):
+        loop = asyncio.get_running_loop()
+        # With the context variables of the request, as sync_to_async does
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            _get_executor(), partial(context.run, _pool_call, func, *args, **kwargs)
+        )
+    # Back in the WSGI thread that awaits the view
+    return await sync_to_async(_call, thread_sensitive=True)(func, *args, **kwargs)
+
+
+class AsyncViewMixin:
+    """
+    Makes a class-based view async: its sync dispatch() and the rendering
+    of its template response run through run_sync(). Put it first in the
+    bases, so the page cache of AnonymousPageCacheMixin is read in the
+    thread too.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Django 3.1 only awaits views that look like coroutine functions,
+        # as_view() of Django 4.1 marks async views the same way
+        view._is_coroutine = asyncio.coroutines._is_coroutine
+        # An atomic block can't span the threads, run_sync opens one instead
+        return transaction.non_atomic_requests(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        return await run_sync(request, self._sync_dispatch, request, *args, **kwargs)
+
+    def _sync_dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        # Templates may still run queries
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """
+    Django's ASGI handler, reading each part of a streaming response in a
+    thread. Django 3.1 iterates them in the event loop, where the exports
+    fail with SynchronousOnlyOperation on their first query and file reads
+    block every other request of the worker.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        headers = [
+            (header.encode("ascii"), value.encode("latin1"))
+            for header, value in response.items()
+        ]
+        for cookie in response.cookies.values():
+            headers.append(
+                (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+            )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": headers,
+            }
+        )
+        # On the thread of the sync views, which holds the connection of a
+        # server side cursor opened by the view
+        next_part = sync_to_async(next, thread_sensitive=True)
+        parts = iter(response)
+        while True:
+            part = await next_part(parts, None)
+            if part is None:
+                break
+            for chunk, _ in self.chunk_bytes(part):
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
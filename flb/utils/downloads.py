@@ -0,0 +1,169 @@
+"""
+Downloads of stored files with byte ranges and conditional requests, so
+browsers can page through large PDFs and keep them cached.
+
+The body is streamed from the storage in chunks, or with DOWNLOAD_SENDFILE
+handed off to the front proxy, which then also answers the ranges:
+
+- "x-accel-redirect": nginx serves DOWNLOAD_ACCEL_PREFIX followed by the
+  file name from an internal location, aliasing MEDIA_ROOT or proxying the
+  bucket.
+- "x-sendfile": Apache or lighttpd serve the local path of the file.
+
+Files of a storage without local paths, e.g. S3, are otherwise redirected
+to, as the storage answers ranges itself.
+
+Under ASGI the local files need DOWNLOAD_SENDFILE: their reads would block
+the event loop of the worker.
+"""
+
+import hashlib
+import mimetypes
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(name, size, modified):
+    # Stored names are never reused for other content, so the name, size and
+    # time identify the bytes, and the ETag can be strong
+    key = f"{name}:{size}:{modified}"
+    return '"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+
+def parse_range(header, size):
+    """
+    The first and last byte of a single range Range header, or None when
+    the header is to be ignored, e.g. for several ranges. Raises ValueError
+    when the range is outside the file.
+    """
+    match = RANGE_RE.match(header.replace(" ", ""))
+    if match is None or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # The last bytes of the file
+        suffix = int(last)
+        if not suffix or not size:
+            raise ValueError("Empty range")
+        return max(size - suffix, 0), size - 1
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        raise ValueError("Range starts after the end of the file")
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def _if_range_matches(request, etag, last_modified):
+    value = request.META.get("HTTP_IF_RANGE")
+    if value is None:
+        return True
+    if value.startswith('"'):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def _read(file, start, length):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _local_path(file):
+    try:
+        return file.path
+    except NotImplementedError:
+        return None
+
+
+def _content_disposition(filename, as_attachment):
+    disposition = "attachment" if as_attachment else "inline"
+    try:
+        filename.encode("ascii")
+        return f'{disposition}; filename="{filename}"'
+    except UnicodeEncodeError:
+        return f"{disposition}; filename*=utf-8''{quote(filename)}"
+
+
+def serve_file(request, file, filename=None, as_attachment=False):
+    """Respond with a FieldFile, downloaded as filename."""
+    mode = settings.DOWNLOAD_SENDFILE
+    path = _local_path(file)
+    if path is None and mode != "x-accel-redirect":
+        return HttpResponseRedirect(file.url)
+    if not mode and isinstance(request, ASGIRequest):
+        raise ImproperlyConfigured("Serving files under ASGI needs DOWNLOAD_SENDFILE")
+
+    try:
+        size = file.size
+        modified = file.storage.get_modified_time(file.name)
+    except OSError:
+        raise Http404("The file is missing")
+    last_modified = int(modified.timestamp())
+    etag = file_etag(file.name, size, last_modified)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        filename = filename or posixpath.basename(file.name)
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        byte_range = None
+        if "HTTP_RANGE" in request.META and _if_range_matches(
+            request, etag, last_modified
+        ):
+            try:
+                byte_range = parse_range(request.META["HTTP_RANGE"], size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{size}"
+                return response
+
+        if mode:
+            # The proxy sends the body and answers the Range header
+            response = HttpResponse(content_type=content_type)
+            if mode == "x-accel-redirect":
+                response["X-Accel-Redirect"] = settings.DOWNLOAD_ACCEL_PREFIX + quote(
+                    file.name
+                )
+            else:
+                response["X-Sendfile"] = path
+        elif byte_range is not None:
+            first, last = byte_range
+            response = StreamingHttpResponse(
+                _read(file.open("rb"), first, last - first + 1),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Range"] = f"bytes {first}-{last}/{size}"
+            response["Content-Length"] = last - first + 1
+        else:
+            # Sent with the servers sendfile() where it has one
+            response = FileResponse(file.open("rb"), content_type=content_type)
+            response["Content-Length"] = size
+        response["Content-Disposition"] = _content_disposition(filename, as_attachment)
+        response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
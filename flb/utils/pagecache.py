@@ -0,0 +1,107 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.http import urlencode
+from django.utils.translation import get_language
+
+
+# The tag of the pages showing one object, e.g. "journal:12"
+def object_tag(model, pk):
+    return f"{model._meta.model_name}:{pk}"
+
+
+def object_tags(model, pks):
+    return [object_tag(model, pk) for pk in pks]
+
+
+def _tag_key(tag):
+    return f"pagecache:tag:{tag}"
+
+
+def tag_versions(tags):
+    keys = {tag: _tag_key(tag) for tag in tags}
+    versions = cache.get_many(keys.values())
+    missing = [key for key in keys.values() if key not in versions]
+    if missing:
+        # Starting from the clock, a version lost from the cache can never
+        # come back lower and revive stale pages
+        for key in missing:
+            cache.add(key, time.time_ns(), None)
+        versions.update(cache.get_many(missing))
+    return {tag: versions.get(key) for tag, key in keys.items()}
+
+
+def _bump(tags):
+    for tag in tags:
+        try:
+            cache.incr(_tag_key(tag))
+        except ValueError:
+            cache.set(_tag_key(tag), time.time_ns(), None)
+
+
+def purge(*tags):
+    """Drop the cached pages tagged with any of the tags."""
+    # Bumped again after commit, so a request running meanwhile cannot
+    # store a page rendered from the old rows under the new versions
+    _bump(tags)
+    transaction.on_commit(lambda: _bump(tags))
+
+
+def page_key(request):
+    match = request.resolver_match
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    kwargs = urlencode(sorted(match.kwargs.items()))
+    digest = hashlib.md5(f"{kwargs}?{query}".encode()).hexdigest()
+    # LocaleMiddleware picks the language from the request headers
+    return f"pagecache:page:{match.view_name}:{get_language()}:{digest}"
+
+
+class AnonymousPageCacheMixin:
+    """
+    Serve GET requests of anonymous users from a full page cache, keyed on
+    the URL name, its arguments, the sorted query string and the language.
+
+    Views list the tags of the objects a page shows in page_cache_tags(),
+    e.g. "journal:12". A cached page is only served while none of its tags
+    has been purged since it was rendered, see purge().
+    """
+
+    def page_cache_tags(self):
+        return []
+
+    def dispatch(self, request, *args, **kwargs):
+        timeout = settings.PAGE_CACHE_TIMEOUT
+        if (
+            not timeout
+            or request.method not in ("GET", "HEAD")
+            or request.user.is_authenticated
+            or len(get_messages(request))
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = page_key(request)
+        entry = cache.get(key)
+        if entry is not None and tag_versions(entry["tags"]) == entry["tags"]:
+            return HttpResponse(entry["content"], content_type=entry["content_type"])
+
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        # Pages with a CSRF token or cookies are for one visitor only
+        if (
+            response.status_code == 200
+            and not response.cookies
+            and not request.META.get("CSRF_COOKIE_USED")
+        ):
+            entry = {
+                "tags": tag_versions(self.page_cache_tags()),
+                "content": response.content,
+                "content_type": response["Content-Type"],
+            }
+            cache.set(key, entry, timeout)
+        return response
@@ -0,0 +1,92 @@
+"""
+Independent groups of queries of one request, run side by side on a shared
+and bounded thread pool, so the request waits for its slowest group instead
+of the sum of them.
+
+Every pool thread keeps its own database connection, PARALLEL_THREADS of
+them per process at most. The threads don't share the transaction of the
+request: they only see committed rows, and their queries are not counted by
+flb.utils.querycount. With PARALLEL_THREADS = 0 the groups run one after
+another in the request thread, as in the tests.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from time import monotonic
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    OperationalError,
+    close_old_connections,
+    connections,
+    transaction,
+)
+
+# The Postgres error code of a statement cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ParallelTimeout(Exception):
+    pass
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                settings.PARALLEL_THREADS, thread_name_prefix="parallel"
+            )
+    return _executor
+
+
+def _call(func, deadline, using):
+    # Like around a request: drop the connection when it broke or expired
+    close_old_connections()
+    connection = connections[using]
+    try:
+        with transaction.atomic(using=using):
+            if deadline is not None and connection.vendor == "postgresql":
+                # Cancels the queries still running at the deadline
+                timeout = max(int((deadline - monotonic()) * 1000), 1)
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT set_config('statement_timeout', %s, true)",
+                        [str(timeout)],
+                    )
+            return func()
+    except OperationalError as e:
+        if getattr(e.__cause__, "pgcode", None) == QUERY_CANCELED:
+            raise ParallelTimeout("A query ran past the deadline") from e
+        raise
+    finally:
+        close_old_connections()
+
+
+def run_parallel(funcs, timeout=None, using=DEFAULT_DB_ALIAS):
+    """
+    Call the functions of a dict of names to functions taking no arguments,
+    and return a dict of the names to their results.
+
+    Raises ParallelTimeout when they have not all returned after timeout
+    seconds, an exception of a function is raised as it is.
+    """
+    if not settings.PARALLEL_THREADS:
+        return {name: func() for name, func in funcs.items()}
+
+    deadline = monotonic() + timeout if timeout else None
+    executor = _get_executor()
+    futures = {
+        name: executor.submit(_call, func, deadline, using)
+        for name, func in funcs.items()
+    }
+    _, pending = wait(futures.values(), timeout=timeout)
+    if pending:
+        for future in pending:
+            future.cancel()
+        raise ParallelTimeout(f"Not done after {timeout}s")
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Literals are stripped from the SQL, so an N+1 shows up as one
+# fingerprint repeated once per row
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+# Savepoints of atomic blocks are not counted as queries
+_TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def fingerprint(sql):
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    return _LISTS.sub("(?)", sql)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryRecorder:
+    """Execute wrapper counting the queries and DB time of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith(_TRANSACTION_CONTROL):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold=2):
+        return {sql: n for sql, n in self.fingerprints.items() if n >= threshold}
+
+
+class QueryStats:
+    """Per view totals of the recorded requests, for the summary report."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.views = {}
+
+    def add(self, view, recorder):
+        with self._lock:
+            stats = self.views.setdefault(
+                view,
+                {
+                    "requests": 0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "db_time": 0.0,
+                    "duplicates": Counter(),
+                },
+            )
+            stats["requests"] += 1
+            stats["queries"] += recorder.count
+            stats["max_queries"] = max(stats["max_queries"], recorder.count)
+            stats["db_time"] += recorder.duration
+            for sql, n in recorder.duplicates().items():
+                stats["duplicates"][sql] = max(stats["duplicates"][sql], n)
+
+    def clear(self):
+        with self._lock:
+            self.views.clear()
+
+    def report(self):
+        """Rows per view, the views making the most queries first."""
+        with self._lock:
+            rows = [
+                {
+                    "view": view,
+                    "requests": stats["requests"],
+                    "avg_queries": round(stats["queries"] / stats["requests"], 1),
+                    "max_queries": stats["max_queries"],
+                    "budget": settings.QUERY_COUNT_BUDGETS.get(view),
+                    "avg_db_ms": round(stats["db_time"] * 1000 / stats["requests"], 2),
+                    "duplicates": [
+                        {"sql": sql, "count": n}
+                        for sql, n in stats["duplicates"].most_common()
+                    ],
+                }
+                for view, stats in self.views.items()
+            ]
+        return sorted(rows, key=lambda row: row["max_queries"], reverse=True)
+
+    def write_report(self, path):
+        with open(path, "w") as report:
+            json.dump(self.report(), report, indent=2)
+
+
+stats = QueryStats()
+
+# The recorder of the request being served. Being a context variable, it
+# follows the request into the threads running its sync code under ASGI
+_recorder = ContextVar("query_recorder", default=None)
+
+
+def _record(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def _install(connection, **kwargs):
+    # First in the list, as execute_wrapper() blocks pop the last one
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record)
+
+
+class QueryCountMiddleware:
+    """
+    Count the SQL queries, duplicate queries and DB time of every request and
+    check them against QUERY_COUNT_BUDGETS, keyed by view name such as
+    "literature:issue-detail".
+
+    Only installed when QUERY_COUNT_ENABLED is set. Over budget requests are
+    logged, or raise QueryBudgetExceeded with QUERY_COUNT_RAISE (the tests).
+
+    Async under ASGI, so the async views stay async, and the queries are
+    counted on every connection, whichever thread runs them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_COUNT_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        connection_created.connect(_install)
+        for connection in connections.all():
+            _install(connection)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.process_response(request, response, recorder)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.process_response(request, response, recorder)
+
+    def process_response(self, request, response, recorder):
+        match = request.resolver_match
+        view = match.view_name if match else request.path_info
+        stats.add(view, recorder)
+        response["Server-Timing"] = 'db;dur=%.1f;desc="%s queries"' % (
+            recorder.duration * 1000,
+            recorder.count,
+        )
+        self.check_budget(view, recorder)
+        return response
+
+    def check_budget(self, view, recorder):
+        problems = []
+        budget = settings.QUERY_COUNT_BUDGETS.get(view)
+        if budget is not None and recorder.count > budget:
+            problems.append(f"{recorder.count} queries, the budget is {budget}")
+        limit = settings.QUERY_COUNT_DUPLICATES
+        if limit is not None:
+            for sql, n in recorder.duplicates(limit + 1).items():
+                problems.append(f"{n} times the same query (N+1?): {sql}")
+        if not problems:
+            return
+
+        message = f"{view}: " + "; ".join(problems)
+        if settings.QUERY_COUNT_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
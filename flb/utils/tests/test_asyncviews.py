@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import AsyncClient, AsyncRequestFactory, RequestFactory
+from django.urls import reverse
+
+from flb.literature.tests.factories import ArticleFactory
+from flb.literature.views import ArticleDetailView, SearchView
+from flb.utils.asyncviews import ASGIHandler, run_sync
+
+# The pool threads only see committed rows
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def asgi_get(path):
+    """The status, headers and body of a GET through config/asgi.py."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+    }
+
+    async def get():
+        communicator = ApplicationCommunicator(ASGIHandler(), scope)
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(10)
+        body = b""
+        while True:
+            message = await communicator.receive_output(10)
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                return start["status"], dict(start["headers"]), body
+
+    return async_to_sync(get)()
+
+
+def where():
+    return threading.current_thread().name, connection.in_atomic_block
+
+
+def test_views_are_async():
+    for view in (SearchView.as_view(), ArticleDetailView.as_view()):
+        assert asyncio.iscoroutinefunction(view)
+        # run_sync opens the transaction instead
+        assert view._non_atomic_requests == {"default"}
+
+
+def test_asgi_requests_run_on_the_pool():
+    request = AsyncRequestFactory().get("/")
+
+    name, atomic = async_to_sync(run_sync)(request, where)
+
+    assert name.startswith("asyncview")
+    assert atomic
+
+
+def test_wsgi_requests_run_in_the_request_thread():
+    request = RequestFactory().get("/")
+
+    name, atomic = async_to_sync(run_sync)(request, where)
+
+    assert name == threading.current_thread().name
+    assert atomic
+
+
+def test_async_views_under_asgi():
+    article = ArticleFactory(name="Lichens of Svalbard")
+    client = AsyncClient()
+
+    detail = async_to_sync(client.get)(
+        reverse("literature:article-detail", args=[article.slug])
+    )
+    search = async_to_sync(client.get)(reverse("literature:search"), {"q": "lichens"})
+
+    assert detail.status_code == 200
+    assert "Lichens of Svalbard" in detail.content.decode()
+    assert search.status_code == 200
+    assert "Lichens of Svalbard" in search.content.decode()
+
+
+def test_export_streams_under_asgi():
+    ArticleFactory(name="Lichens of Svalbard")
+    ArticleFactory(name="Mosses of Troms")
+
+    status, _, body = asgi_get(
+        reverse("literature:search-export", args=["articles", "csv"])
+    )
+
+    assert status == 200
+    assert b"Lichens of Svalbard" in body
+    assert b"Mosses of Troms" in body
+
+
+def test_files_need_sendfile_under_asgi(settings):
+    article = ArticleFactory(file=ContentFile(b"%PDF-1.4", name="paper.pdf"))
+    url = reverse("literature:article-file", args=[article.slug])
+
+    settings.DOWNLOAD_SENDFILE = ""
+    status, _, _ = asgi_get(url)
+    assert status == 500
+
+    settings.DOWNLOAD_SENDFILE = "x-sendfile"
+    status, headers, body = asgi_get(url)
+    assert status == 200
+    assert headers[b"X-Sendfile"] == article.file.path.encode()
+    assert body == b""
@@ -0,0 +1,119 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.urls import reverse
+
+from flb.literature.tests.factories import ArticleFactory, BookFactory
+from flb.utils.downloads import parse_range
+
+pytestmark = pytest.mark.django_db
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def article():
+    return ArticleFactory(file=ContentFile(CONTENT, name="paper.pdf"))
+
+
+def file_url(article):
+    return reverse("literature:article-file", args=[article.slug])
+
+
+def body(response):
+    return b"".join(response.streaming_content)
+
+
+@pytest.mark.parametrize(
+    "header, byte_range",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-2000", (0, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=5-4", None),
+        ("bytes=0-1,5-9", None),
+        ("items=0-1", None),
+    ],
+)
+def test_parse_range(header, byte_range):
+    assert parse_range(header, 1000) == byte_range
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+def test_parse_unsatisfiable_range(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+
+def test_whole_file(client, article):
+    response = client.get(file_url(article))
+
+    assert response.status_code == 200
+    assert body(response) == CONTENT
+    assert response["Content-Type"] == "application/pdf"
+    assert response["Content-Length"] == str(len(CONTENT))
+    assert response["Content-Disposition"] == f'inline; filename="{article.slug}.pdf"'
+    assert response["Accept-Ranges"] == "bytes"
+    assert response["ETag"].startswith('"')
+
+
+def test_byte_range(client, article):
+    response = client.get(file_url(article), HTTP_RANGE="bytes=1000-1999")
+
+    assert response.status_code == 206
+    assert body(response) == CONTENT[1000:2000]
+    assert response["Content-Range"] == f"bytes 1000-1999/{len(CONTENT)}"
+    assert response["Content-Length"] == "1000"
+
+
+def test_range_outside_the_file(client, article):
+    response = client.get(file_url(article), HTTP_RANGE="bytes=20000-")
+
+    assert response.status_code == 416
+    assert response["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_if_none_match(client, article):
+    etag = client.get(file_url(article))["ETag"]
+
+    response = client.get(file_url(article), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
+def test_if_range_of_another_version_sends_the_whole_file(client, article):
+    response = client.get(
+        file_url(article), HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"other"'
+    )
+
+    assert response.status_code == 200
+    assert body(response) == CONTENT
+
+
+def test_x_accel_redirect(client, article, settings):
+    settings.DOWNLOAD_SENDFILE = "x-accel-redirect"
+    settings.DOWNLOAD_ACCEL_PREFIX = "/protected/"
+
+    response = client.get(file_url(article), HTTP_RANGE="bytes=0-9")
+
+    assert response.status_code == 200
+    assert response["X-Accel-Redirect"] == f"/protected/{article.file.name}"
+    assert response.content == b""
+
+
+def test_x_sendfile(client, article, settings):
+    settings.DOWNLOAD_SENDFILE = "x-sendfile"
+
+    response = client.get(file_url(article))
+
+    assert response["X-Sendfile"] == article.file.path
+
+
+def test_no_file(client):
+    book = BookFactory()
+
+    response = client.get(reverse("literature:book-file", args=[book.slug]))
+
+    assert response.status_code == 404
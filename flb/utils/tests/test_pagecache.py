@@ -0,0 +1,195 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from flb.literature.tests.factories import (
+    ArticleFactory,
+    AuthorFactory,
+    BookFactory,
+    IssueFactory,
+    JournalFactory,
+)
+from flb.posts.models import Post
+
+pytestmark = pytest.mark.django_db
+
+
+def get(client, url, headers=None, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params, **(headers or {}))
+    assert response.status_code == 200
+    return response.content.decode(), [
+        query
+        for query in queries
+        if not query["sql"].startswith(("SAVEPOINT", "RELEASE"))
+    ]
+
+
+@pytest.fixture
+def article():
+    article = ArticleFactory(name="Kongeørn i Troms")
+    article.authors.add(AuthorFactory())
+    return article
+
+
+def issue_url(issue):
+    return reverse("literature:issue-detail", args=[issue.slug])
+
+
+def test_anonymous_page_is_served_from_the_cache(client, article):
+    url = issue_url(article.issue)
+    first, _ = get(client, url)
+
+    second, queries = get(client, url)
+
+    assert second == first
+    assert queries == []
+
+
+def test_query_string_is_normalized(client, article):
+    url = issue_url(article.issue)
+    get(client, url, a="1", b="2")
+
+    _, queries = get(client, url + "?b=2&a=1")
+
+    assert queries == []
+
+
+def test_logged_in_users_are_not_cached(client, user, article):
+    url = issue_url(article.issue)
+    get(client, url)
+    client.force_login(user)
+
+    _, queries = get(client, url)
+
+    assert queries
+
+
+def test_saving_an_article_purges_its_issue_page(client, article):
+    url = issue_url(article.issue)
+    get(client, url)
+
+    article.name = "Vadere i Finnmark"
+    article.save()
+
+    assert "Vadere i Finnmark" in get(client, url)[0]
+
+
+def test_saving_an_article_keeps_other_pages(client, article):
+    other = IssueFactory()
+    get(client, issue_url(other))
+
+    article.save()
+
+    assert get(client, issue_url(other))[1] == []
+
+
+def test_renaming_a_journal_purges_its_pages(client, article):
+    journal = article.issue.journal
+    urls = [
+        reverse("literature:journal-detail", args=[journal.slug]),
+        issue_url(article.issue),
+        reverse("literature:article-detail", args=[article.slug]),
+    ]
+    for url in urls:
+        get(client, url)
+
+    journal.name = "Lappmeisen"
+    journal.save()
+
+    for url in urls:
+        assert "Lappmeisen" in get(client, url)[0]
+
+
+def article_url(article):
+    return reverse("literature:article-detail", args=[article.slug])
+
+
+def test_pages_are_cached_per_language(client, article):
+    url = issue_url(article.issue)
+    get(client, url)
+
+    _, queries = get(client, url, headers={"HTTP_ACCEPT_LANGUAGE": "nb"})
+
+    assert queries
+
+
+def test_renaming_an_author_purges_the_pages_showing_it(client, article):
+    author = article.authors.get()
+    urls = [
+        issue_url(article.issue),
+        article_url(article),
+        reverse("mainsite:home"),
+    ]
+    for url in urls:
+        get(client, url)
+
+    author.name = "Nordahl"
+    author.save()
+
+    for url in urls:
+        assert "Nordahl" in get(client, url)[0]
+
+
+def test_renaming_an_author_keeps_the_pages_of_others(client, article):
+    book = BookFactory()
+    book.authors.add(AuthorFactory())
+    urls = [
+        issue_url(ArticleFactory().issue),
+        reverse("literature:book-detail", args=[book.slug]),
+        reverse("literature:book-list"),
+    ]
+    for url in urls:
+        get(client, url)
+
+    author = article.authors.get()
+    author.name = "Nordahl"
+    author.save()
+
+    for url in urls:
+        assert get(client, url)[1] == []
+
+
+def test_adding_an_author_purges_the_pages_of_the_article(client, article):
+    urls = [issue_url(article.issue), article_url(article), reverse("mainsite:home")]
+    for url in urls:
+        get(client, url)
+
+    author = AuthorFactory(name="Nordahl")
+    author.authors.add(article)
+
+    for url in urls:
+        assert "Nordahl" in get(client, url)[0]
+
+
+def test_tagging_an_article_purges_its_pages(client, article):
+    other = ArticleFactory()
+    urls = [issue_url(article.issue), article_url(article), reverse("mainsite:home")]
+    for url in [*urls, article_url(other)]:
+        get(client, url)
+
+    article.tags.add("rovfugl")
+
+    for url in urls:
+        assert get(client, url)[1]
+    assert get(client, article_url(other))[1] == []
+
+
+def test_new_issue_purges_the_journal_page(client):
+    journal = JournalFactory()
+    url = reverse("literature:journal-detail", args=[journal.slug])
+    get(client, url)
+
+    IssueFactory(journal=journal, name="Desember")
+
+    assert "Desember" in get(client, url)[0]
+
+
+def test_new_post_purges_the_home_page(client):
+    url = reverse("mainsite:home")
+    get(client, url)
+
+    Post.objects.create(name="Årsmøte", text="Velkommen", author="Styret")
+
+    assert "Årsmøte" in get(client, url)[0]
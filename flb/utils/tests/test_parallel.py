@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from flb.literature.tests.factories import ArticleFactory, BookFactory
+from flb.utils.parallel import ParallelTimeout, run_parallel
+
+# The threads only see committed rows
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def threads(settings):
+    settings.PARALLEL_THREADS = 2
+
+
+def backend_pid():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return cursor.fetchone()[0]
+
+
+def sleep(seconds):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_sleep(%s)", [seconds])
+
+
+def test_groups_run_in_turn_without_threads(settings):
+    settings.PARALLEL_THREADS = 0
+
+    results = run_parallel({"a": threading.current_thread, "b": lambda: 1})
+
+    assert results == {"a": threading.current_thread(), "b": 1}
+
+
+def test_groups_run_side_by_side_on_their_own_connections(threads):
+    start = time.monotonic()
+
+    results = run_parallel(
+        {
+            "a": lambda: (sleep(0.3), backend_pid())[1],
+            "b": lambda: (sleep(0.3), backend_pid())[1],
+        }
+    )
+
+    assert time.monotonic() - start < 0.55
+    assert len({results["a"], results["b"], backend_pid()}) == 3
+
+
+def test_timeout_cancels_the_queries(threads):
+    start = time.monotonic()
+
+    with pytest.raises(ParallelTimeout):
+        run_parallel({"a": lambda: sleep(5), "b": lambda: 1}, timeout=0.2)
+
+    assert time.monotonic() - start < 1
+    # The statement timeout ended the query too, the thread is free again
+    assert run_parallel({"a": lambda: 1}, timeout=1) == {"a": 1}
+
+
+def test_errors_are_raised(threads):
+    def fail():
+        raise ValueError("broken")
+
+    with pytest.raises(ValueError, match="broken"):
+        run_parallel({"a": fail, "b": lambda: 1})
+
+
+def test_search_with_threads(client, threads):
+    ArticleFactory(name="Lichens of Svalbard")
+    BookFactory(name="Lichens of Finnmark")
+    ArticleFactory(name="Mosses")
+
+    response = client.get(reverse("literature:search"), {"q": "lichens"})
+
+    assert response.status_code == 200
+    assert response.context["articles_count"] == 1
+    assert response.context["books_count"] == 1
+    assert response.context["paged_articles"][0].name == "Lichens of Svalbard"
+    assert "Svalbard" in response.content.decode()
+    assert response.context["years"]
+
+
+def test_search_timeout(client, threads, settings):
+    settings.LITERATURE_SEARCH_TIMEOUT = 0.000001
+
+    response = client.get(reverse("literature:search"), {"q": "lichens"})
+
+    assert response.status_code == 503
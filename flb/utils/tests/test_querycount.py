@@ -0,0 +1,92 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from flb.literature.tests.factories import ArticleFactory, AuthorFactory, BookFactory
+from flb.utils import querycount
+from flb.utils.querycount import QueryBudgetExceeded, QueryStats, fingerprint
+
+pytestmark = pytest.mark.django_db
+
+
+# Fresh stats per test, leaving the ones of the whole run for the report
+@pytest.fixture(autouse=True)
+def stats(monkeypatch):
+    stats = QueryStats()
+    monkeypatch.setattr(querycount, "stats", stats)
+    return stats
+
+
+def test_fingerprint_strips_literals():
+    assert fingerprint(
+        "SELECT * FROM t WHERE id = 12 AND name = 'O''Hara' AND pk IN (1, 2, 3)"
+    ) == fingerprint("SELECT * FROM t WHERE id = 7 AND name = 'x' AND pk IN (4)")
+
+
+def test_records_queries_per_view(client, stats):
+    BookFactory()
+
+    response = client.get(reverse("literature:book-list"))
+
+    [row] = stats.report()
+    assert row["view"] == "literature:book-list"
+    assert row["requests"] == 1
+    assert row["max_queries"] > 0
+    assert "queries" in response["Server-Timing"]
+
+
+# The pool threads of the async views only see committed rows
+@pytest.mark.django_db(transaction=True)
+def test_records_queries_of_async_views_under_asgi(stats):
+    article = ArticleFactory()
+
+    response = async_to_sync(AsyncClient().get)(
+        reverse("literature:article-detail", args=[article.slug])
+    )
+
+    [row] = stats.report()
+    assert row["view"] == "literature:article-detail"
+    assert row["max_queries"] > 0
+    assert "queries" in response["Server-Timing"]
+
+
+def test_over_budget_raises(client, settings):
+    settings.QUERY_COUNT_BUDGETS = {"literature:book-list": 1}
+    BookFactory()
+
+    with pytest.raises(QueryBudgetExceeded, match="the budget is 1"):
+        client.get(reverse("literature:book-list"))
+
+
+def test_over_budget_logs_without_raise(client, settings, caplog):
+    settings.QUERY_COUNT_BUDGETS = {"literature:book-list": 1}
+    settings.QUERY_COUNT_RAISE = False
+    BookFactory()
+
+    response = client.get(reverse("literature:book-list"))
+
+    assert response.status_code == 200
+    assert "literature:book-list" in caplog.text
+
+
+def test_repeated_query_is_reported_as_n_plus_one(client, stats, settings):
+    settings.QUERY_COUNT_DUPLICATES = 2
+    for book in BookFactory.create_batch(3):
+        book.authors.add(AuthorFactory())
+
+    with pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+        client.get(reverse("literature:book-list"))
+
+    [row] = stats.report()
+    assert row["duplicates"][0]["count"] == 3
+
+
+def test_write_report(client, stats, tmp_path):
+    ArticleFactory()
+    client.get(reverse("literature:search"))
+    path = tmp_path / "queries.json"
+
+    stats.write_report(path)
+
+    assert '"view": "literature:search"' in path.read_text()
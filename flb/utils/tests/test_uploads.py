@@ -0,0 +1,176 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+
+from flb.literature.forms import IssueForm
+from flb.literature.models import Issue
+from flb.literature.tests.factories import JournalFactory
+from flb.utils.uploads import upload_token
+
+pytestmark = pytest.mark.django_db
+
+CONTENT = b"%PDF-1.4 issue"
+
+
+def presign(client, field="literature.Issue.file", **data):
+    data = {
+        "field": field,
+        "filename": "Årbok 2021.pdf",
+        "content_type": "application/pdf",
+        "size": len(CONTENT),
+        **data,
+    }
+    return client.post(reverse("presign-upload"), data)
+
+
+def upload(client, policy, content=CONTENT):
+    file = SimpleUploadedFile("upload.pdf", content)
+    return client.post(policy["url"], {**policy["fields"], "file": file})
+
+
+@pytest.fixture
+def journal(user):
+    journal = JournalFactory()
+    journal.editors.add(user)
+    return journal
+
+
+def issue_form(user, journal, **data):
+    return IssueForm(data={"name": "Spring", "journal": journal.pk, **data}, user=user)
+
+
+def test_presign_needs_a_login(client):
+    assert presign(client).status_code == 302
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"field": "literature.Issue.name"},
+        {"field": "users.User.name"},
+        {"size": 600 * 1024 * 1024},
+        {"size": ""},
+        {"field": "literature.Issue.f_cover", "content_type": "application/pdf"},
+    ],
+)
+def test_presign_refuses(client, user, data):
+    client.force_login(user)
+
+    response = presign(client, **data)
+
+    assert response.status_code == 400
+
+
+def test_direct_upload_of_an_issue_file(client, user, journal):
+    client.force_login(user)
+
+    policy = presign(client).json()
+    key = policy["fields"]["key"]
+    assert key.startswith("files/issues/") and key.endswith("/Årbok_2021.pdf")
+    assert upload(client, policy).status_code == 204
+
+    form = issue_form(user, journal, file_upload=policy["token"])
+    assert form.is_valid(), form.errors
+    issue = form.save()
+
+    issue = Issue.objects.get(pk=issue.pk)
+    assert issue.file.name == key
+    with default_storage.open(key) as file:
+        assert file.read() == CONTENT
+
+
+def png():
+    content = BytesIO()
+    Image.new("RGB", (4, 4)).save(content, "PNG")
+    return content.getvalue()
+
+
+def test_direct_upload_of_a_cover(client, user, journal):
+    client.force_login(user)
+    policy = presign(
+        client,
+        field="literature.Issue.f_cover",
+        filename="cover.png",
+        content_type="image/png",
+    ).json()
+    upload(client, policy, content=png())
+
+    form = issue_form(user, journal, f_cover_upload=policy["token"])
+
+    assert form.is_valid(), form.errors
+    assert form.save().f_cover.name == policy["fields"]["key"]
+
+
+def test_direct_upload_of_a_cover_that_is_no_image(client, user, journal):
+    client.force_login(user)
+    policy = presign(
+        client, field="literature.Issue.f_cover", content_type="image/png"
+    ).json()
+    upload(client, policy)
+
+    form = issue_form(user, journal, f_cover_upload=policy["token"])
+
+    assert "f_cover" in form.errors
+    assert not default_storage.exists(policy["fields"]["key"])
+
+
+def test_direct_upload_too_large_for_the_form(client, user, journal, settings):
+    client.force_login(user)
+    policy = presign(client).json()
+    upload(client, policy)
+    settings.DIRECT_UPLOAD_MAX_SIZE = len(CONTENT) - 1
+
+    form = issue_form(user, journal, file_upload=policy["token"])
+
+    assert form.errors["file"] == ["The file is too large."]
+    assert not default_storage.exists(policy["fields"]["key"])
+
+
+def test_local_upload_checks_the_policy(client, user):
+    client.force_login(user)
+    policy = presign(client).json()
+
+    tampered = {**policy, "fields": {**policy["fields"], "key": "files/issues/x.pdf"}}
+    assert upload(client, tampered).status_code == 400
+    forged = {**policy, "fields": {**policy["fields"], "policy": "forged"}}
+    assert upload(client, forged).status_code == 403
+    assert upload(client, policy, content=b"").status_code == 400
+
+    assert upload(client, policy).status_code == 204
+    # A key is only written once
+    assert upload(client, policy).status_code == 403
+
+
+def test_token_of_an_unfinished_upload(user, journal):
+    token = upload_token("literature.Issue.file", "files/issues/missing/a.pdf")
+
+    form = issue_form(user, journal, file_upload=token)
+
+    assert form.errors["file"] == ["The upload did not finish, please upload again."]
+
+
+def test_token_of_another_field(client, user, journal):
+    client.force_login(user)
+    policy = presign(client).json()
+    upload(client, policy)
+
+    form = issue_form(user, journal, f_cover_upload=policy["token"])
+
+    assert form.errors["f_cover"] == ["The upload is for another field."]
+
+
+def test_forged_token(user, journal):
+    form = issue_form(user, journal, file_upload="files/issues/other.pdf")
+
+    assert form.errors["file"] == ["The upload has expired, please upload again."]
+
+
+def test_form_marks_the_direct_upload_inputs(user, journal):
+    html = str(issue_form(user, journal)["file"])
+
+    assert 'data-direct-upload="literature.Issue.file"' in html
+    assert f'data-presign-url="{reverse("presign-upload")}"' in html
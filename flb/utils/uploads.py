@@ -0,0 +1,235 @@
+"""
+Uploads of large files from the browser straight to the storage, so they
+don't hold a gunicorn worker while they arrive and again while they are
+sent on to S3.
+
+1. The browser asks PresignUploadView for a POST policy for a file field
+   listed in DIRECT_UPLOAD_FIELDS, see static/js/uploads.js.
+2. It posts the file with the fields of the policy to the storage: S3
+   itself, or LocalUploadView for storages without presigned posts, as in
+   local development and the tests.
+3. The form is sent with the signed token of the upload instead of the
+   file, and DirectUploadFormMixin sets the field to the uploaded key.
+"""
+
+import posixpath
+import uuid
+
+from django import forms
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core import signing
+from django.core.files import File
+from django.db.models import ImageField
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    JsonResponse,
+)
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.text import get_valid_filename
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+POLICY_SALT = "flb.utils.uploads.policy"
+TOKEN_SALT = "flb.utils.uploads.token"
+
+
+def field_label(model, name):
+    return f"{model._meta.label}.{name}"
+
+
+def direct_upload_field(label):
+    """The model field of a DIRECT_UPLOAD_FIELDS label, e.g. "literature.Issue.file"."""
+    if label not in settings.DIRECT_UPLOAD_FIELDS:
+        return None
+    app_model, name = label.rsplit(".", 1)
+    return apps.get_model(app_model)._meta.get_field(name)
+
+
+def upload_key(field, filename):
+    # A directory of its own, so a key is never taken nor guessed
+    prefix = posixpath.join(field.upload_to, uuid.uuid4().hex)
+    root, extension = posixpath.splitext(get_valid_filename(filename) or "file")
+    root = root[: max(field.max_length - len(prefix) - len(extension) - 1, 1)]
+    return posixpath.join(prefix, root + extension)
+
+
+def presigned_post(field, key, content_type):
+    """The url and form fields the browser posts the file with."""
+    storage = field.storage
+    if hasattr(storage, "bucket_name"):
+        # S3Boto3Storage, the key is under its location
+        name = storage._normalize_name(storage._clean_name(key))
+        return storage.connection.meta.client.generate_presigned_post(
+            storage.bucket_name,
+            name,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, settings.DIRECT_UPLOAD_MAX_SIZE],
+            ],
+            ExpiresIn=settings.DIRECT_UPLOAD_EXPIRES,
+        )
+
+    policy = {
+        "field": field_label(field.model, field.name),
+        "key": key,
+        "content_type": content_type,
+    }
+    return {
+        "url": reverse("local-upload"),
+        "fields": {
+            "key": key,
+            "Content-Type": content_type,
+            "policy": signing.dumps(policy, salt=POLICY_SALT),
+        },
+    }
+
+
+def upload_token(label, key):
+    return signing.dumps({"field": label, "key": key}, salt=TOKEN_SALT)
+
+
+def uploaded_key(label, token):
+    """The key of a finished upload to the field, from its token."""
+    try:
+        upload = signing.loads(
+            token, salt=TOKEN_SALT, max_age=settings.DIRECT_UPLOAD_EXPIRES * 2
+        )
+    except signing.BadSignature:
+        raise forms.ValidationError("The upload has expired, please upload again.")
+    if upload["field"] != label:
+        raise forms.ValidationError("The upload is for another field.")
+    field = direct_upload_field(label)
+    key = upload["key"]
+    if not field.storage.exists(key):
+        raise forms.ValidationError("The upload did not finish, please upload again.")
+    try:
+        check_upload(field, key)
+    except forms.ValidationError:
+        # Nothing refers to it yet
+        field.storage.delete(key)
+        raise
+    return key
+
+
+def check_upload(field, key):
+    """
+    Validate the stored file as the form field would an uploaded one: the
+    browser may have sent anything the policy let through.
+    """
+    size = field.storage.size(key)
+    if not size:
+        raise forms.ValidationError("The file is empty.")
+    if size > settings.DIRECT_UPLOAD_MAX_SIZE:
+        raise forms.ValidationError("The file is too large.")
+    if isinstance(field, ImageField):
+        with field.storage.open(key) as file:
+            # Opened and verified with Pillow by forms.ImageField, named as
+            # an uploaded file would be
+            field.formfield().clean(File(file, name=posixpath.basename(key)))
+
+
+class PresignUploadView(LoginRequiredMixin, View):
+    """A POST policy for a file, given its field, name, type and size."""
+
+    def post(self, request):
+        field = direct_upload_field(request.POST.get("field", ""))
+        if field is None:
+            return JsonResponse({"error": "Unknown field"}, status=400)
+        content_type = request.POST.get("content_type") or "application/octet-stream"
+        if isinstance(field, ImageField) and not content_type.startswith("image/"):
+            return JsonResponse({"error": "Not an image"}, status=400)
+        try:
+            size = int(request.POST.get("size", ""))
+        except ValueError:
+            return JsonResponse({"error": "Unknown size"}, status=400)
+        if not 0 < size <= settings.DIRECT_UPLOAD_MAX_SIZE:
+            return JsonResponse({"error": "The file is too large"}, status=400)
+
+        key = upload_key(field, request.POST.get("filename", ""))
+        post = presigned_post(field, key, content_type)
+        post["token"] = upload_token(field_label(field.model, field.name), key)
+        return JsonResponse(post)
+
+
+# Authorized by the signed policy instead, as on S3
+@method_decorator(csrf_exempt, name="dispatch")
+class LocalUploadView(View):
+    """
+    A stand-in for the S3 POST upload, taking the same form: the fields of
+    presigned_post, then the file.
+    """
+
+    def post(self, request):
+        try:
+            policy = signing.loads(
+                request.POST.get("policy", ""),
+                salt=POLICY_SALT,
+                max_age=settings.DIRECT_UPLOAD_EXPIRES,
+            )
+        except signing.BadSignature:
+            return HttpResponseForbidden("Invalid policy")
+        file = request.FILES.get("file")
+        if (
+            file is None
+            or request.POST.get("key") != policy["key"]
+            or request.POST.get("Content-Type") != policy["content_type"]
+        ):
+            return HttpResponseBadRequest("The form does not match the policy")
+        if not 0 < file.size <= settings.DIRECT_UPLOAD_MAX_SIZE:
+            return HttpResponseBadRequest("The file is too large")
+
+        storage = direct_upload_field(policy["field"]).storage
+        if storage.exists(policy["key"]):
+            return HttpResponseForbidden("The key is taken")
+        storage.save(policy["key"], file)
+        return HttpResponse(status=204)
+
+
+class DirectUploadFormMixin:
+    """
+    A ModelForm mixin uploading the direct_upload_fields straight to the
+    storage when the browser runs uploads.js. Their <name>_upload hidden
+    fields carry the tokens, without JavaScript the files are sent along
+    as usual.
+    """
+
+    direct_upload_fields = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.uploaded_keys = {}
+        for name in self.direct_upload_fields:
+            self.fields[name].widget.attrs.update(
+                {
+                    "data-direct-upload": field_label(self._meta.model, name),
+                    "data-presign-url": reverse("presign-upload"),
+                }
+            )
+            self.fields[f"{name}_upload"] = forms.CharField(
+                required=False, widget=forms.HiddenInput
+            )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for name in self.direct_upload_fields:
+            token = cleaned_data.get(f"{name}_upload")
+            if not token:
+                continue
+            try:
+                label = field_label(self._meta.model, name)
+                self.uploaded_keys[name] = uploaded_key(label, token)
+            except forms.ValidationError as e:
+                self.add_error(name, e)
+        return cleaned_data
+
+    def _post_clean(self):
+        super()._post_clean()
+        # Stored already, so saving the model only records the name
+        for name, key in self.uploaded_keys.items():
+            setattr(self.instance, name, key)